@@ -0,0 +1,95 @@
+"""
+Job table throughput: connection per call vs persistent WAL connection.
+
+Creates N jobs and moves each through processing -> done with
+create_job/update_job, and reports jobs per second for:
+  per-call     a new connection, commit and close per call (the old
+               Database behaviour, rollback journal)
+  persistent   the thread-local WAL connection, one commit per call
+  transaction  the persistent connection with each job's updates
+               grouped in one transaction
+
+Usage:
+    python -m benchmarks.bench_db
+    python -m benchmarks.bench_db --jobs 5000
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import tracker_app.store.db
+from tracker_app.store.db import Database
+
+SCHEMA_PATH = Path(tracker_app.store.db.__file__).parent / "schema.sql"
+
+
+class PerCallDatabase(Database):
+    """Database with the previous connection-per-call behaviour"""
+    
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    def init_schema(self) -> None:
+        # Keep the default rollback journal (WAL would persist in the file)
+        with self.transaction() as conn:
+            conn.executescript(SCHEMA_PATH.read_text())
+
+
+def bench(db: Database, n_jobs: int, grouped: bool) -> float:
+    """Run n_jobs through the job lifecycle, return jobs per second"""
+    db.init_schema()
+    video_id = db.insert_video('bench', 'bench.mp4', '/dev/null')
+    
+    start = time.perf_counter()
+    for _ in range(n_jobs):
+        job_id = db.create_job(video_id)
+        if grouped:
+            with db.transaction():
+                db.update_job(job_id, status='processing')
+                db.update_job(job_id, status='done', quality_score=0.9, frames=100)
+        else:
+            db.update_job(job_id, status='processing')
+            db.update_job(job_id, status='done', quality_score=0.9, frames=100)
+    return n_jobs / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=2000)
+    args = parser.parse_args(argv)
+    
+    from loguru import logger
+    logger.remove()
+    
+    print(f"{'Mode':<12} | {'jobs/s':>8} | {'vs per-call':>11}")
+    print("-" * 38)
+    
+    baseline = None
+    for mode, cls, grouped in (
+        ('per-call', PerCallDatabase, False),
+        ('persistent', Database, False),
+        ('transaction', Database, True),
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = cls(Path(tmp) / "bench.db")
+            rate = bench(db, args.jobs, grouped)
+            db.close()
+        baseline = baseline or rate
+        print(f"{mode:<12} | {rate:>8.0f} | {rate / baseline:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Decode-time downscaling benchmark.
+
+Measures frames/second of decode alone and of decode + tracking for
+several source resolutions, with and without Config.target_height.
+
+Usage:
+    python -m benchmarks.bench_decode
+    python -m benchmarks.bench_decode --provider mediapipe --video video-eksempler/5.mp4
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from tracker_app.preprocess.video_utils import extract_frames
+from benchmarks.synthetic import RESOLUTIONS, make_synthetic_video
+
+
+def bench_video(
+    video_path: Path,
+    target_fps: int,
+    target_height: Optional[int],
+    provider_name: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run decode (and optionally tracking) over one video, return frames and fps"""
+    provider = None
+    if provider_name:
+        from tracker_app.tracking.factory import get_tracking_provider
+        provider = get_tracking_provider(provider_name)
+    
+    frames = 0
+    start = time.perf_counter()
+    try:
+        for frame_idx, time_s, frame in extract_frames(
+            video_path, target_fps, target_height=target_height
+        ):
+            if provider is not None:
+                provider.track_frame(frame, frame_idx, time_s)
+            frames += 1
+    finally:
+        elapsed = time.perf_counter() - start
+        if provider is not None:
+            provider.close()
+    
+    return {
+        'frames': frames,
+        'seconds': elapsed,
+        'fps': frames / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resolutions', nargs='+', default=list(RESOLUTIONS),
+                        choices=list(RESOLUTIONS))
+    parser.add_argument('--seconds', type=float, default=4.0)
+    parser.add_argument('--source-fps', type=float, default=30.0)
+    parser.add_argument('--target-fps', type=int, default=25)
+    parser.add_argument('--target-height', type=int, default=720)
+    parser.add_argument('--provider', default=None,
+                        help="Also run tracking with this provider (e.g. mediapipe)")
+    parser.add_argument('--video', type=Path, default=None,
+                        help="Rescale this clip instead of drawing synthetic frames")
+    parser.add_argument('--work-dir', type=Path,
+                        default=Path(tempfile.gettempdir()) / "nsl_bench")
+    args = parser.parse_args(argv)
+    
+    stage = "decode+track" if args.provider else "decode"
+    print(f"{stage} throughput, target_height={args.target_height}")
+    print(f"{'Source':<8} | {'Full (fps)':>10} | {'Scaled (fps)':>12} | {'Gain':>6}")
+    print("-" * 46)
+    
+    for name in args.resolutions:
+        tag = args.video.stem if args.video else "synthetic"
+        video = make_synthetic_video(
+            args.work_dir / f"{tag}_{name}_{args.seconds:g}s_{args.source_fps:g}fps.mp4",
+            RESOLUTIONS[name],
+            seconds=args.seconds,
+            fps=args.source_fps,
+            source=args.video
+        )
+        full = bench_video(video, args.target_fps, None, args.provider)
+        scaled = bench_video(video, args.target_fps, args.target_height, args.provider)
+        gain = scaled['fps'] / full['fps'] if full['fps'] else 0.0
+        print(f"{name:<8} | {full['fps']:>10.1f} | {scaled['fps']:>12.1f} | {gain:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
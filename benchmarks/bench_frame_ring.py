@@ -0,0 +1,159 @@
+"""
+Frame handoff between processes: pickling through a queue vs FrameRing.
+
+Transport: a child process sends the same synthetic BGR frame N times,
+either pickled through a multiprocessing.Queue or copied into a FrameRing
+slot with only the slot index queued. The consumer reads every frame, as
+a tracker would. Reports frames/second and MB/s per resolution.
+
+Decode: frames/second of extract_frames inline, on the prefetch thread
+and through ring_frames (decoder process), for a synthetic video. The
+decoder process is started once and reused, as in a runner; the ring
+figure of the first resolution includes starting it.
+
+Usage:
+    python -m benchmarks.bench_frame_ring
+    python -m benchmarks.bench_frame_ring --frames 500 --resolutions 1080p 2160p
+"""
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+from typing import Tuple
+import numpy as np
+
+from tracker_app.preprocess.frame_ring import FrameRing, ring_frames
+from tracker_app.preprocess.video_utils import extract_frames, prefetch_frames
+from benchmarks.synthetic import RESOLUTIONS, make_synthetic_video
+
+
+def _frame(size: Tuple[int, int]) -> np.ndarray:
+    width, height = size
+    return np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def _send_pickled(size, frames: int, buffer) -> None:
+    frame = _frame(size)
+    for i in range(frames):
+        frame[0, 0, 0] = i % 256
+        # Queue pickles later on a feeder thread; a decoder yields a new array per frame
+        buffer.put(frame.copy())
+    buffer.put(None)
+
+
+def _send_ring(size, frames: int, ring_name: str, slots: int, free, filled) -> None:
+    frame = _frame(size)
+    ring = FrameRing(slots, frame.nbytes, name=ring_name)
+    try:
+        for i in range(frames):
+            frame[0, 0, 0] = i % 256
+            free.acquire()
+            ring.write(i % slots, frame)
+            filled.put((i % slots, frame.shape))
+        filled.put(None)
+    finally:
+        ring.close()
+
+
+def bench_pickled(size: Tuple[int, int], frames: int, slots: int) -> float:
+    """Frames/second received pickled through a bounded Queue"""
+    ctx = multiprocessing.get_context("spawn")
+    buffer = ctx.Queue(maxsize=slots)
+    producer = ctx.Process(target=_send_pickled, args=(size, frames, buffer))
+    producer.start()
+    
+    # Timed from the first frame, so process startup is not counted
+    received, start = 0, None
+    while (frame := buffer.get()) is not None:
+        start = start or time.perf_counter()
+        received += int(frame[0, 0, 0] == received % 256)
+    elapsed = time.perf_counter() - start
+    producer.join()
+    assert received == frames
+    return (frames - 1) / elapsed
+
+
+def bench_ring(size: Tuple[int, int], frames: int, slots: int) -> float:
+    """Frames/second received through a FrameRing"""
+    width, height = size
+    ctx = multiprocessing.get_context("spawn")
+    ring = FrameRing(slots, width * height * 3)
+    free = ctx.Semaphore(slots)
+    filled = ctx.Queue()
+    producer = ctx.Process(target=_send_ring, args=(size, frames, ring.name, slots, free, filled))
+    producer.start()
+    
+    received, start = 0, None
+    try:
+        while (message := filled.get()) is not None:
+            start = start or time.perf_counter()
+            slot, shape = message
+            frame = ring.view(slot, shape)
+            received += int(frame[0, 0, 0] == received % 256)
+            del frame
+            free.release()
+        elapsed = time.perf_counter() - start
+        producer.join()
+    finally:
+        ring.close()
+    assert received == frames
+    return (frames - 1) / elapsed
+
+
+def bench_decode(video: Path, target_fps: int, mode: str, slots: int) -> float:
+    """Frames/second of decoding video inline, prefetched or via ring_frames"""
+    start = time.perf_counter()
+    count = 0
+    if mode == 'ring':
+        with ring_frames(video, target_fps, slots=slots) as frames:
+            for _ in frames:
+                count += 1
+    else:
+        frames = extract_frames(video, target_fps)
+        if mode == 'thread':
+            frames = prefetch_frames(frames, slots)
+        for _ in frames:
+            count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resolutions', nargs='+', default=['720p', '1080p'],
+                        choices=list(RESOLUTIONS))
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--slots', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=4.0,
+                        help="Length of the synthetic video for the decode comparison")
+    parser.add_argument('--target-fps', type=int, default=25)
+    parser.add_argument('--work-dir', type=Path,
+                        default=Path(tempfile.gettempdir()) / "nsl_bench")
+    args = parser.parse_args(argv)
+    
+    print(f"Transport, {args.frames} frames, {args.slots} slots")
+    print(f"{'Source':<8} | {'Pickled (fps)':>13} | {'Ring (fps)':>10} | {'Ring (MB/s)':>11} | {'Gain':>6}")
+    print("-" * 62)
+    for name in args.resolutions:
+        size = RESOLUTIONS[name]
+        frame_mb = size[0] * size[1] * 3 / 1e6
+        pickled = bench_pickled(size, args.frames, args.slots)
+        ring = bench_ring(size, args.frames, args.slots)
+        print(f"{name:<8} | {pickled:>13.1f} | {ring:>10.1f} | "
+              f"{ring * frame_mb:>11.0f} | {ring / pickled:>5.2f}x")
+    
+    print(f"\nDecode, {args.seconds:g} s synthetic video at {args.target_fps} fps")
+    print(f"{'Source':<8} | {'Inline (fps)':>12} | {'Thread (fps)':>12} | {'Ring (fps)':>10}")
+    print("-" * 52)
+    for name in args.resolutions:
+        video = make_synthetic_video(
+            args.work_dir / f"synthetic_{name}_{args.seconds:g}s_30fps.mp4",
+            RESOLUTIONS[name],
+            seconds=args.seconds
+        )
+        rates = [bench_decode(video, args.target_fps, mode, args.slots) for mode in ('inline', 'thread', 'ring')]
+        print(f"{name:<8} | {rates[0]:>12.1f} | {rates[1]:>12.1f} | {rates[2]:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
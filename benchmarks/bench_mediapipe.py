@@ -0,0 +1,82 @@
+"""
+MediaPipe per-frame latency: sequential vs concurrent sub-models.
+
+Runs the same frames through MediaPipeProvider with concurrent_models
+off and on, and reports per-frame latency percentiles.
+
+Usage:
+    python -m benchmarks.bench_mediapipe
+    python -m benchmarks.bench_mediapipe --video video-eksempler/5.mp4
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Dict, Any
+
+import numpy as np
+
+from tracker_app.preprocess.video_utils import extract_frames
+from benchmarks.synthetic import RESOLUTIONS, make_synthetic_video
+
+
+def bench_latency(frames: List[np.ndarray], concurrent_models: bool) -> Dict[str, Any]:
+    """Track frames with a fresh provider, return latency stats in ms"""
+    from tracker_app.tracking.mediapipe_provider import MediaPipeProvider
+    
+    provider = MediaPipeProvider(concurrent_models=concurrent_models)
+    latencies = []
+    try:
+        # Warm-up frame: first call includes graph initialisation
+        provider.track_frame(frames[0], 0, 0.0)
+        for i, frame in enumerate(frames):
+            start = time.perf_counter()
+            provider.track_frame(frame, i, i / 25.0)
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        provider.close()
+    
+    lat = np.array(latencies)
+    return {
+        'frames': len(lat),
+        'mean_ms': float(lat.mean()),
+        'p50_ms': float(np.percentile(lat, 50)),
+        'p95_ms': float(np.percentile(lat, 95)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--video', type=Path, default=None,
+                        help="Clip to track (default: synthetic 720p)")
+    parser.add_argument('--seconds', type=float, default=4.0)
+    parser.add_argument('--target-height', type=int, default=720)
+    parser.add_argument('--work-dir', type=Path,
+                        default=Path(tempfile.gettempdir()) / "nsl_bench")
+    args = parser.parse_args(argv)
+    
+    video = args.video or make_synthetic_video(
+        args.work_dir / f"synthetic_720p_{args.seconds:g}s_30fps.mp4",
+        RESOLUTIONS['720p'],
+        seconds=args.seconds
+    )
+    frames = [
+        frame for _, _, frame in extract_frames(video, 25, target_height=args.target_height)
+    ]
+    
+    print(f"MediaPipe per-frame latency, {len(frames)} frames of {video.name}")
+    print(f"{'Mode':<12} | {'mean (ms)':>9} | {'p50 (ms)':>8} | {'p95 (ms)':>8}")
+    print("-" * 46)
+    
+    results = {}
+    for mode, concurrent in (('sequential', False), ('concurrent', True)):
+        stats = bench_latency(frames, concurrent)
+        results[mode] = stats
+        print(f"{mode:<12} | {stats['mean_ms']:>9.1f} | {stats['p50_ms']:>8.1f} | {stats['p95_ms']:>8.1f}")
+    
+    speedup = results['sequential']['mean_ms'] / results['concurrent']['mean_ms']
+    print(f"\nConcurrent speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
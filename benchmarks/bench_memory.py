@@ -0,0 +1,104 @@
+"""
+Peak memory of process_video_job: whole-video vs chunked streaming.
+
+Each case runs in a fresh process and reports peak RSS (ru_maxrss), so
+cases do not inflate each other's high-water mark. Tracking uses a
+fake provider with MediaPipe-sized landmarks, which keeps the run
+short while the landmark data per frame matches real output.
+
+Usage:
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --seconds 60 240 --chunk-frames 0 256
+"""
+import argparse
+import multiprocessing as mp
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+from benchmarks.fake_provider import FakeProvider
+from benchmarks.synthetic import RESOLUTIONS, make_synthetic_video
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _run_case(video: Path, chunk_frames: int, work_dir: Path, queue) -> None:
+    """Child process: process one video job and report peak RSS"""
+    from loguru import logger
+    from tracker_app.config import Config
+    from tracker_app.store.db import Database
+    from tracker_app.pipeline.process import process_video_job
+    
+    logger.remove()
+    config = Config(
+        workspace_dir=work_dir,
+        chunk_frames=chunk_frames,
+        target_height=480
+    )
+    db = Database(config.db_path)
+    db.init_schema()
+    video_id = db.insert_video('bench', video.name, str(video))
+    job_id = db.create_job(video_id)
+    job = next(j for j in db.get_jobs() if j['id'] == job_id)
+    
+    baseline = _max_rss_mb()
+    start = time.perf_counter()
+    process_video_job(job, db, FakeProvider(), config, provider_name='fake')
+    queue.put({
+        'seconds': time.perf_counter() - start,
+        'baseline_mb': baseline,
+        'peak_mb': _max_rss_mb(),
+    })
+
+
+def bench_case(video: Path, chunk_frames: int, work_dir: Path) -> Dict[str, Any]:
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_case, args=(video, chunk_frames, work_dir, queue))
+    proc.start()
+    proc.join()
+    if proc.exitcode != 0:
+        raise RuntimeError(f"Benchmark case failed (exit code {proc.exitcode})")
+    return queue.get()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, nargs='+', default=[30.0, 120.0],
+                        help="Synthetic video lengths")
+    parser.add_argument('--chunk-frames', type=int, nargs='+', default=[0, 256],
+                        help="Chunk sizes to compare (0 = whole video)")
+    parser.add_argument('--work-dir', type=Path,
+                        default=Path(tempfile.gettempdir()) / "nsl_bench")
+    args = parser.parse_args(argv)
+    
+    print(f"{'Video':>8} | {'Chunk':>6} | {'Time (s)':>8} | {'Base (MB)':>9} | {'Peak (MB)':>9} | {'Growth (MB)':>11}")
+    print("-" * 68)
+    
+    for seconds in args.seconds:
+        video = make_synthetic_video(
+            args.work_dir / f"synthetic_480p_{seconds:g}s_25fps.mp4",
+            RESOLUTIONS['480p'],
+            seconds=seconds,
+            fps=25.0
+        )
+        for chunk_frames in args.chunk_frames:
+            with tempfile.TemporaryDirectory(dir=args.work_dir) as workspace:
+                result = bench_case(video, chunk_frames, Path(workspace))
+            chunk = str(chunk_frames) if chunk_frames > 0 else 'whole'
+            print(
+                f"{seconds:>7g}s | {chunk:>6} | {result['seconds']:>8.1f} | "
+                f"{result['baseline_mb']:>9.0f} | {result['peak_mb']:>9.0f} | "
+                f"{result['peak_mb'] - result['baseline_mb']:>11.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
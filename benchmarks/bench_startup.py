@@ -0,0 +1,136 @@
+"""
+CLI startup time per subcommand, checked against a budget.
+
+Runs `python -m tracker_app <command>` in a fresh process against an
+empty workspace and reports the median wall time, minus the time of a
+bare `python -c pass`, so the budget covers what tracker_app imports and
+does rather than interpreter and site-packages startup. Commands that do
+not track or decode must not load mediapipe, OpenCV or pandas. The run
+fails (exit status 1) when a command is over its BUDGETS_MS, or when
+importing tracker_app.cli loads any of HEAVY_MODULES (a check that does
+not depend on machine speed). tests/test_startup.py enforces the same
+budgets under pytest.
+
+Children keep compiled bytecode in a pycache under --work-dir, so the
+numbers match an installed setup even where PYTHONDONTWRITEBYTECODE is
+set. The first run of each command warms that cache and is not counted.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeat 10 --scale 2
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Startup budget in ms above a bare interpreter
+BUDGETS_MS = {
+    'stats': 300,
+    'stats --perf': 300,
+    'export-index': 300,
+    'ingest --dry-run': 300,
+    'init-db': 300,
+    # Typer's rich help formatter alone imports ~170 ms (markdown, pygments)
+    '--help': 500,
+}
+# Must only be imported by the commands that use them
+HEAVY_MODULES = ('mediapipe', 'cv2', 'pandas', 'pyarrow', 'numpy', 'torch', 'mmpose')
+
+
+def _run(args: List[str], env: Dict[str, str], cwd: Path) -> float:
+    start = time.perf_counter()
+    subprocess.run(args, env=env, cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def bench(args: List[str], env: Dict[str, str], cwd: Path, repeat: int) -> float:
+    """Median seconds over repeat runs, after one warm-up run"""
+    _run(args, env, cwd)
+    return statistics.median(_run(args, env, cwd) for _ in range(repeat))
+
+
+@contextmanager
+def cli_environment(work_dir: Path) -> Iterator[Tuple[List[str], Dict[str, str], Dict[str, List[str]]]]:
+    """
+    (python command, environment, {name: CLI arguments}) for timing the
+    commands in BUDGETS_MS against a fresh, initialised workspace
+    """
+    work_dir.mkdir(parents=True, exist_ok=True)
+    env = {key: value for key, value in os.environ.items() if key != 'PYTHONDONTWRITEBYTECODE'}
+    python = [sys.executable, '-X', f"pycache_prefix={work_dir / 'pycache'}"]
+    
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        env['WORKSPACE_DIR'] = str(Path(tmp) / "workspace")
+        manifest = Path(tmp) / "manifest.csv"
+        manifest.write_text("word,filename,local_path\nhei,hei.mp4,/nonexistent/hei.mp4\n")
+        
+        subprocess.run(python + ['-m', 'tracker_app', 'init-db'], env=env, cwd=REPO_ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        commands = {
+            'stats': ['stats'],
+            'stats --perf': ['stats', '--perf'],
+            'export-index': ['export-index', '--output-dir', str(Path(tmp) / "exports")],
+            'ingest --dry-run': ['ingest', str(manifest), '--dry-run'],
+            'init-db': ['init-db'],
+            '--help': ['--help'],
+        }
+        yield python, env, commands
+
+
+def heavy_imports(python: List[str], env: Dict[str, str]) -> List[str]:
+    """HEAVY_MODULES loaded by importing tracker_app.cli"""
+    return subprocess.run(
+        python + ['-c', f"import sys, tracker_app.cli; "
+                        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"],
+        env=env, cwd=REPO_ROOT, check=True, capture_output=True, text=True
+    ).stdout.split()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Multiply budgets (slow machines)")
+    parser.add_argument('--work-dir', type=Path,
+                        default=Path(tempfile.gettempdir()) / "nsl_bench")
+    args = parser.parse_args(argv)
+    
+    with cli_environment(args.work_dir) as (python, env, commands):
+        bare = bench(python + ['-c', 'pass'], env, REPO_ROOT, args.repeat)
+        print(f"Bare interpreter: {bare * 1000:.0f} ms (subtracted below)\n")
+        print(f"{'Command':<18} | {'Total (ms)':>10} | {'CLI (ms)':>8} | {'Budget':>6} |")
+        print("-" * 56)
+        
+        over = []
+        loaded = heavy_imports(python, env)
+        if loaded:
+            over.append(f"import tracker_app.cli loads {', '.join(loaded)}")
+        
+        for name, command in commands.items():
+            total = bench(python + ['-m', 'tracker_app'] + command, env, REPO_ROOT, args.repeat)
+            own_ms = (total - bare) * 1000
+            budget: Optional[float] = BUDGETS_MS.get(name)
+            status = ''
+            if budget is not None:
+                budget *= args.scale
+                if own_ms > budget:
+                    status = 'OVER'
+                    over.append(name)
+            print(f"{name:<18} | {total * 1000:>10.0f} | {own_ms:>8.0f} | {budget or 0:>6.0f} | {status}")
+    
+    if over:
+        print(f"\nOver budget: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,471 @@
+"""
+Stage-level benchmark suite.
+
+Times each pipeline stage on its own, on synthetic videos, with the
+deterministic FakeProvider in place of a model:
+  decode       extract_frames at the config's target fps and height
+  track        FakeProvider.track_batch into a TrackingSequence
+  smooth       smooth_tracking_sequence
+  quality      compute_quality_score
+  parquet      save_tracking_parquet
+  jsonl        save_tracking_jsonl (including to_records)
+  db_ingest    Database.insert_videos_with_jobs
+  db_claim     Database.claim_jobs, one job per call
+  db_finish    update_job(done) + add_quality_issue per job, one transaction each
+With --mediapipe, track_mediapipe runs the real MediaPipe provider on CPU.
+With --face-cadence, face{N}[_motion{M}] run MediaPipe with face mesh
+every N frames (MEDIAPIPE_FACE_EVERY) on real sample clips and also
+report how far the face landmarks are from running it on every frame
+(face1).
+
+Each stage runs --repeat times and the median is reported. Results are
+written as JSON; --compare flags stages that are slower than a saved
+baseline by more than --threshold and exits with status 1.
+
+Usage:
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json
+    python -m benchmarks.suite --quick --mediapipe
+    python -m benchmarks.suite --quick --face-cadence --face-every 3 5 10
+"""
+import argparse
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+from tracker_app.config import Config
+from tracker_app.preprocess.video_utils import extract_frames
+from tracker_app.postprocess.smoothing import smooth_tracking_sequence
+from tracker_app.postprocess.quality import compute_quality_score
+from tracker_app.store.db import Database
+from tracker_app.store.disk import save_tracking_parquet, save_tracking_jsonl
+from tracker_app.tracking.sequence import TrackingSequence
+from benchmarks.fake_provider import FakeProvider
+from benchmarks.synthetic import RESOLUTIONS, make_synthetic_video
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def timed(
+    fn: Callable[[Any], Any],
+    repeat: int,
+    setup: Optional[Callable[[], Any]] = None
+) -> Tuple[Dict[str, Any], Any]:
+    """
+    Run fn repeat times (setup, untimed, before each run).
+    
+    Returns:
+        (timing, result of the last run), timing has the median seconds,
+        the fastest run and all runs
+    """
+    runs = []
+    result = None
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        result = fn(arg)
+        runs.append(time.perf_counter() - start)
+    return {'seconds': statistics.median(runs), 'min': min(runs), 'runs': runs}, result
+
+
+def _rate(timing: Dict[str, Any], count: int, unit: str) -> Dict[str, Any]:
+    """Add count and a per-second rate (of the median) to a timing"""
+    timing[unit] = count
+    timing[f'{unit}_per_s'] = count / timing['seconds'] if timing['seconds'] > 0 else 0.0
+    return timing
+
+
+def bench_video(video: Path, config: Config, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Decode, track, smooth, score and write one video, stage by stage"""
+    results = {}
+    
+    def decode(_):
+        frames, shape = 0, None
+        for _, _, frame in extract_frames(video, config.target_fps, target_height=config.target_height):
+            frames += 1
+            shape = frame.shape
+        return frames, shape
+    
+    timing, (n_frames, shape) = timed(decode, repeat)
+    results['decode'] = _rate(timing, n_frames, 'frames')
+    
+    # The fake provider ignores pixels, so one frame of the decoded size stands in for all
+    provider = FakeProvider()
+    frame = np.zeros(shape, dtype=np.uint8)
+    indices = list(range(n_frames))
+    times_s = [i / config.target_fps for i in indices]
+    
+    def track(_):
+        sequence = TrackingSequence(provider.KEYPOINT_COUNTS, capacity=n_frames)
+        for start in range(0, n_frames, config.batch_size):
+            batch = indices[start:start + config.batch_size]
+            frames = [frame] * len(batch)
+            for result in provider.track_batch(frames, batch, times_s[start:start + len(batch)]):
+                sequence.append(result)
+        return sequence
+    
+    timing, sequence = timed(track, repeat)
+    results['track'] = _rate(timing, n_frames, 'frames')
+    
+    def smooth(_):
+        return smooth_tracking_sequence(
+            sequence,
+            ema_alpha=config.ema_alpha_wrist,
+            min_confidence=config.min_detection_confidence,
+            ema_alpha_fingers=config.ema_alpha_fingers,
+            ema_alpha_face=config.ema_alpha_face,
+            max_rotation_deg=config.velocity_clamp_deg_per_frame
+        )
+    
+    timing, smoothed = timed(smooth, repeat)
+    results['smooth'] = _rate(timing, n_frames, 'frames')
+    
+    timing, _ = timed(lambda _: compute_quality_score(smoothed), repeat)
+    results['quality'] = _rate(timing, n_frames, 'frames')
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        timing, _ = timed(lambda _: save_tracking_parquet(Path(tmp) / "tracking.parquet", smoothed), repeat)
+        results['parquet'] = _rate(timing, n_frames, 'frames')
+        
+        timing, _ = timed(
+            lambda _: save_tracking_jsonl(Path(tmp) / "tracking.jsonl.gz", smoothed.to_records()),
+            repeat
+        )
+        results['jsonl'] = _rate(timing, n_frames, 'frames')
+    
+    return results
+
+
+def _clip_frames(video: Path, config: Config, max_frames: int) -> List[Tuple[int, float, np.ndarray]]:
+    """Up to max_frames decoded frames of a video"""
+    frames = []
+    for frame_index, time_s, frame in extract_frames(video, config.target_fps, target_height=config.target_height):
+        frames.append((frame_index, time_s, frame))
+        if len(frames) >= max_frames:
+            break
+    return frames
+
+
+def bench_mediapipe(video: Path, config: Config, max_frames: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Real MediaPipe tracking on CPU (model load not timed)"""
+    from tracker_app.tracking.mediapipe_provider import MediaPipeProvider
+    
+    frames = _clip_frames(video, config, max_frames)
+    
+    def setup():
+        return MediaPipeProvider(
+            min_detection_confidence=config.min_detection_confidence,
+            min_tracking_confidence=config.min_tracking_confidence,
+            concurrent_models=config.mediapipe_concurrent_models
+        )
+    
+    def track(provider):
+        try:
+            for frame_index, time_s, frame in frames:
+                provider.track_frame(frame, frame_index, time_s)
+        finally:
+            provider.close()
+    
+    timing, _ = timed(track, repeat, setup=setup)
+    return {'track_mediapipe': _rate(timing, len(frames), 'frames')}
+
+
+def bench_face_cadence(
+    videos: List[Path],
+    config: Config,
+    max_frames: int,
+    repeat: int,
+    cadences: List[int],
+    motion: float
+) -> Dict[str, Dict[str, Any]]:
+    """
+    MediaPipe throughput vs face accuracy for face mesh cadences.
+    
+    Every setting tracks the same clips, one after the other on one
+    provider as a runner would. Face error is the mean distance in pixels
+    of face landmarks from face1 (face mesh on every frame), over frames
+    where both found a face; face_lost counts frames where only face1
+    found one.
+    """
+    from tracker_app.tracking.mediapipe_provider import MediaPipeProvider
+    
+    frames = [frame for video in videos for frame in _clip_frames(video, config, max_frames)]
+    settings = [(1, 0.0)] + [(n, 0.0) for n in cadences if n > 1]
+    if motion > 0:
+        settings += [(n, motion) for n in cadences if n > 1]
+    
+    results = {}
+    reference = None
+    for face_every, face_motion in settings:
+        def setup():
+            return MediaPipeProvider(
+                min_detection_confidence=config.min_detection_confidence,
+                min_tracking_confidence=config.min_tracking_confidence,
+                face_every=face_every,
+                face_motion=face_motion
+            )
+        
+        def track(provider):
+            try:
+                return [provider.track_frame(frame, frame_index, time_s) for frame_index, time_s, frame in frames]
+            finally:
+                provider.close()
+        
+        timing, tracked = timed(track, repeat, setup=setup)
+        if reference is None:
+            reference = tracked
+        name = f"face{face_every}" + (f"_motion{face_motion:g}" if face_motion else "")
+        results[name] = {**_rate(timing, len(frames), 'frames'), **_face_accuracy(tracked, reference)}
+    return results
+
+
+def _face_accuracy(tracked: list, reference: list) -> Dict[str, Any]:
+    """Face landmark error of tracked against reference results, in pixels"""
+    errors = []
+    lost = 0
+    for result, expected in zip(tracked, reference):
+        if expected.face is None:
+            continue
+        if result.face is None:
+            lost += 1
+            continue
+        width, height = expected.image_size
+        delta = (result.face[:, :2] - expected.face[:, :2]) * (width, height)
+        errors.append(float(np.linalg.norm(delta, axis=1).mean()))
+    return {
+        'face_mesh_share': 1 - sum('face' in result.estimated for result in tracked) / max(len(tracked), 1),
+        'face_error_px': statistics.fmean(errors) if errors else None,
+        'face_error_p95_px': float(np.percentile(errors, 95)) if errors else None,
+        'face_lost': lost
+    }
+
+
+def bench_db(n_jobs: int, work_dir: Path, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Job table throughput: bulk ingest, claiming and finishing jobs"""
+    databases: List[Database] = []
+    
+    def fresh_db(jobs: bool, claimed: bool = False) -> Callable[[], Database]:
+        def setup() -> Database:
+            db = Database(Path(tempfile.mkdtemp(dir=work_dir)) / "bench.db")
+            db.init_schema()
+            databases.append(db)
+            if jobs:
+                db.insert_videos_with_jobs(_videos(n_jobs))
+            if claimed:
+                db.claim_jobs('bench', n_jobs, lease_s=3600)
+            return db
+        return setup
+    
+    def ingest(db):
+        db.insert_videos_with_jobs(_videos(n_jobs))
+    
+    def claim(db):
+        while db.claim_jobs('bench', 1, lease_s=3600):
+            pass
+    
+    def finish(db):
+        for job in db.get_jobs(status='processing'):
+            with db.transaction():
+                db.update_job(job['id'], status='done', quality_score=0.9, frames=100)
+                db.add_quality_issue(job['id'], 'low_face_coverage', 'info', details='bench')
+    
+    results = {}
+    try:
+        timing, _ = timed(ingest, repeat, setup=fresh_db(jobs=False))
+        results['db_ingest'] = _rate(timing, n_jobs, 'jobs')
+        timing, _ = timed(claim, repeat, setup=fresh_db(jobs=True))
+        results['db_claim'] = _rate(timing, n_jobs, 'jobs')
+        timing, _ = timed(finish, repeat, setup=fresh_db(jobs=True, claimed=True))
+        results['db_finish'] = _rate(timing, n_jobs, 'jobs')
+    finally:
+        for db in databases:
+            db.close()
+    return results
+
+
+def _videos(n: int) -> List[Dict[str, Any]]:
+    return [
+        {'word': f"word{i % 500}", 'filename': f"video{i}.mp4", 'local_path': f"/data/video{i}.mp4"}
+        for i in range(n)
+    ]
+
+
+def _print_face_cadence(results: Dict[str, Dict[str, Any]]) -> None:
+    """Throughput vs face accuracy table for bench_face_cadence results"""
+    base = results['face1']['frames_per_s']
+    print(f"\n{'Face mesh cadence':<22} | {'Frames/s':>8} | {'Speedup':>7} | {'Mesh runs':>9} | "
+          f"{'Error px':>8} | {'p95 px':>6} | {'Lost':>4}")
+    print("-" * 83)
+    for name, row in results.items():
+        error = f"{row['face_error_px']:.2f}" if row['face_error_px'] is not None else "-"
+        p95 = f"{row['face_error_p95_px']:.2f}" if row['face_error_p95_px'] is not None else "-"
+        print(f"{name:<22} | {row['frames_per_s']:>8.1f} | {row['frames_per_s'] / base:>6.2f}x | "
+              f"{row['face_mesh_share']:>9.0%} | {error:>8} | {p95:>6} | {row['face_lost']:>4}")
+    print()
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print current vs baseline per stage, return the regressed stages"""
+    current, previous = results['results'], baseline['results']
+    regressions = []
+    
+    print(f"\n{'Stage':<28} | {'Baseline (s)':>12} | {'Current (s)':>11} | {'Change':>7} |")
+    print("-" * 70)
+    for name in sorted(set(current) | set(previous)):
+        if name not in previous or name not in current:
+            status = 'new' if name not in previous else 'missing'
+            print(f"{name:<28} | {'':>12} | {'':>11} | {'':>7} | {status}")
+            continue
+        before, after = previous[name]['seconds'], current[name]['seconds']
+        change = after / before - 1 if before > 0 else 0.0
+        flag = ''
+        if change > threshold:
+            flag = 'REGRESSION'
+            regressions.append(name)
+        elif change < -threshold:
+            flag = 'faster'
+        print(f"{name:<28} | {before:>12.4f} | {after:>11.4f} | {change:>+6.0%} | {flag}")
+    
+    return regressions
+
+
+def _environment(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'cpu_count': os.cpu_count(),
+        'args': {key: _jsonable(value) for key, value in vars(args).items()},
+    }
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, list):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resolutions', nargs='+', default=['480p', '1080p'],
+                        choices=list(RESOLUTIONS))
+    parser.add_argument('--seconds', type=float, nargs='+', default=[5.0, 30.0],
+                        help="Synthetic video lengths")
+    parser.add_argument('--source-fps', type=float, default=30.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--db-jobs', type=int, default=2000)
+    parser.add_argument('--mediapipe', action='store_true',
+                        help="Also time real MediaPipe tracking on CPU")
+    parser.add_argument('--mediapipe-frames', type=int, default=100,
+                        help="Frames tracked per video by the MediaPipe stages")
+    parser.add_argument('--face-cadence', action='store_true',
+                        help="Also compare face mesh cadences (throughput vs face error)")
+    parser.add_argument('--face-videos', type=Path, nargs='+',
+                        default=[REPO_ROOT / "video-eksempler" / name
+                                 for name in ("bistandsadvokat.mp4", "argument-2.mp4")],
+                        help="Real clips for --face-cadence (synthetic videos have no face)")
+    parser.add_argument('--face-every', type=int, nargs='+', default=[3, 5, 10])
+    parser.add_argument('--face-motion', type=float, default=0.1,
+                        help="Also run each cadence with this head motion trigger (0 = skip)")
+    parser.add_argument('--quick', action='store_true',
+                        help="One short 480p video, one repeat, fewer DB jobs")
+    parser.add_argument('--output', type=Path, default=None, help="Write results JSON here")
+    parser.add_argument('--compare', type=Path, default=None, help="Baseline results JSON")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Slowdown (fraction of baseline) flagged as a regression")
+    parser.add_argument('--work-dir', type=Path,
+                        default=Path(tempfile.gettempdir()) / "nsl_bench")
+    args = parser.parse_args(argv)
+    
+    if args.quick:
+        args.resolutions, args.seconds, args.repeat, args.db_jobs = ['480p'], [5.0], 1, 500
+    
+    from loguru import logger
+    logger.remove()
+    
+    # Defaults only (no .env), so results do not depend on the local workspace
+    work_dir = args.work_dir
+    config = Config(_env_file=None, workspace_dir=work_dir / "workspace")
+    
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'Stage':<28} | {'Median (s)':>10} | {'Rate':>16}")
+    print("-" * 60)
+    
+    def report(prefix: str, stages: Dict[str, Dict[str, Any]]) -> None:
+        for stage, timing in stages.items():
+            name = f"{prefix}/{stage}" if prefix else stage
+            results[name] = timing
+            unit = 'frames' if 'frames' in timing else 'jobs'
+            print(f"{name:<28} | {timing['seconds']:>10.4f} | {timing[f'{unit}_per_s']:>9.0f} {unit}/s")
+    
+    for resolution in args.resolutions:
+        for seconds in args.seconds:
+            video = make_synthetic_video(
+                work_dir / f"synthetic_{resolution}_{seconds:g}s_{args.source_fps:g}fps.mp4",
+                RESOLUTIONS[resolution],
+                seconds=seconds,
+                fps=args.source_fps
+            )
+            report(f"{resolution}_{seconds:g}s", bench_video(video, config, args.repeat))
+    
+    if args.mediapipe:
+        video = make_synthetic_video(
+            work_dir / f"synthetic_480p_{args.mediapipe_frames / config.target_fps:g}s_{args.source_fps:g}fps.mp4",
+            RESOLUTIONS['480p'],
+            seconds=args.mediapipe_frames / config.target_fps,
+            fps=args.source_fps
+        )
+        report('480p', bench_mediapipe(video, config, args.mediapipe_frames, args.repeat))
+    
+    if args.face_cadence:
+        cadence = bench_face_cadence(
+            args.face_videos, config, args.mediapipe_frames, args.repeat, args.face_every, args.face_motion
+        )
+        report('mediapipe', cadence)
+        _print_face_cadence(cadence)
+    
+    db_dir = Path(tempfile.mkdtemp(dir=work_dir))
+    try:
+        report('', bench_db(args.db_jobs, db_dir, args.repeat))
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+    
+    output = {'environment': _environment(args), 'results': results}
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_bytes(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+        print(f"\nResults written to {args.output}")
+    
+    if args.compare:
+        baseline = orjson.loads(args.compare.read_bytes())
+        regressions = compare(output, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Synthetic videos for benchmarks.
+
+Videos are generated deterministically, so benchmark runs are comparable
+across machines without shipping large sample files.
+"""
+from pathlib import Path
+from typing import Optional, Tuple
+import cv2
+import numpy as np
+
+# Common source resolutions (width, height)
+RESOLUTIONS = {
+    '480p': (854, 480),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '2160p': (3840, 2160),
+}
+
+
+def make_synthetic_video(
+    output_path: Path,
+    size: Tuple[int, int],
+    seconds: float = 2.0,
+    fps: float = 30.0,
+    source: Optional[Path] = None
+) -> Path:
+    """
+    Write a test video of the given (width, height), reusing it if it exists.
+    
+    Args:
+        output_path: Target .mp4 path
+        size: (width, height)
+        seconds: Clip length
+        fps: Frame rate
+        source: Optional real clip to rescale (looped) instead of drawing
+    """
+    if output_path.exists():
+        return output_path
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    width, height = size
+    n_frames = max(1, int(round(seconds * fps)))
+    
+    writer = cv2.VideoWriter(
+        str(output_path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height)
+    )
+    try:
+        if source is not None:
+            for frame in _looped_frames(source, n_frames):
+                writer.write(cv2.resize(frame, (width, height), interpolation=cv2.INTER_LINEAR))
+        else:
+            for i in range(n_frames):
+                writer.write(_draw_frame(i, n_frames, width, height))
+    finally:
+        writer.release()
+    
+    return output_path
+
+
+def _looped_frames(source: Path, n_frames: int):
+    """Yield n_frames from source, rewinding when it runs out"""
+    cap = cv2.VideoCapture(str(source))
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video: {source}")
+    try:
+        produced = 0
+        while produced < n_frames:
+            ret, frame = cap.read()
+            if not ret:
+                if produced == 0:
+                    raise ValueError(f"No frames in {source}")
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                continue
+            yield frame
+            produced += 1
+    finally:
+        cap.release()
+
+
+def _draw_frame(i: int, n_frames: int, width: int, height: int) -> np.ndarray:
+    """Simple 'signer': head, torso and two hands moving on a textured background"""
+    rng = np.random.default_rng(i)
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = (90, 110, 130)
+    # Light sensor noise so encoders cannot collapse frames entirely
+    noise = rng.integers(0, 12, size=(height // 8, width // 8, 1), dtype=np.uint8)
+    frame += cv2.resize(noise, (width, height), interpolation=cv2.INTER_NEAREST)[..., None]
+    
+    s = height / 720.0
+    cx = width // 2
+    phase = 2 * np.pi * i / max(n_frames, 1)
+    skin = (140, 170, 220)
+    
+    cv2.rectangle(frame, (cx - int(150 * s), int(330 * s)), (cx + int(150 * s), height),
+                  (60, 60, 60), -1)
+    cv2.circle(frame, (cx, int(220 * s)), int(90 * s), skin, -1)
+    for side in (-1, 1):
+        hx = cx + side * int((180 + 60 * np.sin(phase * 2)) * s)
+        hy = int((430 + 80 * np.cos(phase * 3 + side)) * s)
+        cv2.circle(frame, (hx, hy), int(40 * s), skin, -1)
+    
+    return frame
@@ -157,7 +157,7 @@ def process_videos_with_preview(
     
     # Use factory
     try:
-        provider = get_tracking_provider(provider_name, min_conf)
+        provider = get_tracking_provider(provider_name, min_conf, config=config)
     except Exception as e:
         yield (f"Failed to initialize provider: {e}", None, "Error", "")
         processing_active = False
@@ -192,7 +192,9 @@ def process_videos_with_preview(
             # Process video
             tracking_results = []
             
-            for frame_idx, time_s, frame in extract_frames(video_path, target_fps):
+            for frame_idx, time_s, frame in extract_frames(
+                video_path, target_fps, target_height=config.target_height
+            ):
                 if not processing_active:
                     break
                 
@@ -249,30 +251,38 @@ def process_videos_with_preview(
             
             job_id = db.create_job(video_id)
             
-            # Save files
-            output_dir = config.tracks_dir / video_id
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            tracking_data = [r.to_dict() for r in tracking_results]
-            
-            if save_parquet:
-                save_tracking_parquet(output_dir / "tracking.parquet", tracking_data)
-            if save_jsonl:
-                save_tracking_jsonl(output_dir / "tracking.jsonl.gz", tracking_data)
-                
-            save_metadata(output_dir / "meta.json", {
-                'quality_score': quality_score,
-                'issues': issues,
-                'frames': len(tracking_results)
-            })
-            
-            # Update Job
-            db.update_job(job_id, status='done', quality_score=quality_score, frames=len(tracking_results))
+            # Hold a lease so concurrent `run` commands leave this job alone
+            from tracker_app.pipeline.runner import JobClaimer
+            with JobClaimer(db, lease_s=config.job_lease_s) as claimer:
+                claimer.claim_job(job_id)
+                try:
+                    # Save files
+                    output_dir = config.tracks_dir / video_id
+                    output_dir.mkdir(parents=True, exist_ok=True)
+                    
+                    if save_parquet:
+                        save_tracking_parquet(output_dir / "tracking.parquet", tracking_results)
+                    if save_jsonl:
+                        save_tracking_jsonl(output_dir / "tracking.jsonl.gz", tracking_results.to_records())
+                    
+                    save_metadata(output_dir / "meta.json", {
+                        'quality_score': quality_score,
+                        'issues': issues,
+                        'frames': len(tracking_results)
+                    })
+                    
+                    # Update Job
+                    db.update_job(job_id, status='done', quality_score=quality_score, frames=len(tracking_results))
+                except Exception as e:
+                    db.update_job(job_id, status='failed', error=str(e))
+                    raise
+                finally:
+                    claimer.release(job_id)
             
             # Viz
             if generate_viz:
                 from tracker_app.visualization.draw_landmarks import create_visualization_video
-                create_visualization_video(video_path, tracking_results, output_dir / "visualization.mp4")
+                create_visualization_video(video_path, tracking_results, output_dir / "visualization.mp4", target_fps=target_fps)
 
             
             results_log.append(f"[✓] {video_path.name} - Quality: {quality_score:.2f}")
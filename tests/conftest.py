@@ -0,0 +1,37 @@
+"""Shared fixtures: an isolated workspace, its database and a synthetic clip"""
+import pytest
+
+from tracker_app.config import Config
+from tracker_app.store.db import Database
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Config on an empty workspace, ignoring any .env"""
+    return Config(_env_file=None, workspace_dir=tmp_path / "workspace", inference_cache=False)
+
+
+@pytest.fixture
+def db(config):
+    database = Database(config.db_path)
+    database.init_schema()
+    yield database
+    database.close()
+
+
+@pytest.fixture(scope='session')
+def clip(tmp_path_factory):
+    """3 s synthetic 320x240 video (OpenCV)"""
+    from benchmarks.synthetic import make_synthetic_video
+    return make_synthetic_video(tmp_path_factory.mktemp('clip') / "clip.mp4", (320, 240), seconds=3)
+
+
+@pytest.fixture
+def claimed_job(db):
+    """Insert a video with a queued job and claim it, as a runner would"""
+    def make(path, word='hei'):
+        video_id = db.insert_video(word, path.name, str(path))
+        db.create_job(video_id)
+        [job] = db.claim_jobs('test', 1, word_prefix=word)
+        return job
+    return make
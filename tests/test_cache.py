@@ -0,0 +1,167 @@
+"""InferenceCache: hit, miss and eviction, alone and in process_video_job"""
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.fake_provider import FakeProvider
+from tracker_app.config import Config
+from tracker_app.pipeline.process import process_video_job, reprocess_video_job
+from tracker_app.store.cache import InferenceCache
+from tracker_app.store.disk import load_tracking_sequence
+from tracker_app.tracking.sequence import TrackingSequence
+
+
+class NoInferenceProvider(FakeProvider):
+    """Same cache key as FakeProvider, but fails if asked to track"""
+    
+    def track_frame(self, frame, frame_index, time_s):
+        raise AssertionError("tracked despite a cache hit")
+
+
+def _sequence(frames: int = 10) -> TrackingSequence:
+    provider = FakeProvider()
+    image = np.zeros((24, 32, 3), dtype=np.uint8)
+    sequence = TrackingSequence(FakeProvider.KEYPOINT_COUNTS, capacity=frames)
+    sequence.extend(provider.track_frame(image, i, i / 25) for i in range(frames))
+    return sequence
+
+
+def _put(cache: InferenceCache, key: str, last_used: float = None) -> None:
+    with cache.writer(key) as writer:
+        writer.write(_sequence())
+    cache.commit(key, {'decode': {}})
+    if last_used is not None:
+        os.utime(cache.path(key), (last_used, last_used))
+
+
+def test_miss_then_hit(tmp_path):
+    cache = InferenceCache(tmp_path, max_bytes=10**9)
+    key = cache.make_key('ab' * 20, 'fake', {'seed': 0}, 25, 720)
+    assert cache.lookup(key) is None
+    
+    _put(cache, key)
+    entry = cache.lookup(key)
+    assert entry is not None and entry.meta['decode'] == {}
+    cached = load_tracking_sequence(entry.path)
+    np.testing.assert_array_equal(cached.points('pose'), _sequence().points('pose'))
+
+
+@pytest.mark.parametrize('change', [
+    dict(sha1='cd' * 20),
+    dict(provider='mediapipe'),
+    dict(provider_params={'seed': 1}),
+    dict(target_fps=30),
+    dict(target_height=480)
+])
+def test_key_covers_tracking_settings(change):
+    settings = dict(
+        sha1='ab' * 20,
+        provider='fake',
+        provider_params={'seed': 0},
+        target_fps=25,
+        target_height=720
+    )
+    assert InferenceCache.make_key(**settings) != InferenceCache.make_key(**{**settings, **change})
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = InferenceCache(tmp_path, max_bytes=10**9, evict_interval_s=3600)
+    for i, key in enumerate(['a' * 64, 'b' * 64, 'c' * 64]):
+        _put(cache, key, last_used=1000 + i)
+    # A hit makes the oldest entry the most recently used
+    assert cache.lookup('a' * 64) is not None
+    
+    cache.max_bytes = sum(entry.size_bytes for entry in cache.entries()) - 1
+    removed = cache.evict()
+    assert [entry.key for entry in removed] == ['b' * 64]
+    assert {entry.key for entry in cache.entries()} == {'a' * 64, 'c' * 64}
+
+
+def test_commit_evicts_at_most_once_per_interval(tmp_path):
+    cache = InferenceCache(tmp_path, max_bytes=0, evict_interval_s=3600)
+    _put(cache, 'a' * 64)
+    # The first commit scans (and, with max_bytes 0, empties the cache)
+    assert cache.entries() == []
+    _put(cache, 'b' * 64)
+    assert [entry.key for entry in cache.entries()] == ['b' * 64]
+    
+    cache.evict_interval_s = 0
+    _put(cache, 'c' * 64)
+    assert cache.entries() == []
+
+
+def test_hit_skips_tracking_with_identical_output(config, db, clip, claimed_job):
+    config.inference_cache = True
+    config.chunk_frames = 16
+    miss = claimed_job(clip, word='miss')
+    process_video_job(miss, db, FakeProvider(), config, provider_name='fake')
+    
+    # Smoothing settings are not part of the key
+    config.chunk_frames = 7
+    hit = claimed_job(clip, word='hit')
+    process_video_job(hit, db, NoInferenceProvider(), config, provider_name='fake')
+    
+    outputs = [config.tracks_dir / job['video_id'] for job in (miss, hit)]
+    for name in ("tracking.parquet", "raw.parquet"):
+        first, second = (load_tracking_sequence(path / name) for path in outputs)
+        for part in ('pose', 'left_hand', 'right_hand', 'face'):
+            np.testing.assert_array_equal(first.points(part), second.points(part))
+    assert {job['status'] for job in db.get_jobs()} == {'done'}
+
+
+def test_raw_output_is_stored_once_by_default(tmp_path):
+    assert Config(_env_file=None, workspace_dir=tmp_path, inference_cache=False).save_raw
+    assert not Config(_env_file=None, workspace_dir=tmp_path, inference_cache=True).save_raw
+    assert Config(_env_file=None, workspace_dir=tmp_path, inference_cache=True, save_raw=True).save_raw
+
+
+def test_reprocess_reads_the_cache_entry(config, db, clip, claimed_job):
+    config.inference_cache = True
+    config.save_raw = False
+    job = claimed_job(clip)
+    process_video_job(job, db, FakeProvider(), config, provider_name='fake')
+    assert not (config.tracks_dir / job['video_id'] / "raw.parquet").exists()
+    
+    [done] = db.get_jobs()
+    quality_score, _, frames = reprocess_video_job(job, config)
+    assert (quality_score, frames) == (done['quality_score'], done['frames'])
+    
+    # Once evicted, reprocess reports the job as having no raw tracking
+    InferenceCache(config.cache_dir, 10**9).purge(lambda entry: True)
+    with pytest.raises(FileNotFoundError):
+        reprocess_video_job(job, config)
+
+
+def test_vanished_entry_falls_back_to_tracking(config, db, clip, claimed_job, monkeypatch):
+    config.inference_cache = True
+    process_video_job(claimed_job(clip, word='first'), db, FakeProvider(), config, provider_name='fake')
+    
+    # Another runner evicts the entry between lookup and reading it
+    lookup = InferenceCache.lookup
+    def lookup_then_evict(cache, key):
+        entry = lookup(cache, key)
+        if entry is not None:
+            cache.remove(entry)
+        return entry
+    monkeypatch.setattr(InferenceCache, 'lookup', lookup_then_evict)
+    
+    job = claimed_job(clip, word='second')
+    process_video_job(job, db, FakeProvider(), config, provider_name='fake')
+    assert {job['status'] for job in db.get_jobs()} == {'done'}
+    assert len(InferenceCache(config.cache_dir, 10**9).entries()) == 1
+
+
+def test_hash_computed_at_run_time_is_recorded(config, db, clip, claimed_job):
+    config.inference_cache = True
+    first = claimed_job(clip, word='first')
+    second = claimed_job(clip, word='second')
+    assert first['sha1'] is None and second['sha1'] is None
+    for job in (first, second):
+        process_video_job(job, db, FakeProvider(), config, provider_name='fake')
+    
+    jobs = {job['word']: job for job in db.get_jobs()}
+    assert jobs['first']['sha1'] is not None
+    # sha1 is unique: the second file is linked as a copy of the first
+    assert jobs['second']['duplicate_of'] == first['video_id']
+    assert jobs['second']['sha1'] == jobs['first']['sha1']
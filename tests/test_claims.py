@@ -0,0 +1,112 @@
+"""Job claiming: exclusivity, lease expiry and renewal (Database.claim_jobs, JobClaimer)"""
+import threading
+
+import pytest
+
+from tracker_app.pipeline.runner import JobClaimer
+from tracker_app.store.db import Database
+
+
+@pytest.fixture
+def queued(db):
+    """Insert n videos with queued jobs, return their job ids"""
+    def make(n):
+        return [
+            db.create_job(db.insert_video(f"word{i:03d}", f"{i}.mp4", f"/videos/{i}.mp4"))
+            for i in range(n)
+        ]
+    return make
+
+
+def test_concurrent_claims_are_exclusive(config, db, queued):
+    job_ids = queued(40)
+    claimed = {}
+    
+    def runner(worker_id):
+        # One Database per runner, as separate processes would have
+        runner_db = Database(config.db_path)
+        claimed[worker_id] = []
+        while jobs := runner_db.claim_jobs(worker_id, 3, lease_s=60):
+            claimed[worker_id].extend(job['id'] for job in jobs)
+        runner_db.close()
+    
+    threads = [threading.Thread(target=runner, args=(f"worker{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    all_claims = [job_id for ids in claimed.values() for job_id in ids]
+    assert sorted(all_claims) == sorted(job_ids)
+    jobs = db.get_jobs()
+    assert {job['status'] for job in jobs} == {'processing'}
+    assert {job['id']: job['worker_id'] for job in jobs} == {
+        job_id: worker_id for worker_id, ids in claimed.items() for job_id in ids
+    }
+
+
+def test_expired_lease_is_reclaimed(db, queued):
+    [job_id] = queued(1)
+    assert [job['id'] for job in db.claim_jobs('crashed', 1, lease_s=-1)] == [job_id]
+    
+    [job] = db.claim_jobs('next', 1, lease_s=60)
+    assert job['id'] == job_id and job['worker_id'] == 'next'
+    assert db.renew_leases('crashed', [job_id], 60) == 0
+
+
+def test_live_lease_is_not_reclaimed(db, queued):
+    [job_id] = queued(1)
+    db.claim_jobs('owner', 1, lease_s=60)
+    assert db.claim_jobs('other', 1, lease_s=60) == []
+    assert db.claim_jobs('other', 1, lease_s=60, status='processing') == []
+
+
+def test_renewal_keeps_the_lease(db, queued):
+    [job_id] = queued(1)
+    db.claim_jobs('owner', 1, lease_s=-1)
+    assert db.renew_leases('owner', [job_id], 60) == 1
+    assert db.claim_jobs('other', 1, lease_s=60) == []
+
+
+def test_job_without_lease_is_only_recovered_explicitly(db, queued):
+    [job_id] = queued(1)
+    # Claimed by code that does not take leases
+    assert db.claim_job(job_id)
+    assert db.claim_jobs('runner', 1) == []
+    assert [job['id'] for job in db.claim_jobs('runner', 1, status='processing')] == [job_id]
+
+
+def test_release_requeues(db, queued):
+    [job_id] = queued(1)
+    db.claim_jobs('owner', 1, lease_s=60)
+    db.release_job(job_id, 'other')
+    assert db.get_jobs()[0]['status'] == 'processing'
+    db.release_job(job_id, 'owner')
+    assert db.get_jobs()[0]['status'] == 'queued'
+
+
+def test_claimer_claims_each_job_once_per_run(db, queued):
+    job_ids = queued(2)
+    for job_id in job_ids:
+        db.update_job(job_id, status='failed', error='boom')
+    
+    with JobClaimer(db, lease_s=60, status='failed') as claimer:
+        seen = []
+        while jobs := claimer.claim(1):
+            job = jobs[0]
+            seen.append(job['id'])
+            # Fails again and goes back to its status
+            db.update_job(job['id'], status='failed', error='boom')
+            claimer.release(job['id'])
+    
+    assert sorted(seen) == sorted(job_ids)
+
+
+def test_claimer_limit_and_close(db, queued):
+    queued(3)
+    claimer = JobClaimer(db, lease_s=60, limit=2)
+    assert len(claimer.claim(5)) == 2
+    assert claimer.claim(5) == []
+    claimer.close()
+    # Jobs still held on close go back to the queue
+    assert {job['status'] for job in db.get_jobs()} == {'queued'}
@@ -0,0 +1,84 @@
+"""Config: keyword > environment > .env precedence and value parsing"""
+from pathlib import Path
+
+import pytest
+
+from tracker_app.config import Config
+
+
+@pytest.fixture
+def env_file(tmp_path):
+    """Write a .env file with the given lines, return its path"""
+    def make(*lines):
+        path = tmp_path / ".env"
+        path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+        return path
+    return make
+
+
+def test_keyword_over_environment_over_env_file(tmp_path, env_file, monkeypatch):
+    path = env_file("TARGET_FPS=20", "TARGET_HEIGHT=480")
+    monkeypatch.setenv('TARGET_FPS', '30')
+    
+    config = Config(_env_file=path, workspace_dir=tmp_path, target_fps=40)
+    assert (config.target_fps, config.target_height) == (40, 480)
+    assert Config(_env_file=path, workspace_dir=tmp_path).target_fps == 30
+    monkeypatch.delenv('TARGET_FPS')
+    assert Config(_env_file=path, workspace_dir=tmp_path).target_fps == 20
+
+
+def test_environment_names_in_any_case(tmp_path, monkeypatch):
+    monkeypatch.setenv('target_height', '360')
+    monkeypatch.setenv('Chunk_Frames', '64')
+    config = Config(_env_file=None, workspace_dir=tmp_path)
+    assert (config.target_height, config.chunk_frames) == (360, 64)
+
+
+def test_missing_env_file_is_ignored(tmp_path):
+    config = Config(_env_file=tmp_path / "missing.env", workspace_dir=tmp_path)
+    assert config.target_fps == Config.target_fps
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('true', True), ('1', True), ('yes', True), ('On', True),
+    ('false', False), ('0', False), ('no', False), ('OFF', False)
+])
+def test_bool_values(tmp_path, monkeypatch, text, expected):
+    monkeypatch.setenv('SAVE_JSONL', text)
+    assert Config(_env_file=None, workspace_dir=tmp_path).save_jsonl is expected
+
+
+@pytest.mark.parametrize('field, text', [
+    ('save_jsonl', 'maybe'),
+    ('target_fps', '25.5'),
+    ('inference_cache_max_gb', 'lots')
+])
+def test_invalid_values_raise(tmp_path, monkeypatch, field, text):
+    monkeypatch.setenv(field.upper(), text)
+    with pytest.raises(ValueError, match=field.upper()):
+        Config(_env_file=None, workspace_dir=tmp_path)
+
+
+def test_numbers_and_paths(tmp_path, env_file):
+    path = env_file(
+        f"WORKSPACE_DIR={tmp_path / 'ws'}",
+        "INFERENCE_CACHE_MAX_GB=1.5",
+        "JOB_LEASE_S=60",
+        "CACHE_DIR="
+    )
+    config = Config(_env_file=path)
+    assert config.workspace_dir == tmp_path / 'ws' and isinstance(config.workspace_dir, Path)
+    assert config.inference_cache_max_gb == 1.5
+    assert config.job_lease_s == 60
+    # An empty optional path means unset: derived from the workspace
+    assert config.cache_dir == tmp_path / 'ws' / "cache"
+
+
+def test_keyword_values_are_parsed(tmp_path):
+    config = Config(_env_file=None, workspace_dir=str(tmp_path), target_fps='30', profile='yes')
+    assert (config.workspace_dir, config.target_fps, config.profile) == (tmp_path, 30, True)
+
+
+def test_unknown_keyword_raises(tmp_path):
+    with pytest.raises(TypeError, match="target_fsp"):
+        Config(_env_file=None, workspace_dir=tmp_path, target_fsp=30)
@@ -0,0 +1,52 @@
+"""connect_provider: an unusable daemon falls back to an in-process provider"""
+import socket
+import threading
+
+import pytest
+
+from tracker_app.tracking.daemon import connect_provider, recv_message, send_message
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def daemon_socket(tmp_path):
+    """Serve one session on a Unix socket, answering the open request with respond(conn)"""
+    path = tmp_path / "daemon.sock"
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen(1)
+    
+    def serve(respond):
+        def run():
+            conn, _ = server.accept()
+            with conn:
+                recv_message(conn)
+                respond(conn)
+        threading.Thread(target=run, daemon=True).start()
+        return path
+    
+    yield serve
+    server.close()
+
+
+@pytest.mark.parametrize('respond', [
+    # Daemon of another protocol version
+    lambda conn: send_message(conn, {'error': "Protocol 2 not supported (daemon: 3)"}),
+    # Reply without the expected fields
+    lambda conn: send_message(conn, {'ok': True}),
+    # Header that is not JSON
+    lambda conn: conn.sendall(b'\x00\x00\x00\x04\x00\x00\x00\x00nope'),
+    # Connection closed mid-reply
+    lambda conn: conn.sendall(b'\x00\x00')
+], ids=['protocol', 'fields', 'garbage', 'closed'])
+def test_unusable_daemon_returns_none(daemon_socket, respond):
+    assert connect_provider(daemon_socket(respond), 'mediapipe') is None
+
+
+def test_stale_socket_file_returns_none(tmp_path):
+    path = tmp_path / "daemon.sock"
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.close()  # The file stays, nobody listens
+    assert connect_provider(path, 'mediapipe') is None
@@ -0,0 +1,78 @@
+"""Deduplication: copies of known content get their own jobs and share inference through the cache"""
+import shutil
+
+import pytest
+
+from benchmarks.fake_provider import FakeProvider
+from tracker_app.ingest.job_builder import create_jobs_from_manifest
+from tracker_app.ingest.manifest_reader import ManifestRecord
+from tracker_app.pipeline.runner import run_job
+from tracker_app.store.cache import InferenceCache
+from tracker_app.store.db import Database
+
+
+@pytest.fixture
+def ingest(db, clip, tmp_path):
+    """Ingest one file per word, all copies of the clip"""
+    def make(*words):
+        records = []
+        for word in words:
+            path = tmp_path / f"{word}.mp4"
+            shutil.copyfile(clip, path)
+            records.append(ManifestRecord(word, path.name, str(path)))
+        return create_jobs_from_manifest(db, records, probe=False)
+    return make
+
+
+def test_copies_are_queued_and_linked(db, ingest):
+    summary = ingest('a', 'b', 'c')
+    assert (summary.created, summary.copies) == (3, 2)
+    
+    jobs = {job['word']: job for job in db.get_jobs()}
+    assert {job['status'] for job in jobs.values()} == {'queued'}
+    assert jobs['b']['duplicate_of'] == jobs['c']['duplicate_of'] == jobs['a']['video_id']
+    # Copies report the content's sha1, which the original holds
+    assert jobs['a']['sha1'] and {job['sha1'] for job in jobs.values()} == {jobs['a']['sha1']}
+
+
+def test_copy_waits_while_its_content_is_tracked(db, ingest):
+    ingest('a', 'b')
+    [first] = db.claim_jobs('runner', 5, lease_s=60)
+    assert first['word'] == 'a'
+    assert db.claim_jobs('other', 5, lease_s=60) == []
+    
+    db.update_job(first['id'], status='done')
+    assert [job['word'] for job in db.claim_jobs('other', 5, lease_s=60)] == ['b']
+
+
+def test_expired_lease_does_not_hold_copies(db, ingest):
+    ingest('a', 'b')
+    db.claim_jobs('crashed', 1, lease_s=-1)
+    # Both are claimable again, but only one per content per batch
+    assert [job['word'] for job in db.claim_jobs('next', 5, lease_s=60)] == ['a']
+
+
+def test_copy_is_a_cache_hit_only_with_the_same_settings(config, db, ingest):
+    config.inference_cache = True
+    ingest('a', 'b', 'c')
+    
+    outcomes = {}
+    while jobs := db.claim_jobs('runner', 1, lease_s=60):
+        job = jobs[0]
+        provider = FakeProvider(seed=1) if job['word'] == 'c' else FakeProvider()
+        outcomes[job['word']], _ = run_job(job, db, provider, config, provider_name='fake')
+    
+    assert outcomes == {'a': 'done', 'b': 'cached', 'c': 'done'}
+    assert len(InferenceCache(config.cache_dir, 10**9).entries()) == 2
+    assert all((config.tracks_dir / job['video_id'] / "tracking.parquet").exists() for job in db.get_jobs())
+
+
+def test_duplicate_jobs_of_older_versions_are_queued(config, db, ingest):
+    ingest('a', 'b')
+    with db.get_connection() as conn:
+        conn.execute("UPDATE jobs SET status = 'duplicate' WHERE video_id IN "
+                     "(SELECT id FROM videos WHERE duplicate_of IS NOT NULL)")
+    
+    reopened = Database(config.db_path)
+    assert {job['status'] for job in reopened.get_jobs()} == {'queued'}
+    reopened.close()
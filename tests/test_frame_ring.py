@@ -0,0 +1,46 @@
+"""ring_frames: same frames as extract_frames, from one decoder process reused across videos"""
+import numpy as np
+import pytest
+
+from tracker_app.preprocess import frame_ring
+from tracker_app.preprocess.frame_ring import close_decoders, ring_frames
+from tracker_app.preprocess.video_utils import extract_frames
+
+
+@pytest.fixture
+def decoders():
+    """Idle decoder processes, stopped afterwards"""
+    yield frame_ring._idle_decoders
+    close_decoders()
+
+
+def _ring(clip, **kwargs):
+    with ring_frames(clip, 25, **kwargs) as frames:
+        return [(index, time_s, frame.copy()) for index, time_s, frame in frames]
+
+
+def _assert_same_frames(actual, expected):
+    assert [index for index, _, _ in actual] == [index for index, _, _ in expected]
+    for (_, _, a), (_, _, b) in zip(actual, expected):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_matches_extract_frames_with_one_decoder(clip, decoders):
+    expected = [(index, time_s, frame.copy()) for index, time_s, frame in extract_frames(clip, 25)]
+    _assert_same_frames(_ring(clip, slots=4), expected)
+    [decoder] = decoders
+    pid = decoder.process.pid
+    
+    _assert_same_frames(_ring(clip, slots=3, hold=2), expected)
+    assert [decoder.process.pid for decoder in decoders] == [pid]
+
+
+def test_abandoned_video_does_not_leak_into_the_next(clip, decoders):
+    with ring_frames(clip, 25, slots=3) as frames:
+        for n, _ in enumerate(frames):
+            if n == 4:
+                break
+    
+    expected = [(index, time_s, frame.copy()) for index, time_s, frame in extract_frames(clip, 25)]
+    _assert_same_frames(_ring(clip, slots=3), expected)
+    assert len(decoders) == 1
@@ -0,0 +1,73 @@
+"""process_video_job: chunked streaming against whole-video processing"""
+import gzip
+
+import numpy as np
+import orjson
+
+from benchmarks.fake_provider import FakeProvider
+from tracker_app.pipeline.process import process_video_job
+from tracker_app.store.disk import load_tracking_sequence
+from tracker_app.tracking.base import BODY_PARTS
+
+
+class LateFaceProvider(FakeProvider):
+    """Declares no keypoint counts and only finds the face after frame 40"""
+    
+    def __init__(self):
+        super().__init__()
+        self.KEYPOINT_COUNTS = {}
+    
+    def track_frame(self, frame, frame_index, time_s):
+        result = super().track_frame(frame, frame_index, time_s)
+        if frame_index < 40:
+            result.face = None
+        return result
+
+
+def _outputs(config, job):
+    output_dir = config.tracks_dir / job['video_id']
+    return {
+        'tracking': load_tracking_sequence(output_dir / "tracking.parquet"),
+        'raw': load_tracking_sequence(output_dir / "raw.parquet"),
+        'jsonl': gzip.decompress((output_dir / "tracking.jsonl.gz").read_bytes()),
+        'meta': orjson.loads((output_dir / "meta.json").read_bytes())
+    }
+
+
+def _assert_same_sequence(actual, expected):
+    assert len(actual) == len(expected)
+    np.testing.assert_array_equal(actual.frame_index, expected.frame_index)
+    for part in BODY_PARTS:
+        np.testing.assert_array_equal(actual.present(part), expected.present(part))
+        np.testing.assert_array_equal(actual.points(part), expected.points(part))
+
+
+def test_chunked_output_matches_whole_video(config, db, clip, claimed_job):
+    runs = {}
+    for chunk_frames in (0, 16, 7):
+        config.chunk_frames = chunk_frames
+        job = claimed_job(clip, word=f"chunk{chunk_frames}")
+        process_video_job(job, db, FakeProvider(), config, provider_name='fake')
+        runs[chunk_frames] = _outputs(config, job)
+    
+    whole = runs.pop(0)
+    assert whole['meta']['frames'] > 16
+    for chunked in runs.values():
+        _assert_same_sequence(chunked['tracking'], whole['tracking'])
+        _assert_same_sequence(chunked['raw'], whole['raw'])
+        assert chunked['jsonl'] == whole['jsonl']
+        for key in ('frames', 'quality_score', 'issues'):
+            assert chunked['meta'][key] == whole['meta'][key]
+    assert {job['status'] for job in db.get_jobs()} == {'done'}
+
+
+def test_part_first_seen_in_a_later_chunk(config, db, clip, claimed_job):
+    config.chunk_frames = 16
+    job = claimed_job(clip)
+    process_video_job(job, db, LateFaceProvider(), config, provider_name='fake')
+    
+    [done] = db.get_jobs()
+    assert done['status'] == 'done'
+    raw = _outputs(config, job)['raw']
+    present = raw.present('face')
+    assert present.any() and not present[raw.frame_index < 40].any()
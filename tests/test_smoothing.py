@@ -0,0 +1,85 @@
+"""SequenceSmoother against the scalar EMAFilter path it replaced, and chunked against whole"""
+import numpy as np
+import pytest
+
+from benchmarks.fake_provider import FakeProvider
+from tracker_app.postprocess.smoothing import EMAFilter, SequenceSmoother, smooth_tracking_sequence
+from tracker_app.tracking.sequence import TrackingSequence
+
+PARTS = ('pose', 'left_hand', 'right_hand')
+
+
+def _tracked(frames: int = 120) -> TrackingSequence:
+    provider = FakeProvider(dropout=0.2, jitter=0.02)
+    image = np.zeros((240, 320, 3), dtype=np.uint8)
+    sequence = TrackingSequence(FakeProvider.KEYPOINT_COUNTS, capacity=frames)
+    sequence.extend(provider.track_frame(image, i, i / 25) for i in range(frames))
+    return sequence
+
+
+def _legacy_smooth(sequence: TrackingSequence, alpha: float, min_confidence: float) -> dict:
+    """
+    The pre-vectorisation smoother: one EMAFilter per landmark coordinate,
+    low-confidence landmarks hold the last smoothed value
+    """
+    filters = {}
+    smoothed = {}
+    for part in PARTS:
+        points = sequence.points(part).astype(np.float64)
+        for frame in np.flatnonzero(sequence.present(part)):
+            for idx, (x, y, confidence) in enumerate(points[frame].tolist()):
+                fx, fy = filters.setdefault((part, idx), (EMAFilter(alpha), EMAFilter(alpha)))
+                if confidence >= min_confidence:
+                    x, y = fx.update(x, confidence), fy.update(y, confidence)
+                else:
+                    x = fx.last_value if fx.last_value is not None else x
+                    y = fy.last_value if fy.last_value is not None else y
+                points[frame, idx, :2] = x, y
+        smoothed[part] = points.astype(np.float32)
+    return smoothed
+
+
+def test_matches_legacy_smoother():
+    sequence = _tracked()
+    smoothed = smooth_tracking_sequence(sequence, ema_alpha=0.5, min_confidence=0.6)
+    expected = _legacy_smooth(sequence, 0.5, 0.6)
+    
+    for part in PARTS:
+        present = sequence.present(part)
+        np.testing.assert_array_equal(smoothed.points(part)[present], expected[part][present])
+    # Without a face alpha the face is dropped, as before
+    assert not smoothed.present('face').any()
+
+
+def test_input_is_not_modified():
+    sequence = _tracked(30)
+    before = sequence.points('pose').copy()
+    smooth_tracking_sequence(sequence, ema_alpha=0.5)
+    np.testing.assert_array_equal(sequence.points('pose'), before)
+
+
+@pytest.mark.parametrize('chunk', [1, 17, 64])
+def test_chunks_match_whole_sequence(chunk):
+    sequence = _tracked()
+    settings = dict(
+        ema_alpha=0.35,
+        ema_alpha_fingers=0.55,
+        ema_alpha_face=0.4,
+        velocity_clamp=0.01,
+        max_rotation_deg=18.0,
+        min_confidence=0.5
+    )
+    whole = SequenceSmoother(**settings).process(sequence)
+    
+    smoother = SequenceSmoother(**settings)
+    chunks = []
+    for start in range(0, len(sequence), chunk):
+        piece = TrackingSequence(FakeProvider.KEYPOINT_COUNTS, capacity=chunk)
+        piece.extend(sequence[i] for i in range(start, min(start + chunk, len(sequence))))
+        chunks.append(smoother.process(piece))
+    
+    for part in PARTS + ('face',):
+        np.testing.assert_array_equal(
+            np.concatenate([c.points(part) for c in chunks]),
+            whole.points(part)
+        )
@@ -0,0 +1,30 @@
+"""CLI startup time per subcommand against BUDGETS_MS (benchmarks/bench_startup.py)"""
+import os
+import pytest
+
+from benchmarks.bench_startup import BUDGETS_MS, REPO_ROOT, bench, cli_environment, heavy_imports
+
+# Slow or busy machines: STARTUP_BUDGET_SCALE=2 doubles every budget
+SCALE = float(os.environ.get('STARTUP_BUDGET_SCALE', '1'))
+REPEAT = 5
+
+
+@pytest.fixture(scope='module')
+def cli(tmp_path_factory):
+    with cli_environment(tmp_path_factory.mktemp('startup')) as (python, env, commands):
+        bare = bench(python + ['-c', 'pass'], env, REPO_ROOT, REPEAT)
+        yield python, env, commands, bare
+
+
+def test_cli_import_loads_no_heavy_modules(cli):
+    python, env, _, _ = cli
+    assert heavy_imports(python, env) == []
+
+
+@pytest.mark.parametrize('name', list(BUDGETS_MS))
+def test_startup_within_budget(cli, name):
+    python, env, commands, bare = cli
+    total = bench(python + ['-m', 'tracker_app'] + commands[name], env, REPO_ROOT, REPEAT)
+    own_ms = (total - bare) * 1000
+    budget = BUDGETS_MS[name] * SCALE
+    assert own_ms <= budget, f"`{name}` starts in {own_ms:.0f} ms, budget {budget:.0f} ms"
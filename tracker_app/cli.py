@@ -1,25 +1,21 @@
 import typer
 from pathlib import Path
+from typing import List
 from rich.console import Console
 from rich.table import Table
-from rich.progress import track
-from loguru import logger
 import csv
+import os
+import time
+from datetime import datetime
 
+# Only light modules at import time: commands import the provider, video
+# (OpenCV), Arrow and numpy code they need themselves, so commands such as
+# `stats` start fast (benchmarks/bench_startup.py checks the budget)
 from tracker_app.config import get_config
 from tracker_app.store.db import Database
-from tracker_app.store.disk import (
-    save_tracking_parquet,
-    save_tracking_jsonl,
-    save_metadata
-)
-from tracker_app.ingest.manifest_reader import read_manifest, ManifestRecord
-from tracker_app.ingest.job_builder import create_jobs_from_manifest
-from tracker_app.preprocess.video_utils import get_video_metadata, extract_frames
-from tracker_app.postprocess.smoothing import smooth_tracking_sequence
-from tracker_app.postprocess.quality import compute_quality_score
 from tracker_app.utils.logging_setup import setup_logging
-from tracker_app.tracking.factory import get_tracking_provider
+from tracker_app.utils.profiling import PROFILE_FORMATS, job_profiler
+from tracker_app.pipeline.timing import STAGES
 
 # Deleted old get_provider function here
 
@@ -40,26 +36,42 @@ def init_db():
 @app.command()
 def ingest(
     csv_path: Path = typer.Argument(..., help="Path to manifest CSV"),
-    dry_run: bool = typer.Option(False, help="Don't write to database")
+    dry_run: bool = typer.Option(False, help="Don't write to database"),
+    dedup: bool = typer.Option(None, help="Hash files and skip copies of known videos (default: INGEST_DEDUPLICATE)"),
+    probe: bool = typer.Option(None, help="Probe duration/fps/size and fail unreadable files (default: INGEST_PROBE)")
 ):
     """Ingest manifest CSV and create jobs"""
     config = get_config()
     setup_logging(config.log_level)
     
+    from tracker_app.ingest.manifest_reader import read_manifest
+    from tracker_app.ingest.job_builder import create_jobs_from_manifest
+    
     console.print(f"Reading manifest: {csv_path}")
     records = read_manifest(csv_path)
     console.print(f"Found {len(records)} videos")
     
+    db = Database(config.db_path)
     if dry_run:
         console.print("[yellow]Dry run - not writing to database[/yellow]")
-        return
-    
-    db = Database(config.db_path)
-    created, existing, missing = create_jobs_from_manifest(db, records)
+        if not config.db_path.exists():
+            db = None  # Nothing ingested yet; don't create the file
+    
+    summary = create_jobs_from_manifest(
+        db,
+        records,
+        dry_run=dry_run,
+        io_workers=config.ingest_io_workers,
+        deduplicate=config.ingest_deduplicate if dedup is None else dedup,
+        probe=config.ingest_probe if probe is None else probe,
+        probe_workers=config.ingest_probe_workers
+    )
     
-    console.print(f"[green]✓[/green] Created {created} new jobs")
-    console.print(f"[yellow]![/yellow] {existing} existing videos (skipped)")
-    console.print(f"[red]✗[/red] {missing} missing files")
+    console.print(f"[green]✓[/green] {'Would create' if dry_run else 'Created'} {summary.created} new jobs")
+    console.print(f"[yellow]![/yellow] {summary.existing} existing videos (skipped)")
+    console.print(f"[cyan]=[/cyan] {summary.copies} copies of known content (inference shared through the cache)")
+    console.print(f"[red]✗[/red] {summary.missing} missing files")
+    console.print(f"[red]✗[/red] {summary.unreadable} unreadable videos (jobs failed at ingest)")
 
 
 @app.command()
@@ -67,11 +79,17 @@ def process_video(
     video_path: Path = typer.Argument(..., help="Path to single video file"),
     word: str = typer.Option("unknown", help="Word label for the video"),
     visualize: bool = typer.Option(False, help="Generate debug video"),
-    provider: str = typer.Option("mediapipe", help="Tracking provider (mediapipe/rtmpose)")
+    provider: str = typer.Option("mediapipe", help="Tracking provider (mediapipe/rtmpose)"),
+    batch_size: int = typer.Option(None, help="Frames per provider call (default: BATCH_SIZE)"),
+    profile: bool = typer.Option(False, help="Write a profile of the job next to meta.json"),
+    profile_format: str = typer.Option(None, help="collapsed (flamegraph stacks) or cprofile (default: PROFILE_FORMAT)")
 ):
     """Process a single video file directly (bypass jobs table for testing)"""
     config = get_config()
     setup_logging(config.log_level)
+    if batch_size:
+        config.batch_size = batch_size
+    _apply_profile_options(config, profile, profile_format)
     
     # Mock a job dictionary
     job = {
@@ -83,11 +101,11 @@ def process_video(
     }
     
     # We need a DB instance passing even if we don't strictly use it for keeping state effectively
-    # But _process_video expects it to update status. 
+    # But process_video_job expects it to update status. 
     # Let's create a temporary in-memory DB or just reuse main DB but insert a dummy job if needed.
     # Actually, let's just use the main logic but careful about the DB calls.
     
-    # To keep it simple and reuse _process_video, we should probably insert this into the DB first.
+    # To keep it simple and reuse process_video_job, we should probably insert this into the DB first.
     db = Database(config.db_path)
     # Ensure DB is init
     if not config.db_path.exists():
@@ -110,19 +128,45 @@ def process_video(
         job['id'] = job_id
         job['video_id'] = video_id
         
-        provider_instance = get_tracking_provider(provider, config.min_detection_confidence)
+        from tracker_app.tracking.factory import get_tracking_provider
+        from tracker_app.pipeline.process import process_video_job
+        from tracker_app.pipeline.runner import JobClaimer
+        
+        provider_instance = get_tracking_provider(provider, config.min_detection_confidence, config=config)
         
-        try:
-            _process_video(job, db, provider_instance, config, visualize, provider_name=provider)
-            console.print(f"[green]✓[/green] Successfully processed {video_path}")
-        finally:
-            provider_instance.close()
+        # Hold a lease so concurrent `run` commands leave this job alone
+        with JobClaimer(db, lease_s=config.job_lease_s) as claimer:
+            claimer.claim_job(job_id)
+            try:
+                with job_profiler(job, config):
+                    process_video_job(job, db, provider_instance, config, visualize, provider_name=provider)
+                console.print(f"[green]✓[/green] Successfully processed {video_path}")
+            except Exception as e:
+                db.update_job(job_id, status='failed', error=str(e))
+                raise
+            finally:
+                claimer.release(job_id)
+                provider_instance.close()
             
     except Exception as e:
         console.print(f"[red]Error processing video:[/red] {e}")
         raise e
 
 
+def _apply_profile_options(config, profile: bool, profile_format: str = None, profile_sample: float = None) -> None:
+    """Apply --profile options to config (workers get a copy of it)"""
+    if profile:
+        config.profile = True
+    if profile_format is not None:
+        config.profile_format = profile_format
+    if profile_sample is not None:
+        config.profile_sample = profile_sample
+    if config.profile_format not in PROFILE_FORMATS:
+        raise typer.BadParameter(
+            f"Unknown profile format {config.profile_format!r}, expected one of: {', '.join(PROFILE_FORMATS)}"
+        )
+
+
 @app.command()
 def run(
     limit: int = typer.Option(None, help="Max jobs to process"),
@@ -130,148 +174,132 @@ def run(
     word_prefix: str = typer.Option(None, help="Filter by word prefix"),
     resume: bool = typer.Option(False, help="Skip already done jobs"),
     visualize: bool = typer.Option(False, help="Generate debug videos"),
-    provider: str = typer.Option("mediapipe", help="Tracking provider (mediapipe/rtmpose)")
+    provider: str = typer.Option("mediapipe", help="Tracking provider (mediapipe/rtmpose)"),
+    workers: int = typer.Option(1, help="Worker processes, each with its own provider"),
+    batch_size: int = typer.Option(None, help="Frames per provider call (default: BATCH_SIZE)"),
+    profile: bool = typer.Option(False, help="Write a profile of each sampled job next to its meta.json"),
+    profile_format: str = typer.Option(None, help="collapsed (flamegraph stacks) or cprofile (default: PROFILE_FORMAT)"),
+    profile_sample: float = typer.Option(None, help="Fraction of jobs to profile (default: PROFILE_SAMPLE)")
 ):
     """Process video tracking jobs"""
     config = get_config()
     setup_logging(config.log_level)
+    if batch_size:
+        config.batch_size = batch_size
+    _apply_profile_options(config, profile, profile_format, profile_sample)
     
     db = Database(config.db_path)
     
-    # Get jobs
-    jobs = db.get_jobs(status=status, word_prefix=word_prefix, limit=limit)
+    # Jobs are claimed one at a time as workers free up, so other runners
+    # can share the queue; this count is only for progress
+    total = db.count_claimable_jobs(status=status, word_prefix=word_prefix)
+    if limit:
+        total = min(total, limit)
     
-    if not jobs:
+    if not total:
         console.print("[yellow]No jobs found matching criteria[/yellow]")
         return
     
-    console.print(f"Processing {len(jobs)} jobs...")
+    workers = max(1, min(workers, total))
+    console.print(f"Processing {total} jobs with {workers} worker(s)...")
     
-    # Initialize tracking provider (reuse across videos)
-    provider_instance = get_tracking_provider(provider, config.min_detection_confidence)
+    counts = {'done': 0, 'cached': 0, 'failed': 0}
     
-    success_count = 0
-    fail_count = 0
+    from tracker_app.pipeline.runner import JobClaimer, run_jobs_sequential, run_jobs_parallel
+    from rich.progress import Progress
     
-    try:
-        for job in track(jobs, description="Processing"):
-            try:
-                # Process single video
-                _process_video(job, db, provider_instance, config, visualize, provider_name=provider)
-                success_count += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to process {job['word']}/{job['filename']}: {e}")
-                db.update_job(
-                    job['id'],
-                    status='failed',
-                    error=str(e)
+    with JobClaimer(
+        db,
+        lease_s=config.job_lease_s,
+        status=status,
+        word_prefix=word_prefix,
+        limit=limit
+    ) as claimer:
+        if workers > 1:
+            outcomes = run_jobs_parallel(claimer, provider, config, workers, visualize)
+        else:
+            outcomes = run_jobs_sequential(claimer, provider, config, visualize)
+        
+        # Progress is aggregated here as jobs finish on any worker
+        with Progress(console=console) as progress:
+            task = progress.add_task("Processing", total=total)
+            for job, outcome in outcomes:
+                counts[outcome] += 1
+                progress.update(
+                    task,
+                    advance=1,
+                    description=f"Processing ([green]{counts['done'] + counts['cached']} ok[/green], "
+                                f"[red]{counts['failed']} failed[/red])"
                 )
-                fail_count += 1
     
-    finally:
-        provider_instance.close()
-    
-    console.print(f"\n[green]✓[/green] Success: {success_count}")
-    console.print(f"[red]✗[/red] Failed: {fail_count}")
+    console.print(f"\n[green]✓[/green] Success: {counts['done'] + counts['cached']}")
+    console.print(f"[cyan]=[/cyan] Inference runs avoided (cache hits): {counts['cached']}")
+    console.print(f"[red]✗[/red] Failed: {counts['failed']}")
 
 
-def _process_video(job, db, provider, config, visualize=False, provider_name='mediapipe'):
-    """Process single video job"""
-    video_path = Path(job['local_path'])
-    video_id = job['video_id']
-    job_id = job['id']
-    
-    # Update status
-    db.update_job(job_id, status='processing')
-    
-    # Track frames
-    logger.info(f"Tracking: {job['word']}/{job['filename']}")
-    results = []
-    
-    for frame_idx, time_s, frame in extract_frames(video_path, config.target_fps):
-        result = provider.track_frame(frame, frame_idx, time_s)
-        results.append(result)
-    
-    if not results:
-        raise ValueError("No frames extracted")
-    
-    # Smooth
-    results = smooth_tracking_sequence(
-        results,
-        ema_alpha=config.ema_alpha_wrist,
-        min_confidence=config.min_detection_confidence
-    )
-    
-    # Quality score
-    quality_score, issues = compute_quality_score(results)
-    
-    # Save to disk
-    output_dir = config.tracks_dir / video_id
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Convert to dicts
-    tracking_data = [r.to_dict() for r in results]
-    
-    # Save both formats
-    if config.save_parquet:
-        save_tracking_parquet(
-            output_dir / "tracking.parquet",
-            tracking_data
-        )
-    
-    if config.save_jsonl:
-        save_tracking_jsonl(
-            output_dir / "tracking.jsonl.gz",
-            tracking_data
-        )
-    
-    # Metadata
-    metadata = {
-        'word': job['word'],
-        'filename': job['filename'],
-        'video_path': str(video_path),
-        'quality_score': quality_score,
-        'issues': issues,
-        'frames': len(results),
-        'tracking_provider': provider_name,
-        'format_version': 'v1'
-    }
-    save_metadata(output_dir / "meta.json", metadata)
-    
-    # Update database
-    db.update_job(
-        job_id,
-        status='done',
-        quality_score=quality_score,
-        frames=len(results),
-        tracking_provider=provider_name,
-        output_format='parquet+jsonl' if config.save_parquet and config.save_jsonl else 'jsonl'
-    )
+@app.command()
+def reprocess(
+    word_prefix: str = typer.Option(None, help="Filter by word prefix"),
+    limit: int = typer.Option(None, help="Max jobs to reprocess"),
+    workers: int = typer.Option(os.cpu_count() or 1, help="Worker processes"),
+    commit_every: int = typer.Option(500, help="Jobs per database transaction")
+):
+    """Recompute smoothing and quality of done jobs from raw tracking (no inference)"""
+    config = get_config()
+    setup_logging(config.log_level)
     
-    # Record quality issues
-    for issue in issues:
-        db.add_quality_issue(
-            job_id,
-            issue_type=issue.get('type', 'unknown'),
-            severity=issue.get('severity', 'info'),
-            details=str(issue)
-        )
+    db = Database(config.db_path)
+    jobs = db.get_jobs(status='done', word_prefix=word_prefix, limit=limit)
+    if not jobs:
+        console.print("[yellow]No jobs found matching criteria[/yellow]")
+        return
     
-    # Visualize if requested
-    if visualize:
-        from tracker_app.visualization.draw_landmarks import create_visualization_video
-        viz_path = output_dir / "visualization.mp4"
-        create_visualization_video(video_path, results, viz_path)
-        logger.info(f"Visualization saved: {viz_path}")
+    workers = max(1, min(workers, len(jobs)))
+    console.print(f"Reprocessing {len(jobs)} jobs with {workers} worker(s)...")
+    
+    counts = {'done': 0, 'no_raw': 0, 'failed': 0}
+    pending = []
+    
+    from tracker_app.pipeline.runner import reprocess_jobs
+    from rich.progress import Progress
+    
+    with Progress(console=console) as progress:
+        task = progress.add_task("Reprocessing", total=len(jobs))
+        for job, outcome, result, _ in reprocess_jobs(jobs, config, workers):
+            counts[outcome] += 1
+            if result is not None:
+                quality_score, issues, frames = result
+                pending.append((job['id'], quality_score, frames, issues))
+            if len(pending) >= commit_every:
+                db.update_quality_bulk(pending)
+                pending.clear()
+            progress.update(
+                task,
+                advance=1,
+                description=f"Reprocessing ([green]{counts['done']} ok[/green], "
+                            f"[red]{counts['failed']} failed[/red])"
+            )
+        if pending:
+            db.update_quality_bulk(pending)
+    
+    console.print(f"\n[green]✓[/green] Rescored: {counts['done']}")
+    console.print(f"[yellow]![/yellow] No raw tracking (run again to record it): {counts['no_raw']}")
+    console.print(f"[red]✗[/red] Failed: {counts['failed']}")
 
 
 @app.command()
-def stats():
+def stats(
+    perf: bool = typer.Option(False, help="Show per-stage latency percentiles of done jobs"),
+    word_prefix: str = typer.Option(None, help="Filter --perf by word prefix")
+):
     """Show processing statistics"""
     config = get_config()
     db = Database(config.db_path)
     
+    if perf:
+        _print_perf(db, word_prefix)
+        return
+    
     stats = db.get_stats()
     
     # Status table
@@ -294,6 +322,51 @@ def stats():
     console.print(f"\n[bold]Total Videos:[/bold] {stats['total_videos']}")
 
 
+def _print_perf(db: Database, word_prefix: str = None) -> None:
+    """Per provider and stage: job latency percentiles, CPU share and throughput"""
+    groups = {}
+    for row in db.get_job_timings(word_prefix):
+        groups.setdefault((row['tracking_provider'] or 'unknown', row['stage']), []).append(row)
+    
+    if not groups:
+        console.print("[yellow]No stage timings recorded yet[/yellow]")
+        return
+    
+    table = Table(title="Stage Timings (done jobs)")
+    table.add_column("Provider", style="cyan", no_wrap=True)
+    table.add_column("Stage", style="cyan", no_wrap=True)
+    table.add_column("Jobs", justify="right")
+    for column in ("p50 ms", "p90 ms", "p99 ms", "CPU/wall", "Frames/s"):
+        table.add_column(column, justify="right", style="green")
+    
+    order = {stage: i for i, stage in enumerate(STAGES)}
+    for provider, stage in sorted(groups, key=lambda key: (key[0], order.get(key[1], len(order)), key[1])):
+        rows = groups[(provider, stage)]
+        wall = sorted(row['wall_s'] * 1000 for row in rows)
+        p50, p90, p99 = (_percentile(wall, q) for q in (50, 90, 99))
+        total_wall = sum(wall) / 1000
+        total_cpu = sum(row['cpu_s'] or 0.0 for row in rows)
+        frames = sum(row['frames'] or 0 for row in rows)
+        table.add_row(
+            provider,
+            stage,
+            str(len(rows)),
+            *(f"{ms:.1f}" if ms < 100 else f"{ms:.0f}" for ms in (p50, p90, p99)),
+            f"{total_cpu / total_wall:.2f}" if total_wall > 0 else "-",
+            f"{frames / total_wall:.0f}" if total_wall > 0 else "-"
+        )
+    
+    console.print(table)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Linear-interpolated percentile of sorted values (numpy's default; numpy alone doubles startup)"""
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
 @app.command()
 def export_index(
     output_dir: Path = typer.Option(None, help="Output directory (default: exports)")
@@ -319,7 +392,8 @@ def export_index(
             'video_id': job['video_id'],
             'quality_score': job['quality_score'],
             'frames': job['frames'],
-            'tracking_path': str(config.tracks_dir / job['video_id'])
+            'tracking_path': str(config.tracks_dir / job['video_id']),
+            'duplicate_of': job['duplicate_of']
         })
     
     # Save JSON
@@ -329,10 +403,11 @@ def export_index(
         f.write(orjson.dumps(index_data, option=orjson.OPT_INDENT_2))
     
     # Save CSV
-    import pandas as pd
-    df = pd.DataFrame(index_data)
     csv_path = output_dir / "index.csv"
-    df.to_csv(csv_path, index=False)
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(index_data[0]) if index_data else [])
+        writer.writeheader()
+        writer.writerows(index_data)
     
     console.print(f"[green]✓[/green] Exported {len(index_data)} entries")
     console.print(f"  JSON: {json_path}")
@@ -358,7 +433,8 @@ def visualize(
     video_path = Path(job['local_path'])
     
     # Load tracking data
-    from tracker_app.store.disk import load_tracking_parquet
+    from tracker_app.store.disk import load_tracking_sequence
+    from tracker_app.visualization.draw_landmarks import create_visualization_video
     tracking_path = config.tracks_dir / job['video_id'] / "tracking.parquet"
     
     if not tracking_path.exists():
@@ -366,17 +442,201 @@ def visualize(
         return
     
     console.print(f"Loading tracking data from {tracking_path}")
-    df = load_tracking_parquet(tracking_path)
+    results = load_tracking_sequence(tracking_path)
+    
+    output = output or tracking_path.parent / "visualization.mp4"
+    create_visualization_video(video_path, results, output, target_fps=config.target_fps)
+    console.print(f"[green]✓[/green] Visualization saved: {output}")
+
+
+cache_app = typer.Typer(help="Inspect and purge the inference cache")
+app.add_typer(cache_app, name="cache")
+
+
+def _inference_cache(config):
+    from tracker_app.store.cache import InferenceCache
+    return InferenceCache(config.cache_dir, int(config.inference_cache_max_gb * 1e9))
+
+
+@cache_app.command("info")
+def cache_info(
+    list_entries: bool = typer.Option(False, "--list", help="List every entry")
+):
+    """Show inference cache size and contents"""
+    config = get_config()
+    cache = _inference_cache(config)
+    entries = cache.entries()
+    
+    total = sum(entry.size_bytes for entry in entries)
+    console.print(f"Cache: {cache.root}")
+    console.print(
+        f"[bold]{len(entries)}[/bold] entries, {total / 1e9:.2f} GB "
+        f"of {config.inference_cache_max_gb:g} GB"
+    )
+    
+    # Per provider configuration
+    table = Table(title="By Provider")
+    table.add_column("Provider", style="cyan", no_wrap=True)
+    table.add_column("Entries", justify="right")
+    table.add_column("Frames", justify="right")
+    table.add_column("Size (MB)", justify="right", style="green")
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(entry.meta.get('provider', '?'), [0, 0, 0])
+        group[0] += 1
+        group[1] += entry.meta.get('frames', 0)
+        group[2] += entry.size_bytes
+    for provider, (count, frames, size) in sorted(groups.items()):
+        table.add_row(provider, str(count), str(frames), f"{size / 1e6:.1f}")
+    console.print(table)
+    
+    if list_entries:
+        table = Table(title="Entries (least recently used first)")
+        table.add_column("Key", style="cyan")
+        table.add_column("Video SHA1")
+        table.add_column("Provider")
+        table.add_column("FPS / Height", justify="right")
+        table.add_column("Frames", justify="right")
+        table.add_column("Size (MB)", justify="right", style="green")
+        table.add_column("Last Used")
+        for entry in entries:
+            meta = entry.meta
+            table.add_row(
+                entry.key[:12],
+                (meta.get('sha1') or '?')[:12],
+                meta.get('provider', '?'),
+                f"{meta.get('target_fps')} / {meta.get('target_height')}",
+                str(meta.get('frames', '?')),
+                f"{entry.size_bytes / 1e6:.1f}",
+                datetime.fromtimestamp(entry.last_used).strftime('%Y-%m-%d %H:%M')
+            )
+        console.print(table)
+
+
+@cache_app.command("purge")
+def cache_purge(
+    all_entries: bool = typer.Option(False, "--all", help="Remove every entry"),
+    provider: str = typer.Option(None, help="Only entries of this provider"),
+    older_than_days: float = typer.Option(None, help="Only entries unused for this many days"),
+    dry_run: bool = typer.Option(False, help="Only report what would be removed")
+):
+    """Remove inference cache entries"""
+    if not (all_entries or provider or older_than_days is not None):
+        console.print("[red]Give --all, --provider or --older-than-days[/red]")
+        raise typer.Exit(1)
+    
+    config = get_config()
+    cache = _inference_cache(config)
+    cutoff = time.time() - older_than_days * 86400 if older_than_days is not None else None
+    
+    def matches(entry) -> bool:
+        if provider and entry.meta.get('provider') != provider:
+            return False
+        return cutoff is None or entry.last_used < cutoff
+    
+    if dry_run:
+        removed = [entry for entry in cache.entries() if matches(entry)]
+    else:
+        removed = cache.purge(matches)
+    
+    freed = sum(entry.size_bytes for entry in removed)
+    console.print(
+        f"[green]✓[/green] {'Would remove' if dry_run else 'Removed'} "
+        f"{len(removed)} entries ({freed / 1e6:.1f} MB)"
+    )
+
+
+daemon_app = typer.Typer(help="Warm tracking provider daemon shared by CLI commands and the GUI")
+app.add_typer(daemon_app, name="daemon")
+
+
+@daemon_app.callback()
+def daemon_platform_check():
+    """Runs before every daemon command: the daemon needs Unix domain sockets (not on Windows)"""
+    import socket
+    if not hasattr(socket, 'AF_UNIX'):
+        console.print("[red]The provider daemon needs Unix domain sockets, which this platform lacks[/red]")
+        raise typer.Exit(1)
+
+
+@daemon_app.command("start")
+def daemon_start(
+    preload: List[str] = typer.Option(None, help="Provider to load at startup (repeatable)"),
+    socket_path: Path = typer.Option(None, "--socket", help="Unix socket (default: PROVIDER_DAEMON_SOCKET)")
+):
+    """Run the provider daemon in the foreground (Ctrl+C or `daemon stop` to end)"""
+    config = get_config()
+    setup_logging(config.log_level)
+    from tracker_app.tracking.daemon import ProviderDaemon, provider_key
+    from tracker_app.tracking.factory import provider_options
     
-    # Convert back only what's needed for visualization (simplified)
-    # Ideally we reconstruct TrackingResult objects
-    # But for now, let's just implement a quick reader or ensure create_visualization_video handles df?
-    # No, create_visualization_video expects List[TrackingResult].
-    # We need to reconstruct.
+    socket_path = socket_path or config.provider_daemon_socket
+    try:
+        server = ProviderDaemon(socket_path)
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
     
-    # Lazy reconstruction - in real usage we would have a deserializer
-    # For now, let's warn that this is not fully implemented in CLI without deserializer
-    console.print("[yellow]Visualization from disk not fully implemented in CLI yet. Use --visualize flag during run/process-video instead.[/yellow]")
+    try:
+        for name in preload or []:
+            server.preload(provider_key(name, config.min_detection_confidence, provider_options(config)))
+        console.print(f"[green]✓[/green] Provider daemon listening on {socket_path}")
+        if not config.provider_daemon:
+            console.print("[yellow]Commands use it only with PROVIDER_DAEMON=true[/yellow]")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        console.print("Provider daemon stopped")
+
+
+@daemon_app.command("status")
+def daemon_status(
+    socket_path: Path = typer.Option(None, "--socket", help="Unix socket (default: PROVIDER_DAEMON_SOCKET)")
+):
+    """Show whether a daemon is running and its warm providers"""
+    config = get_config()
+    from tracker_app.tracking.daemon import daemon_request
+    
+    socket_path = socket_path or config.provider_daemon_socket
+    try:
+        status = daemon_request(socket_path, 'status')
+    except OSError:
+        console.print(f"[yellow]No provider daemon at {socket_path}[/yellow]")
+        raise typer.Exit(1)
+    
+    console.print(f"Provider daemon at {socket_path} (pid {status['pid']}), {status['sessions']} active session(s)")
+    table = Table(title="Idle Providers")
+    table.add_column("Provider", style="cyan")
+    table.add_column("Min Confidence", justify="right")
+    table.add_column("Options")
+    table.add_column("Idle", justify="right", style="green")
+    for entry in status['providers']:
+        table.add_row(
+            entry['provider'],
+            f"{entry['min_confidence']:g}",
+            ", ".join(f"{key}={value}" for key, value in entry['options'].items()),
+            str(entry['idle'])
+        )
+    console.print(table)
+
+
+@daemon_app.command("stop")
+def daemon_stop(
+    socket_path: Path = typer.Option(None, "--socket", help="Unix socket (default: PROVIDER_DAEMON_SOCKET)")
+):
+    """Stop a running daemon (clients still connected lose their session)"""
+    config = get_config()
+    from tracker_app.tracking.daemon import daemon_request
+    
+    socket_path = socket_path or config.provider_daemon_socket
+    try:
+        daemon_request(socket_path, 'shutdown')
+    except OSError:
+        console.print(f"[yellow]No provider daemon at {socket_path}[/yellow]")
+        raise typer.Exit(1)
+    console.print(f"[green]✓[/green] Provider daemon stopped")
 
 
 if __name__ == "__main__":
@@ -1,10 +1,20 @@
+import os
 from pathlib import Path
-from typing import Optional
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict, Optional, Union
 
+_TRUE = ('1', 'true', 't', 'yes', 'y', 'on')
+_FALSE = ('0', 'false', 'f', 'no', 'n', 'off')
 
-class Config(BaseSettings):
-    """Application configuration"""
+
+class Config:
+    """
+    Application configuration.
+    
+    Each field can be set by keyword argument, by an environment variable
+    of the same name in any case (TARGET_FPS), or in .env, in that order
+    of precedence. Parsed here rather than with pydantic-settings, whose
+    import alone took more than half the startup time of `stats`.
+    """
     
     # Paths
     workspace_dir: Path = Path("D:/tegnspråk/workspace")
@@ -13,15 +23,35 @@ class Config(BaseSettings):
     exports_dir: Optional[Path] = None
     db_path: Optional[Path] = None
     
+    # Ingest
+    ingest_io_workers: int = 32  # Threads checking and hashing manifest files (network shares are latency bound)
+    ingest_deduplicate: bool = True  # Hash files at ingest; copies of known content share its inference (cache)
+    ingest_probe: bool = True  # Probe files at ingest (duration/fps/size); unreadable files fail there
+    ingest_probe_workers: int = 8  # Concurrent ffprobe (or OpenCV) probes
+    
     # Video processing
     target_fps: int = 25
-    target_height: int = 720
+    target_height: int = 720  # Frames taller than this are downscaled at decode (0 = off)
     enable_normalization: bool = False  # Set True if videos vary greatly
+    decode_queue_depth: int = 8  # Frames decoded ahead on a background thread (0 = inline)
+    decode_process: bool = False  # Decode in a child process instead (one per runner), passing frames through a shared-memory ring
+    chunk_frames: int = 256  # Frames smoothed, scored and written per chunk (0 = whole video)
     
     # Tracking
     tracking_provider: str = "mediapipe"
     min_detection_confidence: float = 0.5
     min_tracking_confidence: float = 0.5
+    batch_size: int = 1  # Frames per provider call (track_batch)
+    mediapipe_concurrent_models: bool = False  # Run pose/hands/face mesh in parallel threads
+    mediapipe_face_every: int = 1  # Run face mesh at least every N frames, holding the face in between (1 = every frame)
+    mediapipe_face_motion: float = 0.0  # With MEDIAPIPE_FACE_EVERY > 1, also run it once the head moved this many ear-to-ear distances (0 = off)
+    provider_daemon: bool = False  # Use warm providers of a running `daemon start` (not with run --workers > 1)
+    provider_daemon_socket: Optional[Path] = None  # Default: workspace_dir/provider-daemon.sock
+    job_lease_s: int = 300  # Runner lease on a claimed job, renewed while it runs; expired jobs are reclaimed
+    
+    # Inference cache (raw provider output in cache_dir, reused when only smoothing/scoring change)
+    inference_cache: bool = True
+    inference_cache_max_gb: float = 50.0  # Least recently used entries are evicted above this
     
     # Smoothing
     ema_alpha_wrist: float = 0.35
@@ -32,21 +62,38 @@ class Config(BaseSettings):
     # Output
     save_parquet: bool = True
     save_jsonl: bool = True  # For debugging
+    save_raw: Optional[bool] = None  # raw.parquet (unsmoothed) for `reprocess`; default: only without INFERENCE_CACHE, whose entry serves instead
     
     # Quality
     min_quality_score: float = 0.5
     
+    # Profiling (--profile on run/process-video): written next to meta.json
+    profile: bool = False
+    profile_format: str = "collapsed"  # collapsed (sampled stacks, flamegraph input) or cprofile (pstats)
+    profile_sample: float = 1.0  # Fraction of jobs profiled, chosen by job id
+    profile_interval_ms: float = 5.0  # Stack sampling interval (collapsed)
+    
     # Logging
     log_level: str = "INFO"
     log_dir: Optional[Path] = None
     
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8"
-    )
-    
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+    def __init__(self, _env_file: Optional[Union[str, Path]] = ".env", **kwargs):
+        fields = Config.__annotations__
+        unknown = set(kwargs) - set(fields)
+        if unknown:
+            raise TypeError(f"Unknown config field(s): {', '.join(sorted(unknown))}")
+        
+        env = _read_env_file(_env_file) if _env_file else {}
+        env.update((key.lower(), value) for key, value in os.environ.items())
+        for name, annotation in fields.items():
+            if name in kwargs:
+                value = _parse(name, annotation, kwargs[name])
+            elif name in env:
+                value = _parse(name, annotation, env[name])
+            else:
+                value = getattr(Config, name)
+            setattr(self, name, value)
+        
         # Auto-derive paths
         if self.cache_dir is None:
             self.cache_dir = self.workspace_dir / "cache"
@@ -58,6 +105,10 @@ class Config(BaseSettings):
             self.db_path = self.workspace_dir / "tracker.db"
         if self.log_dir is None:
             self.log_dir = self.workspace_dir / "logs"
+        if self.provider_daemon_socket is None:
+            self.provider_daemon_socket = self.workspace_dir / "provider-daemon.sock"
+        if self.save_raw is None:
+            self.save_raw = not self.inference_cache
         
         # Ensure directories exist
         for path in [self.workspace_dir, self.cache_dir, self.tracks_dir, 
@@ -65,6 +116,37 @@ class Config(BaseSettings):
             path.mkdir(parents=True, exist_ok=True)
 
 
+def _read_env_file(path: Union[str, Path]) -> Dict[str, str]:
+    """KEY=value pairs of a .env file (lower-cased keys); empty if it doesn't exist"""
+    if not Path(path).is_file():
+        return {}
+    from dotenv import dotenv_values
+    return {key.lower(): value for key, value in dotenv_values(path).items() if value is not None}
+
+
+def _parse(name: str, annotation, value):
+    """Convert a keyword or environment value to the field's type"""
+    kind = annotation
+    if getattr(annotation, '__origin__', None) is Union:
+        if value is None or value == '':
+            return None
+        kind = next(arg for arg in annotation.__args__ if arg is not type(None))
+    if isinstance(value, kind) and not (kind is int and isinstance(value, bool)):
+        return value
+    if kind is bool:
+        text = str(value).strip().lower()
+        if text in _TRUE:
+            return True
+        if text in _FALSE:
+            return False
+    else:
+        try:
+            return kind(value)
+        except (TypeError, ValueError):
+            pass
+    raise ValueError(f"Invalid value for {name.upper()}: {value!r} (expected {kind.__name__})")
+
+
 # Global config instance
 _config: Optional[Config] = None
 
@@ -1,48 +1,208 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
 from loguru import logger
 from tracker_app.store.db import Database
 from tracker_app.ingest.manifest_reader import ManifestRecord
+from tracker_app.utils.hashing import sha1_file
+
+def _exist(paths: List[str]) -> List[bool]:
+    return [os.path.exists(path) for path in paths]
+
+def check_files_exist(paths: Iterable[str], workers: int = 32, batch_size: int = 64) -> List[bool]:
+    """
+    Check which files exist, with concurrent stat calls.
+    Paths are checked in batches so a local stat is not dwarfed by
+    the per-task overhead of the pool.
+    Returns one bool per path, in input order.
+    """
+    paths = list(paths)
+    if workers <= 1 or len(paths) <= batch_size:
+        return _exist(paths)
+    
+    batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+    with ThreadPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+        return [found for batch in executor.map(_exist, batches) for found in batch]
+
+def hash_files(paths: Iterable[str], workers: int = 32) -> List[Optional[str]]:
+    """
+    SHA1 of each file, read on a thread pool (hashlib releases the GIL,
+    reads are I/O bound). Returns one hash per path, in input order.
+    """
+    paths = list(paths)
+    if workers <= 1 or len(paths) < 2:
+        return [sha1_file(path) for path in paths]
+    
+    with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        return list(executor.map(sha1_file, paths))
+
+def probe_files(paths: Iterable[str], workers: int = 8) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Probe video files (ffprobe, or OpenCV without it) on a thread pool.
+    Returns (metadata, None) or (None, error) per path, in input order.
+    """
+    paths = list(paths)
+    if not paths:
+        return []
+    
+    # OpenCV is only loaded when there is something to probe
+    from tracker_app.preprocess.video_utils import probe_video
+    
+    def probe(path: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        try:
+            return probe_video(Path(path)), None
+        except Exception as e:
+            return None, str(e) or type(e).__name__
+    
+    if workers <= 1 or len(paths) < 2:
+        return [probe(path) for path in paths]
+    
+    with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        return list(executor.map(probe, paths))
+
+@dataclass
+class IngestSummary:
+    """Counts reported by create_jobs_from_manifest"""
+    created: int = 0      # New queued jobs
+    existing: int = 0     # Filename already known (skipped)
+    missing: int = 0      # File not found
+    copies: int = 0       # Copies of known content (linked, inference shared through the cache)
+    unreadable: int = 0   # Files that can't be probed as video: jobs failed at ingest
 
 def create_jobs_from_manifest(
-    db: Database,
-    records: List[ManifestRecord]
-) -> Tuple[int, int, int]:
+    db: Optional[Database],
+    records: List[ManifestRecord],
+    dry_run: bool = False,
+    io_workers: int = 32,
+    deduplicate: bool = True,
+    probe: bool = True,
+    probe_workers: int = 8
+) -> IngestSummary:
     """
     Create jobs from manifest records.
-    Returns (created_count, existing_count, missing_count)
+    
+    Existing filenames are fetched in one query, file existence is checked
+    concurrently and all new videos and jobs are inserted in one
+    transaction. With dry_run nothing is written (db may then be None
+    for a database that does not exist yet).
+    
+    With deduplicate, new files and not yet hashed videos in the database
+    are hashed (SHA1). A file with the same content as a known video is
+    linked to it (duplicate_of, as sha1 is unique) and still gets its own
+    queued job: which inference can be shared depends on the provider and
+    settings of each run, so it is resolved at claim and run time against
+    the InferenceCache key (Database.claim_jobs, process_video_job).
+    
+    With probe, new files and videos in the database without metadata
+    are probed on a thread pool to fill
+    duration_s, fps, width and height. Files that can't be read as video
+    get a failed job (missing_file if gone) instead of failing later
+    during tracking, and their videos a probe_error so later ingests do
+    not probe them again (missing files are retried).
     """
-    created = 0
-    existing = 0
-    missing = 0
+    summary = IngestSummary()
+    known = db.get_video_filenames() if db is not None else set()
+    exists = check_files_exist((record.local_path for record in records), io_workers)
+    
+    new_videos = []
     
-    for record in records:
+    for record, found in zip(records, exists):
         # Check if file exists
-        local_path = Path(record.local_path)
-        if not local_path.exists():
-            logger.warning(f"File not found: {local_path}")
-            missing += 1
+        if not found:
+            logger.warning(f"File not found: {record.local_path}")
+            summary.missing += 1
             continue
-            
-        # Check if video already exists in DB
-        existing_video = db.get_video_by_filename(record.filename)
         
-        if existing_video:
-            existing += 1
-            # Optional: Check if job exists, if not create one?
+        # Check if video already exists in DB (or earlier in the manifest)
+        if record.filename in known:
+            summary.existing += 1
             # For now, we count specific video entries as existence
             continue
-            
-        # Insert video
-        video_id = db.insert_video(
-            word=record.word,
-            filename=record.filename,
-            local_path=str(local_path),
-            remote_url=record.remote_url
+        known.add(record.filename)
+        
+        new_videos.append({
+            'id': str(uuid4()),
+            'word': record.word,
+            'filename': record.filename,
+            'local_path': str(Path(record.local_path)),
+            'remote_url': record.remote_url
+        })
+    
+    hashes, duplicates = [], []
+    if deduplicate:
+        originals = db.get_video_hashes() if db is not None else {}
+        unhashed = db.get_unhashed_videos() if db is not None else []
+        digests = hash_files(
+            [video['local_path'] for video in unhashed] + [video['local_path'] for video in new_videos],
+            io_workers
         )
         
-        # Create job
-        db.create_job(video_id)
-        created += 1
+        # Known videos first (oldest holds the sha1), then the manifest in order
+        for video, sha1 in zip(unhashed, digests):
+            if sha1 is None:
+                continue
+            original = originals.get(sha1)
+            if original is None:
+                originals[sha1] = video['id']
+                hashes.append((video['id'], sha1))
+            else:
+                duplicates.append((video['id'], original))
+                summary.copies += 1
         
-    return created, existing, missing
+        for video, sha1 in zip(new_videos, digests[len(unhashed):]):
+            if sha1 is None:
+                continue
+            original = originals.get(sha1)
+            if original is None:
+                originals[sha1] = video['id']
+                video['sha1'] = sha1
+            else:
+                video['duplicate_of'] = original
+                summary.copies += 1
+    
+    metadata, unreadable = [], []
+    if probe:
+        unprobed = db.get_unprobed_videos() if db is not None else []
+        results = probe_files(
+            [video['local_path'] for video in unprobed] + [video['local_path'] for video in new_videos],
+            probe_workers
+        )
+        
+        for video, (meta, error) in zip(unprobed, results):
+            if meta is not None:
+                metadata.append((video['id'], meta))
+            else:
+                # Recorded even without a queued job, so it is probed only once
+                unreadable.append((video['id'], *_unreadable_status(video['local_path'], error)))
+                summary.unreadable += video['queued']
+        
+        for video, (meta, error) in zip(new_videos, results[len(unprobed):]):
+            if meta is not None:
+                video.update({key: meta[key] for key in ('duration_s', 'fps', 'width', 'height')})
+            else:
+                video['job_status'], video['job_error'] = _unreadable_status(video['local_path'], error)
+                if video['job_status'] != 'missing_file':
+                    video['probe_error'] = video['job_error']
+                summary.unreadable += 1
+    
+    if not dry_run and (new_videos or hashes or duplicates or metadata or unreadable):
+        with db.transaction():
+            if hashes or duplicates:
+                db.set_video_hashes(hashes, duplicates)
+            if metadata or unreadable:
+                db.set_video_metadata(metadata, unreadable)
+            if new_videos:
+                db.insert_videos_with_jobs(new_videos)
+    
+    summary.created = sum(1 for video in new_videos if 'job_status' not in video)
+    return summary
+
+def _unreadable_status(path: str, error: str) -> Tuple[str, str]:
+    """Job (status, error) for a file that failed probing"""
+    if not os.path.exists(path):
+        return 'missing_file', f"File not found: {path}"
+    logger.warning(f"Unreadable video {path}: {error}")
+    return 'failed', f"Unreadable video: {error}"
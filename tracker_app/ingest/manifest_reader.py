@@ -1,7 +1,6 @@
 from pathlib import Path
 from dataclasses import dataclass
 from typing import List, Optional
-import pandas as pd
 import csv
 
 @dataclass
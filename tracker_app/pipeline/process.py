@@ -0,0 +1,357 @@
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List, Tuple
+import orjson
+import pyarrow as pa
+from loguru import logger
+
+from tracker_app.store.disk import (
+    PARQUET_FORMAT_VERSION,
+    TrackingParquetWriter,
+    TrackingJsonlWriter,
+    iter_tracking_sequence,
+    load_tracking_sequence,
+    save_metadata
+)
+from tracker_app.store.cache import InferenceCache
+from tracker_app.preprocess.video_utils import (
+    extract_frames,
+    prefetch_frames,
+    batch_frames,
+    DecodeStats
+)
+from tracker_app.preprocess.frame_ring import ring_frames
+from tracker_app.postprocess.smoothing import SequenceSmoother
+from tracker_app.postprocess.quality import QualityAccumulator
+from tracker_app.pipeline.timing import StageTimer
+from tracker_app.tracking.base import BODY_PARTS
+from tracker_app.tracking.sequence import TrackingSequence
+from tracker_app.visualization.draw_landmarks import VisualizationWriter
+from tracker_app.utils.hashing import sha1_file
+
+# Unsmoothed provider output next to the tracking files (input of reprocess)
+RAW_FILENAME = "raw.parquet"
+
+
+def process_video_job(job, db, provider, config, visualize=False, provider_name='mediapipe'):
+    """
+    Process single video job: track, smooth, score, save and update the DB.
+    
+    The job must already be claimed (status processing), see JobClaimer.
+    
+    Frames stream through decode -> track -> causal smoothing -> quality
+    accumulator -> chunked writers, config.chunk_frames at a time, so
+    memory is bounded by the chunk size rather than the video length.
+    
+    With config.inference_cache, raw provider output is saved to the
+    InferenceCache (and its key to meta.json, for reprocess); when an entry for the same content and tracking
+    settings exists, decode and tracking are skipped and the cached
+    frames are smoothed and scored instead. Copies of the same content
+    (videos.duplicate_of) share the original's sha1 and so its entries.
+    
+    Wall and CPU time per stage (see StageTimer) go to meta.json and the
+    job_timings table.
+    
+    Returns:
+        True if the raw tracking came from the cache (no inference run)
+    """
+    timer = StageTimer()
+    video_path = Path(job['local_path'])
+    video_id = job['video_id']
+    job_id = job['id']
+    
+    output_dir = config.tracks_dir / video_id
+    output_dir.mkdir(parents=True, exist_ok=True)
+    viz_path = output_dir / "visualization.mp4"
+    
+    smoother = build_smoother(config)
+    quality = QualityAccumulator()
+    
+    chunk_frames = config.chunk_frames if config.chunk_frames > 0 else None
+    undeclared = [part for part in BODY_PARTS if part not in provider.KEYPOINT_COUNTS]
+    if chunk_frames and undeclared:
+        # The first chunk fixes the Parquet schema, so a part first seen
+        # in a later chunk would not fit; take the video in one chunk
+        logger.warning(
+            f"{type(provider).__name__} does not declare KEYPOINT_COUNTS for "
+            f"{', '.join(undeclared)}: processing the whole video at once"
+        )
+        chunk_frames = None
+    
+    # Raw inference cache, keyed by content and tracking settings
+    cache = cache_key = cached = None
+    if config.inference_cache:
+        with timer.stage('cache'):
+            sha1 = job.get('sha1')
+            if not sha1:
+                # Not hashed at ingest: record it so the file is read once
+                sha1 = sha1_file(str(video_path))
+                if sha1:
+                    db.record_video_hash(video_id, sha1)
+            if sha1:
+                cache = open_inference_cache(config)
+                cache_key = cache.make_key(
+                    sha1,
+                    provider_name,
+                    provider.cache_params(),
+                    config.target_fps,
+                    config.target_height
+                )
+                cached = cache.lookup(cache_key)
+    
+    cached_chunks = None
+    if cached is not None:
+        # Another runner's eviction or `cache purge` may have removed the
+        # entry since lookup; then track the video as on a miss
+        try:
+            with timer.stage('cache'):
+                if chunk_frames:
+                    cached_chunks = iter_tracking_sequence(cached.path, chunk_frames)
+                else:
+                    cached_chunks = iter([load_tracking_sequence(cached.path)])
+        except (OSError, pa.ArrowInvalid) as e:
+            logger.warning(f"Inference cache entry unreadable, tracking instead: {e}")
+            cached = None
+    
+    # Writers finalize their files on success and discard them on error
+    with ExitStack() as outputs:
+        raw_writers = []
+        if cache is not None and cached is None:
+            cache_writer = outputs.enter_context(cache.writer(cache_key))
+            raw_writers.append(cache_writer)
+        if config.save_raw:
+            raw_writers.append(outputs.enter_context(TrackingParquetWriter(output_dir / RAW_FILENAME)))
+        
+        writers = open_tracking_writers(outputs, output_dir, config)
+        if visualize:
+            writers.append(outputs.enter_context(
+                VisualizationWriter(video_path, viz_path, target_fps=config.target_fps)
+            ))
+        
+        def flush(raw: TrackingSequence):
+            # Keep raw output, then smooth, score and save one chunk
+            with timer.stage('write'):
+                for writer in raw_writers:
+                    writer.write(raw)
+            with timer.stage('smooth'):
+                smoothed = smoother.process(raw)
+            with timer.stage('quality'):
+                quality.update(smoothed)
+            with timer.stage('write'):
+                for writer in writers:
+                    writer.write(smoothed)
+        
+        if cached is not None:
+            logger.info(f"Inference cache hit: {job['word']}/{job['filename']}")
+            decode_stats = DecodeStats.from_dict(cached.meta['decode'])
+            for raw in timer.iterate('cache', cached_chunks):
+                flush(raw)
+        else:
+            logger.info(f"Tracking: {job['word']}/{job['filename']}")
+            decode_stats = track_video(video_path, provider, config, chunk_frames, flush, timer)
+        
+        if not quality.frames:
+            raise ValueError("No frames extracted")
+        
+        # Finalize the output files
+        with timer.stage('write'):
+            outputs.close()
+    
+    if cache is not None and cached is None:
+        with timer.stage('cache'):
+            cache.commit(cache_key, {
+                'sha1': sha1,
+                'provider': provider_name,
+                'provider_params': provider.cache_params(),
+                'target_fps': config.target_fps,
+                'target_height': config.target_height,
+                'frames': quality.frames,
+                'decode': decode_stats.to_dict()
+            })
+    
+    logger.debug(
+        f"Decoded {decode_stats.frames_retrieved}/{decode_stats.frames_grabbed} frames "
+        f"({decode_stats.sample_ratio:.0%}) at {decode_stats.source_fps:.2f} fps source"
+    )
+    
+    # Quality score
+    quality_score, issues = quality.result()
+    
+    # Metadata
+    metadata = {
+        'word': job['word'],
+        'filename': job['filename'],
+        'video_path': str(video_path),
+        'quality_score': quality_score,
+        'issues': issues,
+        'frames': quality.frames,
+        'tracking_provider': provider_name,
+        'decode': decode_stats.to_dict(),
+        'format_version': PARQUET_FORMAT_VERSION
+    }
+    if cache_key is not None:
+        metadata['inference_cache_key'] = cache_key
+    
+    # Update database: job result, quality issues and timings in one commit.
+    # meta.json is written last so it includes the database update time; if
+    # writing it fails, the job is rolled back and not marked done.
+    with db.transaction():
+        with timer.stage('db'):
+            db.update_job(
+                job_id,
+                status='done',
+                quality_score=quality_score,
+                frames=quality.frames,
+                tracking_provider=provider_name,
+                output_format='parquet+jsonl' if config.save_parquet and config.save_jsonl else 'jsonl'
+            )
+            
+            # Record quality issues
+            for issue in issues:
+                db.add_quality_issue(
+                    job_id,
+                    issue_type=issue.get('type', 'unknown'),
+                    severity=issue.get('severity', 'info'),
+                    details=str(issue)
+                )
+        
+        metadata['timings'] = timer.summary(quality.frames)
+        db.set_job_timings(job_id, metadata['timings'])
+        save_metadata(output_dir / "meta.json", metadata)
+    
+    if visualize:
+        logger.info(f"Visualization saved: {viz_path}")
+    
+    return cached is not None
+
+
+def reprocess_video_job(job, config) -> Tuple[float, List[Dict], int]:
+    """
+    Recompute smoothing and quality for a done job from its raw tracking:
+    raw.parquet if saved (config.save_raw), else the job's InferenceCache
+    entry while it has not been evicted.
+    
+    Rewrites the smoothed tracking files and meta.json with the current
+    config, without decoding or tracking. Does not touch the database, so
+    it can run in pool workers; the caller stores the results.
+    
+    Returns:
+        (quality_score, issues, frames)
+    """
+    output_dir = config.tracks_dir / job['video_id']
+    meta_path = output_dir / "meta.json"
+    metadata = orjson.loads(meta_path.read_bytes()) if meta_path.exists() else {}
+    
+    raw_path = output_dir / RAW_FILENAME
+    if not raw_path.exists():
+        cache_key = metadata.get('inference_cache_key')
+        entry = open_inference_cache(config).lookup(cache_key) if cache_key else None
+        if entry is None:
+            raise FileNotFoundError(f"No raw tracking: {raw_path} (nor an inference cache entry)")
+        raw_path = entry.path
+    
+    smoother = build_smoother(config)
+    quality = QualityAccumulator()
+    chunk_frames = config.chunk_frames if config.chunk_frames > 0 else None
+    
+    with ExitStack() as outputs:
+        writers = open_tracking_writers(outputs, output_dir, config)
+        if chunk_frames:
+            chunks = iter_tracking_sequence(raw_path, chunk_frames)
+        else:
+            chunks = [load_tracking_sequence(raw_path)]
+        for raw in chunks:
+            smoothed = smoother.process(raw)
+            quality.update(smoothed)
+            for writer in writers:
+                writer.write(smoothed)
+        
+        if not quality.frames:
+            raise ValueError(f"No frames in {raw_path}")
+    
+    quality_score, issues = quality.result()
+    
+    metadata.update(quality_score=quality_score, issues=issues, frames=quality.frames)
+    save_metadata(meta_path, metadata)
+    
+    return quality_score, issues, quality.frames
+
+
+def open_inference_cache(config) -> InferenceCache:
+    """InferenceCache in config.cache_dir with the configured size limit"""
+    return InferenceCache(config.cache_dir, int(config.inference_cache_max_gb * 1e9))
+
+
+def build_smoother(config) -> SequenceSmoother:
+    """Smoother with the config's smoothing settings"""
+    return SequenceSmoother(
+        ema_alpha=config.ema_alpha_wrist,
+        min_confidence=config.min_detection_confidence,
+        ema_alpha_fingers=config.ema_alpha_fingers,
+        ema_alpha_face=config.ema_alpha_face,
+        max_rotation_deg=config.velocity_clamp_deg_per_frame
+    )
+
+
+def open_tracking_writers(outputs: ExitStack, output_dir: Path, config) -> list:
+    """Smoothed tracking writers enabled in config, registered on outputs"""
+    writers = []
+    if config.save_parquet:
+        writers.append(outputs.enter_context(TrackingParquetWriter(output_dir / "tracking.parquet")))
+    if config.save_jsonl:
+        writers.append(outputs.enter_context(TrackingJsonlWriter(output_dir / "tracking.jsonl.gz")))
+    return writers
+
+
+def track_video(video_path, provider, config, chunk_frames, flush, timer=None) -> DecodeStats:
+    """
+    Decode and track a video, passing chunks of chunk_frames raw results
+    (or the whole video if None) to flush. Returns the decode stats.
+    
+    With a StageTimer, decode and tracking time are recorded on it.
+    With config.decode_process, decoding runs in a child process that
+    passes frames through shared memory (ring_frames).
+    """
+    timer = timer or StageTimer()
+    chunk = TrackingSequence(provider.KEYPOINT_COUNTS, capacity=chunk_frames or 256)
+    
+    decode_stats = DecodeStats()
+    with ExitStack() as decoding:
+        if config.decode_process and config.decode_queue_depth > 0:
+            # Decode in a child process; frames are views of a shared-memory
+            # ring, valid for one batch and until the ring is closed
+            frames = decoding.enter_context(ring_frames(
+                video_path,
+                config.target_fps,
+                stats=decode_stats,
+                target_height=config.target_height,
+                slots=config.decode_queue_depth,
+                hold=config.batch_size,
+                timer=timer
+            ))
+        else:
+            frames = extract_frames(
+                video_path,
+                config.target_fps,
+                stats=decode_stats,
+                target_height=config.target_height
+            )
+            frames = timer.iterate('decode', frames)
+            if config.decode_queue_depth > 0:
+                # Decode on a background thread so it overlaps with inference
+                frames = prefetch_frames(frames, config.decode_queue_depth)
+        
+        # batch_size 1 falls back to one track_frame call per frame
+        for frame_indices, times_s, images in batch_frames(frames, config.batch_size):
+            with timer.stage('track'):
+                results = provider.track_batch(images, frame_indices, times_s)
+            for result in results:
+                result.source_size = decode_stats.source_size
+                chunk.append(result)
+                if chunk_frames and len(chunk) >= chunk_frames:
+                    flush(chunk)
+                    chunk.clear()
+    if len(chunk):
+        flush(chunk)
+    
+    return decode_stats
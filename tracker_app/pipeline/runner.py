@@ -0,0 +1,316 @@
+import multiprocessing
+import os
+import socket
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from multiprocessing.util import Finalize
+from typing import List, Dict, Any, Iterator, Tuple, Optional, Set
+from uuid import uuid4
+from loguru import logger
+
+from tracker_app.store.db import Database
+from tracker_app.tracking.factory import get_tracking_provider
+from tracker_app.pipeline.process import process_video_job, reprocess_video_job
+from tracker_app.utils.logging_setup import setup_logging
+from tracker_app.utils.profiling import job_profiler
+
+# Per-process state of a pool worker, filled by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+class JobClaimer:
+    """
+    Claims jobs from the jobs table for one runner and keeps them leased.
+
+    Jobs are claimed atomically (Database.claim_jobs), so any number of
+    runners can share one database without processing a job twice. A
+    heartbeat thread renews the lease of every held job until it is
+    released; if the runner dies, its leases expire and the jobs are
+    reclaimed by the next runner. Each job is claimed at most once per
+    claimer, so a job that fails again is not retried in the same run.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        lease_s: float = 300.0,
+        status: str = 'queued',
+        word_prefix: Optional[str] = None,
+        limit: Optional[int] = None,
+        worker_id: Optional[str] = None
+    ):
+        self.db = db
+        self.lease_s = lease_s
+        self.status = status
+        self.word_prefix = word_prefix
+        self.remaining = limit
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
+        self.started_at = datetime.now().isoformat()
+        self._held: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def claim(self, n: int = 1) -> List[Dict[str, Any]]:
+        """Claim up to n jobs (fewer when the limit or the queue runs out)"""
+        if self.remaining is not None:
+            n = min(n, self.remaining)
+        jobs = self.db.claim_jobs(
+            self.worker_id, n, self.lease_s, status=self.status, word_prefix=self.word_prefix,
+            claimed_before=self.started_at
+        )
+        if self.remaining is not None:
+            self.remaining -= len(jobs)
+        self._hold(job['id'] for job in jobs)
+        return jobs
+
+    def claim_job(self, job_id: str, expected_status: str = 'queued') -> bool:
+        """Claim one specific job"""
+        if not self.db.claim_job(job_id, expected_status, self.worker_id, self.lease_s):
+            return False
+        self._hold([job_id])
+        return True
+
+    def release(self, job_id: str, requeue: bool = False) -> None:
+        """Stop renewing a job's lease; requeue=True puts it back unprocessed"""
+        with self._lock:
+            self._held.discard(job_id)
+        if requeue:
+            self.db.release_job(job_id, self.worker_id)
+
+    def _hold(self, job_ids) -> None:
+        with self._lock:
+            self._held.update(job_ids)
+        if self._heartbeat is None:
+            self._heartbeat = threading.Thread(target=self._renew_loop, name="lease-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def _renew_loop(self) -> None:
+        # Renew well before expiry so one slow round does not lose a lease
+        while not self._stop.wait(self.lease_s / 3):
+            with self._lock:
+                held = list(self._held)
+            if not held:
+                continue
+            try:
+                renewed = self.db.renew_leases(self.worker_id, held, self.lease_s)
+                if renewed < len(held):
+                    logger.warning(f"{len(held) - renewed} job lease(s) lost by {self.worker_id}")
+            except Exception as e:
+                logger.warning(f"Lease renewal failed: {e}")
+
+    def close(self) -> None:
+        """Stop the heartbeat and requeue jobs still held"""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        for job_id in list(self._held):
+            self.release(job_id, requeue=True)
+
+    def __enter__(self) -> "JobClaimer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def run_job(
+    job: Dict[str, Any],
+    db: Database,
+    provider,
+    config,
+    visualize: bool = False,
+    provider_name: str = 'mediapipe'
+) -> Tuple[str, Optional[str]]:
+    """
+    Process a single claimed job.
+
+    Returns:
+        (outcome, error) where outcome is 'done', 'cached' (done from the
+        inference cache, without an inference run) or 'failed'
+    """
+    try:
+        with job_profiler(job, config):
+            cached = process_video_job(job, db, provider, config, visualize, provider_name=provider_name)
+        return 'cached' if cached else 'done', None
+    except Exception as e:
+        logger.error(f"Failed to process {job['word']}/{job['filename']}: {e}")
+        db.update_job(job['id'], status='failed', error=str(e))
+        return 'failed', str(e)
+
+
+def run_jobs_sequential(
+    claimer: JobClaimer,
+    provider_name: str,
+    config,
+    visualize: bool = False
+) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """Claim and process jobs in this process, yielding (job, outcome) as each finishes"""
+    db = Database(config.db_path)
+    # Initialize tracking provider (reuse across videos)
+    provider = get_tracking_provider(provider_name, config.min_detection_confidence, config=config)
+
+    try:
+        while True:
+            jobs = claimer.claim(1)
+            if not jobs:
+                break
+            job = jobs[0]
+            # If interrupted, the job stays held and claimer.close() requeues it
+            outcome, _ = run_job(job, db, provider, config, visualize, provider_name)
+            claimer.release(job['id'])
+            yield job, outcome
+    finally:
+        provider.close()
+
+
+def run_jobs_parallel(
+    claimer: JobClaimer,
+    provider_name: str,
+    config,
+    workers: int,
+    visualize: bool = False
+) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """
+    Process jobs on a pool of worker processes.
+
+    Each worker keeps one warm tracking provider for its whole lifetime and
+    uses a copy of the caller's config, so command-line overrides apply.
+    This process claims a job whenever a worker is free and holds its
+    lease. Yields (job, outcome) in completion order so the caller can
+    report aggregated progress.
+    """
+    # spawn: same behaviour on Windows and Linux, no forked native model state
+    ctx = multiprocessing.get_context("spawn")
+    if config.provider_daemon:
+        # One daemon process would serialise the workers' inference
+        logger.info(f"Provider daemon not used with {workers} workers: each worker loads its own provider")
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(config, provider_name, visualize)
+    ) as pool:
+        futures = {}
+        broken = False
+
+        def fill() -> None:
+            nonlocal broken
+            if broken:
+                return
+            for job in claimer.claim(workers - len(futures)):
+                try:
+                    futures[pool.submit(_run_worker_job, job)] = job
+                except BrokenProcessPool:
+                    claimer.release(job['id'], requeue=True)
+                    broken = True
+
+        fill()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = futures.pop(future)
+                try:
+                    outcome, _ = future.result()
+                except Exception as e:
+                    # Worker process died (e.g. native crash in the model)
+                    logger.error(f"Worker crashed on {job['word']}/{job['filename']}: {e}")
+                    claimer.db.update_job(job['id'], status='failed', error=f"Worker crashed: {e}")
+                    outcome = 'failed'
+                    broken = broken or isinstance(e, BrokenProcessPool)
+                claimer.release(job['id'])
+                yield job, outcome
+            fill()
+
+
+def _init_worker(config, provider_name: str, visualize: bool) -> None:
+    """Pool initializer: open DB and warm up the provider once"""
+    setup_logging(config.log_level)
+
+    provider = get_tracking_provider(provider_name, config.min_detection_confidence, config=config, use_daemon=False)
+    # Close models when the worker process exits
+    Finalize(provider, provider.close, exitpriority=10)
+
+    _worker.update(
+        config=config,
+        db=Database(config.db_path),
+        provider=provider,
+        provider_name=provider_name,
+        visualize=visualize
+    )
+
+
+def _run_worker_job(job: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """Pool task: process one job with this worker's provider"""
+    return run_job(
+        job,
+        _worker['db'],
+        _worker['provider'],
+        _worker['config'],
+        _worker['visualize'],
+        _worker['provider_name']
+    )
+
+
+# (quality_score, issues, frames) of a reprocessed job
+Rescore = Tuple[float, List[Dict], int]
+
+
+def reprocess_jobs(
+    jobs: List[Dict[str, Any]],
+    config,
+    workers: int = 1
+) -> Iterator[Tuple[Dict[str, Any], str, Optional[Rescore], Optional[str]]]:
+    """
+    Re-run smoothing and quality scoring for done jobs from their raw
+    tracking, on a pool of worker processes (no tracking provider).
+
+    Yields (job, outcome, result, error) in completion order, where
+    outcome is 'done', 'no_raw' (no raw.parquet nor inference cache
+    entry) or 'failed'.
+    The caller writes results to the database.
+    """
+    if workers <= 1:
+        for job in jobs:
+            yield (job, *_reprocess_job(job, config))
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_reprocess_worker,
+        initargs=(config,)
+    ) as pool:
+        futures = {pool.submit(_run_reprocess_worker_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                outcome, result, error = future.result()
+            except Exception as e:
+                outcome, result, error = 'failed', None, f"Worker crashed: {e}"
+            yield job, outcome, result, error
+
+
+def _reprocess_job(job: Dict[str, Any], config) -> Tuple[str, Optional[Rescore], Optional[str]]:
+    try:
+        return 'done', reprocess_video_job(job, config), None
+    except FileNotFoundError as e:
+        return 'no_raw', None, str(e)
+    except Exception as e:
+        logger.error(f"Failed to reprocess {job['word']}/{job['filename']}: {e}")
+        return 'failed', None, str(e)
+
+
+def _init_reprocess_worker(config) -> None:
+    """Pool initializer for reprocess_jobs"""
+    setup_logging(config.log_level)
+    _worker.update(config=config)
+
+
+def _run_reprocess_worker_job(job: Dict[str, Any]) -> Tuple[str, Optional[Rescore], Optional[str]]:
+    """Pool task: reprocess one job"""
+    return _reprocess_job(job, _worker['config'])
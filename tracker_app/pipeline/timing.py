@@ -0,0 +1,83 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, TypeVar
+
+T = TypeVar('T')
+
+# Stages recorded by process_video_job, in pipeline order
+STAGES = ('cache', 'decode', 'track', 'smooth', 'quality', 'write', 'db', 'total')
+
+
+class StageTimer:
+    """
+    Wall and CPU time per pipeline stage of one job.
+
+    Blocks timed with stage() count process CPU time, since providers
+    and writers do part of their work on helper threads. Iterators timed
+    with iterate() count the CPU time of the thread consuming them, so
+    decode running on the prefetch thread is not charged for tracking
+    that overlaps with it. With prefetch, stage times can therefore add
+    up to more than 'total'.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._start = (time.perf_counter(), time.process_time())
+
+    def add(self, stage: str, wall_s: float, cpu_s: float) -> None:
+        with self._lock:
+            totals = self._stages.setdefault(stage, [0.0, 0.0])
+            totals[0] += wall_s
+            totals[1] += cpu_s
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Time a block (accumulates if the stage repeats)"""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def iterate(self, stage: str, items: Iterable[T]) -> Iterator[T]:
+        """Yield from items, timing each next() as stage"""
+        iterator = iter(items)
+        try:
+            while True:
+                wall, cpu = time.perf_counter(), time.thread_time()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.add(stage, time.perf_counter() - wall, time.thread_time() - cpu)
+                yield item
+        finally:
+            # Close the wrapped generator on the consuming thread
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    def summary(self, frames: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Timings so far, with 'total' measured since the timer was created.
+
+        Returns:
+            stage -> {wall_s, cpu_s, fps}, in pipeline order
+        """
+        wall, cpu = self._start
+        with self._lock:
+            stages = {stage: tuple(totals) for stage, totals in self._stages.items()}
+        stages['total'] = (time.perf_counter() - wall, time.process_time() - cpu)
+
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        return {
+            stage: {
+                'wall_s': round(wall_s, 6),
+                'cpu_s': round(cpu_s, 6),
+                'fps': round(frames / wall_s, 2) if wall_s > 0 else None
+            }
+            for stage, (wall_s, cpu_s) in sorted(stages.items(), key=lambda kv: order.get(kv[0], len(order)))
+        }
@@ -1,125 +1,187 @@
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional, Sequence, Union
+from dataclasses import dataclass
 import numpy as np
 
-from tracker_app.tracking.base import TrackingResult
+from tracker_app.tracking.base import TrackingResult, BODY_PARTS
+from tracker_app.tracking.sequence import TrackingSequence
 
 
-def compute_quality_score(
-    results: List[TrackingResult]
-) -> Tuple[float, List[Dict]]:
+@dataclass
+class FrameQuality:
+    """Per-frame quality signals, one entry per frame"""
+    hands_visible: np.ndarray       # (frames,) number of hands detected (0..2)
+    face_present: np.ndarray        # (frames,) True where the face was detected
+    left_wrist_motion: np.ndarray   # (frames,) wrist movement since the previous frame (NaN if untracked)
+    right_wrist_motion: np.ndarray
+    mean_confidence: np.ndarray     # (frames,) mean of non-zero part confidences (0 if none)
+
+
+class QualityAccumulator:
     """
-    Compute quality score 0..1 and list of issues.
+    Single-pass quality scoring over a tracking sequence.
     
-    Returns:
-        (score, issues)
+    Feed consecutive chunks of one video to update(), then call result()
+    for the score and issues. Wrist positions are carried over between
+    chunks so motion is measured across chunk boundaries.
     """
-    if not results:
-        return 0.0, [{"type": "empty", "severity": "error"}]
-    
-    issues = []
-    
-    # 1. Hand visibility (40% weight)
-    hand_visibility = _compute_hand_visibility(results)
-    if hand_visibility < 0.7:
-        issues.append({
-            "type": "low_hand_visibility",
-            "severity": "warning",
-            "value": hand_visibility
-        })
     
-    # 2. Tracking stability (30% weight)
-    stability = _compute_stability(results)
-    if stability < 0.7:
-        issues.append({
-            "type": "unstable_tracking",
-            "severity": "warning",
-            "value": stability
-        })
+    def __init__(self):
+        self.frames = 0
+        self.left_hand_frames = 0
+        self.right_hand_frames = 0
+        self.face_frames = 0
+        self._movements: List[np.ndarray] = []
+        self._confidences: List[np.ndarray] = []
+        # (2, 2) x, y of the left and right wrist in the previous frame
+        self._last_wrists: Optional[np.ndarray] = None
+        self._last_present = np.zeros(2, dtype=bool)
     
-    # 3. Face coverage (20% weight)
-    face_coverage = _compute_face_coverage(results)
-    if face_coverage < 0.5:
-        issues.append({
-            "type": "low_face_coverage",
-            "severity": "info",
-            "value": face_coverage
-        })
-    
-    # 4. Average confidence (10% weight)
-    avg_confidence = _compute_average_confidence(results)
+    def update(self, sequence: TrackingSequence) -> FrameQuality:
+        """Add the next chunk and return its per-frame signals"""
+        n = len(sequence)
+        left = sequence.present('left_hand')
+        right = sequence.present('right_hand')
+        face = sequence.present('face')
+        
+        self.frames += n
+        self.left_hand_frames += int(np.count_nonzero(left))
+        self.right_hand_frames += int(np.count_nonzero(right))
+        self.face_frames += int(np.count_nonzero(face))
+        
+        # Wrist (hand keypoint 0) of both hands: (frames, 2, 2) and (frames, 2)
+        wrists = np.zeros((n, 2, 2), dtype=np.float64)
+        for side, part in enumerate(('left_hand', 'right_hand')):
+            if sequence.keypoint_count(part):
+                wrists[:, side] = sequence.points(part)[:, 0, :2]
+        present = np.stack([left, right], axis=1)
+        
+        # Previous frame of each frame, continuing from the last chunk
+        previous = np.empty_like(wrists)
+        previous_present = np.empty_like(present)
+        if n:
+            previous[1:] = wrists[:-1]
+            previous_present[1:] = present[:-1]
+            previous[0] = self._last_wrists if self._last_wrists is not None else 0
+            previous_present[0] = self._last_present
+            self._last_wrists = wrists[-1].copy()
+            self._last_present = present[-1].copy()
+        
+        tracked = present & previous_present
+        delta = wrists - previous
+        motion = np.sqrt(delta[..., 0] * delta[..., 0] + delta[..., 1] * delta[..., 1])
+        motion[~tracked] = np.nan
+        # Row-major order keeps left/right interleaved per frame
+        self._movements.append(motion[tracked])
+        
+        # Part confidences in (pose, left, right, face) order per frame
+        confidences = np.stack([sequence.confidence(part) for part in BODY_PARTS], axis=1)
+        valid = confidences > 0
+        self._confidences.append(confidences[valid])
+        valid_count = valid.sum(axis=1)
+        mean_confidence = np.divide(
+            np.where(valid, confidences, 0.0).sum(axis=1),
+            valid_count,
+            out=np.zeros(n, dtype=np.float64),
+            where=valid_count > 0
+        )
+        
+        return FrameQuality(
+            hands_visible=left.astype(np.int8) + right.astype(np.int8),
+            face_present=face.copy(),
+            left_wrist_motion=motion[:, 0],
+            right_wrist_motion=motion[:, 1],
+            mean_confidence=mean_confidence
+        )
     
-    # Weighted score
-    score = (
-        0.4 * hand_visibility +
-        0.3 * stability +
-        0.2 * face_coverage +
-        0.1 * avg_confidence
-    )
+    def result(self) -> Tuple[float, List[Dict]]:
+        """
+        Compute quality score 0..1 and list of issues.
+        
+        Returns:
+            (score, issues)
+        """
+        if not self.frames:
+            return 0.0, [{"type": "empty", "severity": "error"}]
+        
+        issues = []
+        
+        # 1. Hand visibility (40% weight)
+        # Average ratio of frames where hands are detected (avg of left and right)
+        hand_visibility = (self.left_hand_frames + self.right_hand_frames) / (2 * self.frames)
+        if hand_visibility < 0.7:
+            issues.append({
+                "type": "low_hand_visibility",
+                "severity": "warning",
+                "value": hand_visibility
+            })
+        
+        # 2. Tracking stability (30% weight)
+        stability = self._stability()
+        if stability < 0.7:
+            issues.append({
+                "type": "unstable_tracking",
+                "severity": "warning",
+                "value": stability
+            })
+        
+        # 3. Face coverage (20% weight)
+        face_coverage = self.face_frames / self.frames
+        if face_coverage < 0.5:
+            issues.append({
+                "type": "low_face_coverage",
+                "severity": "info",
+                "value": face_coverage
+            })
+        
+        # 4. Average confidence (10% weight)
+        confidences = np.concatenate(self._confidences)
+        avg_confidence = np.mean(confidences) if len(confidences) else 0.0
+        
+        # Weighted score
+        score = (
+            0.4 * hand_visibility +
+            0.3 * stability +
+            0.2 * face_coverage +
+            0.1 * avg_confidence
+        )
+        
+        return score, issues
     
-    return score, issues
-
-
-def _compute_hand_visibility(results: List[TrackingResult]) -> float:
-    """Average ratio of frames where hands are detected (avg of left and right)"""
-    left_count = sum(1 for r in results if r.left_hand_landmarks)
-    right_count = sum(1 for r in results if r.right_hand_landmarks)
-    return (left_count + right_count) / (2 * len(results))
+    def _stability(self) -> float:
+        """Measure tracking stability (inverse of jitter)"""
+        if self.frames < 2:
+            return 1.0
+        
+        movements = np.concatenate(self._movements)
+        if not len(movements):
+            return 0.0
+        
+        # Stability = inverse of std deviation of wrist movements
+        std = np.std(movements)
+        return 1.0 / (1.0 + std * 10)  # Scale factor
 
 
-def _compute_stability(results: List[TrackingResult]) -> float:
-    """Measure tracking stability (inverse of jitter)"""
-    if len(results) < 2:
-        return 1.0
-    
-    # Compute frame-to-frame movement for wrists
-    movements = []
-    
-    for i in range(1, len(results)):
-        prev = results[i-1]
-        curr = results[i]
-        
-        # Left wrist movement
-        if prev.left_hand_landmarks and curr.left_hand_landmarks:
-            prev_wrist = prev.left_hand_landmarks[0]
-            curr_wrist = curr.left_hand_landmarks[0]
-            dx = curr_wrist.x - prev_wrist.x
-            dy = curr_wrist.y - prev_wrist.y
-            movements.append(np.sqrt(dx*dx + dy*dy))
-            
-        # Right wrist movement
-        if prev.right_hand_landmarks and curr.right_hand_landmarks:
-            prev_wrist = prev.right_hand_landmarks[0]
-            curr_wrist = curr.right_hand_landmarks[0]
-            dx = curr_wrist.x - prev_wrist.x
-            dy = curr_wrist.y - prev_wrist.y
-            movements.append(np.sqrt(dx*dx + dy*dy))
-    
-    if not movements:
-        return 0.0
+def compute_quality_score(
+    results: Union[TrackingSequence, Sequence[TrackingResult]]
+) -> Tuple[float, List[Dict]]:
+    """
+    Compute quality score 0..1 and list of issues.
     
-    # Stability = inverse of std deviation of movements
-    std = np.std(movements)
-    stability = 1.0 / (1.0 + std * 10)  # Scale factor
+    Returns:
+        (score, issues)
+    """
+    if not isinstance(results, TrackingSequence):
+        results = TrackingSequence.from_results(results)
     
-    return stability
-
+    accumulator = QualityAccumulator()
+    accumulator.update(results)
+    return accumulator.result()
 
-def _compute_face_coverage(results: List[TrackingResult]) -> float:
-    """Ratio of frames with face detected"""
-    with_face = sum(1 for r in results if r.face_landmarks)
-    return with_face / len(results)
 
-
-def _compute_average_confidence(results: List[TrackingResult]) -> float:
-    """Average of all confidence scores"""
-    confidences = []
-    for r in results:
-        confidences.extend([
-            r.pose_confidence,
-            r.left_hand_confidence,
-            r.right_hand_confidence,
-            r.face_confidence
-        ])
-    
-    valid = [c for c in confidences if c > 0]
-    return np.mean(valid) if valid else 0.0
+def compute_frame_quality(
+    results: Union[TrackingSequence, Sequence[TrackingResult]]
+) -> FrameQuality:
+    """Per-frame quality signals for a whole sequence"""
+    if not isinstance(results, TrackingSequence):
+        results = TrackingSequence.from_results(results)
+    return QualityAccumulator().update(results)
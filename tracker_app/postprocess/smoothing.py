@@ -1,8 +1,9 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 import numpy as np
 
-from tracker_app.tracking.base import TrackingResult, Landmark2D
+from tracker_app.tracking.base import TrackingResult
+from tracker_app.tracking.sequence import TrackingSequence
 
 
 class EMAFilter:
@@ -67,110 +68,287 @@ class VelocityClamp:
         self.last_value = None
 
 
+# Hand skeleton shared by MediaPipe and COCO-WholeBody (21 keypoints):
+# parent of each keypoint, wrist (0) is the root
+HAND_PARENTS = (-1, 0, 1, 2, 3, 0, 5, 6, 7, 0, 9, 10, 11, 0, 13, 14, 15, 0, 17, 18, 19)
+
+# Parts smoothed by default; face is only kept when a face alpha is given
+SMOOTHED_PARTS = ('pose', 'left_hand', 'right_hand')
+
+
+class LandmarkSmoother:
+    """
+    Causal confidence-weighted EMA over a fixed set of landmarks.
+    
+    All landmarks are filtered together with NumPy, one frame at a time.
+    Per landmark this matches an EMAFilter pair for x and y: landmarks
+    below min_confidence hold their last smoothed value. State is kept
+    between calls, so a sequence can be fed in consecutive chunks.
+    """
+    
+    def __init__(
+        self,
+        alpha: np.ndarray,
+        min_confidence: float = 0.6,
+        velocity_clamp: Optional[float] = None,
+        max_rotation_deg: Optional[float] = None,
+        parents: Optional[Sequence[int]] = None
+    ):
+        """
+        Args:
+            alpha: EMA factor per landmark, shape (K,)
+            min_confidence: Minimum confidence to update a landmark
+            velocity_clamp: Max change of x or y per frame (normalized units)
+            max_rotation_deg: Max rotation of a bone per frame, in degrees
+            parents: Parent landmark per landmark (-1 for none), defines
+                the bones for max_rotation_deg
+        """
+        self.alpha = np.asarray(alpha, dtype=np.float64)
+        self.min_confidence = min_confidence
+        self.velocity_clamp = velocity_clamp
+        self.max_rotation = np.deg2rad(max_rotation_deg) if max_rotation_deg else None
+        self._levels = _bone_levels(parents) if parents is not None and self.max_rotation else []
+        self.reset()
+    
+    def reset(self):
+        """Reset filter state"""
+        k = len(self.alpha)
+        self._state = np.zeros((k, 2), dtype=np.float64)
+        self._initialized = np.zeros(k, dtype=bool)
+        self._last = np.zeros((k, 2), dtype=np.float64)
+        self._has_last = np.zeros(k, dtype=bool)
+        self._angle = np.zeros(k, dtype=np.float64)
+        self._has_angle = np.zeros(k, dtype=bool)
+    
+    def carry_state(self, other: "LandmarkSmoother") -> None:
+        """Continue from other's state for the landmarks both have"""
+        k = min(len(self.alpha), len(other.alpha))
+        for name in ('_state', '_initialized', '_last', '_has_last', '_angle', '_has_angle'):
+            getattr(self, name)[:k] = getattr(other, name)[:k]
+    
+    def process(
+        self,
+        points: np.ndarray,
+        active: np.ndarray,
+        aspect: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Smooth landmarks in place.
+        
+        Args:
+            points: (frames, K, 3) normalized x, y and confidence
+            active: (frames, K) True where the landmark was detected;
+                inactive landmarks are left untouched
+            aspect: (frames,) image width / height, used to measure bone
+                angles in pixel space (defaults to 1)
+        """
+        for frame in range(len(points)):
+            mask = active[frame]
+            
+            # Clamps only apply between consecutive detections
+            self._has_last &= mask
+            self._has_angle &= mask
+            if not mask.any():
+                continue
+            
+            xy = points[frame, :, :2].astype(np.float64)
+            confidence = points[frame, :, 2].astype(np.float64)
+            
+            # Confidence-weighted update; first detection initializes the filter
+            update = mask & (confidence >= self.min_confidence)
+            weight = (self.alpha * confidence)[:, None]
+            blended = weight * xy + (1 - weight) * self._state
+            self._state = np.where(
+                (update & self._initialized)[:, None],
+                blended,
+                np.where(update[:, None], xy, self._state)
+            )
+            self._initialized |= update
+            
+            # Low confidence - hold previous value (raw value if there is none)
+            out = np.where(self._initialized[:, None], self._state, xy)
+            
+            if self.velocity_clamp is not None:
+                delta = np.clip(out - self._last, -self.velocity_clamp, self.velocity_clamp)
+                out = np.where((mask & self._has_last)[:, None], self._last + delta, out)
+            
+            if self._levels:
+                self._clamp_rotation(out, mask, 1.0 if aspect is None else float(aspect[frame]))
+            
+            self._last[mask] = out[mask]
+            self._has_last |= mask
+            points[frame, mask, :2] = out[mask]
+    
+    def _clamp_rotation(self, out: np.ndarray, mask: np.ndarray, aspect: float) -> None:
+        """Limit how far each bone turns per frame, root bones first"""
+        scale = np.array([aspect, 1.0])
+        for children, parents in self._levels:
+            ok = mask[children] & mask[parents]
+            children, parents = children[ok], parents[ok]
+            if not len(children):
+                continue
+            
+            bone = (out[children] - out[parents]) * scale
+            angle = np.arctan2(bone[:, 1], bone[:, 0])
+            
+            previous = self._angle[children]
+            delta = (angle - previous + np.pi) % (2 * np.pi) - np.pi
+            clamp = self._has_angle[children] & (np.abs(delta) > self.max_rotation)
+            if clamp.any():
+                angle[clamp] = previous[clamp] + np.sign(delta[clamp]) * self.max_rotation
+                length = np.hypot(bone[clamp, 0], bone[clamp, 1])[:, None]
+                direction = np.stack([np.cos(angle[clamp]), np.sin(angle[clamp])], axis=1)
+                out[children[clamp]] = out[parents[clamp]] + direction * length / scale
+            
+            self._angle[children] = angle
+            self._has_angle[children] = True
+
+
+class SequenceSmoother:
+    """
+    Smooth a TrackingSequence per landmark group.
+    
+    Pose uses ema_alpha, hands use ema_alpha for the wrist and
+    ema_alpha_fingers for the other keypoints, face uses ema_alpha_face.
+    Without ema_alpha_face the face is dropped. Each part has its own
+    LandmarkSmoother, so all of a part's landmarks are updated at once.
+    The smoother is causal and keeps its state, so consecutive chunks of
+    one video can be passed to process() in order.
+    """
+    
+    def __init__(
+        self,
+        ema_alpha: float = 0.5,
+        velocity_clamp: Optional[float] = None,
+        min_confidence: float = 0.6,
+        ema_alpha_fingers: Optional[float] = None,
+        ema_alpha_face: Optional[float] = None,
+        max_rotation_deg: Optional[float] = None
+    ):
+        """
+        Args:
+            ema_alpha: EMA factor for pose and wrists
+            velocity_clamp: Max change per frame in normalized units (optional)
+            min_confidence: Minimum confidence to update filter
+            ema_alpha_fingers: EMA factor for finger keypoints (default ema_alpha)
+            ema_alpha_face: EMA factor for face; None drops the face
+            max_rotation_deg: Max hand bone rotation per frame (optional)
+        """
+        self.ema_alpha = ema_alpha
+        self.velocity_clamp = velocity_clamp
+        self.min_confidence = min_confidence
+        self.ema_alpha_fingers = ema_alpha if ema_alpha_fingers is None else ema_alpha_fingers
+        self.ema_alpha_face = ema_alpha_face
+        self.max_rotation_deg = max_rotation_deg
+        self.parts = SMOOTHED_PARTS + (('face',) if ema_alpha_face is not None else ())
+        self._engines: Dict[str, LandmarkSmoother] = {}
+    
+    def process(self, sequence: TrackingSequence) -> TrackingSequence:
+        """Return a smoothed copy of the next chunk of the sequence"""
+        smoothed = sequence.copy()
+        if not len(smoothed):
+            return smoothed
+        
+        image_size = smoothed.image_size
+        aspect = image_size[:, 0] / np.maximum(image_size[:, 1], 1)
+        
+        for part in self.parts:
+            k = smoothed.keypoint_count(part)
+            if k == 0:
+                continue
+            engine = self._engines.get(part)
+            if engine is None or len(engine.alpha) != k:
+                # New part, or a keypoint count that differs from earlier chunks
+                resized = self._build_engine(part, k)
+                if engine is not None:
+                    resized.carry_state(engine)
+                engine = self._engines[part] = resized
+            
+            present = smoothed.present(part)
+            engine.process(
+                smoothed.points(part),
+                np.repeat(present[:, None], k, axis=1),
+                aspect
+            )
+        
+        if self.ema_alpha_face is None:
+            # Face landmarks (subset only - 468 is too many)
+            # In practice, extract key features instead
+            smoothed.clear_part('face')
+        
+        return smoothed
+    
+    def _build_engine(self, part: str, k: int) -> LandmarkSmoother:
+        """Per-landmark alphas and bones for one body part"""
+        parents = None
+        if part == 'face':
+            alpha = np.full(k, self.ema_alpha_face)
+        elif part == 'pose':
+            alpha = np.full(k, self.ema_alpha)
+        else:
+            alpha = np.full(k, self.ema_alpha_fingers)
+            alpha[:1] = self.ema_alpha
+            if k == len(HAND_PARENTS):
+                parents = HAND_PARENTS
+        
+        return LandmarkSmoother(
+            alpha,
+            min_confidence=self.min_confidence,
+            velocity_clamp=self.velocity_clamp,
+            max_rotation_deg=self.max_rotation_deg,
+            parents=parents
+        )
+
+
 def smooth_tracking_sequence(
-    results: List[TrackingResult],
+    results: Union[TrackingSequence, List[TrackingResult]],
     ema_alpha: float = 0.5,
     velocity_clamp: Optional[float] = None,
-    min_confidence: float = 0.6
-) -> List[TrackingResult]:
+    min_confidence: float = 0.6,
+    ema_alpha_fingers: Optional[float] = None,
+    ema_alpha_face: Optional[float] = None,
+    max_rotation_deg: Optional[float] = None
+) -> TrackingSequence:
     """
     Apply smoothing to tracking sequence.
     
     Args:
-        results: List of tracking results
-        ema_alpha: EMA smoothing factor
+        results: Tracking sequence (or list of per-frame results)
+        ema_alpha: EMA smoothing factor (pose and wrists)
         velocity_clamp: Max change per frame (optional)
         min_confidence: Minimum confidence to update filter
+        ema_alpha_fingers: EMA factor for fingers (default ema_alpha)
+        ema_alpha_face: EMA factor for face; None drops the face
+        max_rotation_deg: Max hand bone rotation per frame (optional)
     
     Returns:
-        Smoothed tracking results
+        Smoothed copy of the sequence
     """
-    if not results:
-        return results
-    
-    # Create filters for each landmark dimension
-    # This is simplified - in practice, you'd want per-landmark filters
-    filters = {}
-    
-    smoothed_results = []
-    
-    for result in results:
-        smoothed_result = TrackingResult(
-            frame_index=result.frame_index,
-            time_s=result.time_s,
-            image_size=result.image_size,
-            pose_confidence=result.pose_confidence,
-            left_hand_confidence=result.left_hand_confidence,
-            right_hand_confidence=result.right_hand_confidence,
-            face_confidence=result.face_confidence
-        )
-        
-        # Smooth pose landmarks
-        smoothed_result.pose_landmarks = _smooth_landmarks(
-            result.pose_landmarks,
-            'pose',
-            filters,
-            ema_alpha,
-            min_confidence
-        )
-        
-        # Smooth hands
-        smoothed_result.left_hand_landmarks = _smooth_landmarks(
-            result.left_hand_landmarks,
-            'left_hand',
-            filters,
-            ema_alpha,
-            min_confidence
-        )
-        smoothed_result.right_hand_landmarks = _smooth_landmarks(
-            result.right_hand_landmarks,
-            'right_hand',
-            filters,
-            ema_alpha,
-            min_confidence
-        )
-        
-        # Face landmarks (subset only - 468 is too many)
-        # In practice, extract key features instead
-        
-        smoothed_results.append(smoothed_result)
+    if not isinstance(results, TrackingSequence):
+        results = TrackingSequence.from_results(results)
     
-    return smoothed_results
+    smoother = SequenceSmoother(
+        ema_alpha=ema_alpha,
+        velocity_clamp=velocity_clamp,
+        min_confidence=min_confidence,
+        ema_alpha_fingers=ema_alpha_fingers,
+        ema_alpha_face=ema_alpha_face,
+        max_rotation_deg=max_rotation_deg
+    )
+    return smoother.process(results)
 
 
-def _smooth_landmarks(
-    landmarks: List[Landmark2D],
-    prefix: str,
-    filters: dict,
-    alpha: float,
-    min_confidence: float
-) -> List[Landmark2D]:
-    """Smooth list of landmarks"""
-    smoothed = []
+def _bone_levels(parents: Sequence[int]) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Group (child, parent) bones by depth so parents are clamped first"""
+    parents = np.asarray(parents, dtype=np.int64)
+    depth = np.zeros(len(parents), dtype=np.int64)
+    for idx, parent in enumerate(parents):
+        # Parents precede children in both hand layouts
+        if parent >= 0:
+            depth[idx] = depth[parent] + 1
     
-    for idx, lm in enumerate(landmarks):
-        # Create filters if not exist
-        key_x = f"{prefix}_{idx}_x"
-        key_y = f"{prefix}_{idx}_y"
-        
-        if key_x not in filters:
-            filters[key_x] = EMAFilter(alpha)
-            filters[key_y] = EMAFilter(alpha)
-        
-        # Apply smoothing if confidence is sufficient
-        if lm.confidence >= min_confidence:
-            x = filters[key_x].update(lm.x, lm.confidence)
-            y = filters[key_y].update(lm.y, lm.confidence)
-        else:
-            # Low confidence - hold previous value
-            x = filters[key_x].last_value if filters[key_x].last_value is not None else lm.x
-            y = filters[key_y].last_value if filters[key_y].last_value is not None else lm.y
-        
-        smoothed.append(Landmark2D(
-            x=x,
-            y=y,
-            confidence=lm.confidence,
-            name=lm.name
-        ))
-    
-    return smoothed
+    levels = []
+    for level in range(1, int(depth.max(initial=0)) + 1):
+        children = np.flatnonzero(depth == level)
+        levels.append((children, parents[children]))
+    return levels
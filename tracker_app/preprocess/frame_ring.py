@@ -0,0 +1,310 @@
+import atexit
+import itertools
+import multiprocessing
+import pickle
+import queue
+import threading
+from collections import deque
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+import numpy as np
+
+from tracker_app.preprocess.video_utils import DecodeStats, extract_frames, output_frame_size
+from tracker_app.pipeline.timing import StageTimer
+
+
+class FrameRing:
+    """
+    Fixed-size frame slots in one shared memory segment.
+    
+    A producer process copies each frame into the next slot and passes
+    only the slot index (and frame shape) to the consumer, which reads the
+    frame through a NumPy view of the segment. Nothing is pickled and the
+    consumer side makes no copy. Slots are handed over in order, so the
+    index of frame n is n % slots.
+    """
+    
+    def __init__(self, slots: int, slot_bytes: int, name: Optional[str] = None):
+        """
+        Args:
+            slots: Number of frame slots
+            slot_bytes: Capacity of one slot (the largest frame in bytes)
+            name: Attach to the ring of this name (in a child process of its creator)
+        """
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        else:
+            # Child processes share the creator's resource tracker, so the
+            # segment stays registered once and is unlinked by the owner
+            self.shm = shared_memory.SharedMemory(name=name)
+    
+    @property
+    def name(self) -> str:
+        return self.shm.name
+    
+    def write(self, slot: int, frame: np.ndarray) -> None:
+        """Copy frame into slot"""
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {frame.shape} does not fit a {self.slot_bytes} byte ring slot")
+        self.view(slot, frame.shape, frame.dtype)[...] = frame
+    
+    def view(self, slot: int, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """Array backed by slot (valid until the slot is rewritten or the ring closed)"""
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+    
+    def close(self) -> None:
+        """Unmap (views must no longer be used); the owner also removes the segment"""
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class FrameDecoder:
+    """
+    Long-lived decoder process serving ring_frames, one video at a time.
+    
+    Spawning a process imports NumPy and OpenCV again, about half a second,
+    so a decoder is kept for the life of the runner and reused for every
+    video (see _checkout). Requests, freed slots and stop signals go down
+    one queue in order; frames and results come back tagged with the
+    video's request number, so leftovers of a video abandoned midway are
+    told apart and dropped.
+    """
+    
+    def __init__(self):
+        ctx = multiprocessing.get_context("spawn")
+        self.control = ctx.Queue()
+        self.filled = ctx.Queue()
+        self.process = ctx.Process(
+            target=_decoder_main,
+            args=(self.control, self.filled),
+            name="frame-ring-decoder",
+            daemon=True
+        )
+        self.process.start()
+        self._requests = itertools.count()
+    
+    def start(self, ring: FrameRing, video_path: Path, target_fps, target_height) -> int:
+        """Ask the decoder to fill ring with video_path; returns the request number"""
+        request = next(self._requests)
+        self.control.put(('decode', request, ring.name, ring.slots, ring.slot_bytes,
+                          str(video_path), target_fps, target_height))
+        return request
+    
+    def free(self, request: int) -> None:
+        """Hand one slot back to the decoder"""
+        self.control.put(('free', request))
+    
+    def stop(self, request: int) -> None:
+        """Abandon the request (no-op once it has ended)"""
+        self.control.put(('stop', request))
+    
+    def close(self) -> None:
+        """Let the process exit, terminating it if it does not"""
+        if self.process.is_alive():
+            self.control.put(None)
+            self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.control.close()
+        self.filled.close()
+
+
+# Idle decoders of this process; each ring_frames call takes one (or starts one)
+_idle_decoders: list = []
+_decoders_lock = threading.Lock()
+
+
+def _checkout() -> FrameDecoder:
+    with _decoders_lock:
+        while _idle_decoders:
+            decoder = _idle_decoders.pop()
+            if decoder.process.is_alive():
+                return decoder
+            decoder.close()
+    return FrameDecoder()
+
+
+def _checkin(decoder: FrameDecoder) -> None:
+    with _decoders_lock:
+        _idle_decoders.append(decoder)
+
+
+@atexit.register
+def close_decoders() -> None:
+    """Stop the idle decoder processes (also done at interpreter exit)"""
+    with _decoders_lock:
+        decoders = list(_idle_decoders)
+        _idle_decoders.clear()
+    for decoder in decoders:
+        decoder.close()
+
+
+@contextmanager
+def ring_frames(
+    video_path: Path,
+    target_fps: Optional[int] = None,
+    stats: Optional[DecodeStats] = None,
+    target_height: Optional[int] = None,
+    slots: int = 8,
+    hold: int = 1,
+    timer: Optional[StageTimer] = None
+) -> Iterator[Iterator[Tuple[int, float, np.ndarray]]]:
+    """
+    Run extract_frames in a decoder process that hands frames over through
+    a FrameRing. Use as a context manager yielding the frame iterator:
+        
+        with ring_frames(video_path, 25, hold=batch_size) as frames:
+            for frame_index, time_s, frame in frames:
+                ...
+    
+    Same output as extract_frames, but each frame is a view into shared
+    memory that stays valid until `hold` more frames have been yielded
+    (set hold to the tracking batch size), and never after the block
+    exits. The decoder runs at most `slots` frames ahead. Exceptions
+    raised while decoding are re-raised by the iterator. The decoder
+    process is started on first use and reused by later calls in this
+    process (FrameDecoder).
+    
+    Args:
+        video_path: Video file
+        target_fps: Output rate (None = every frame)
+        stats: Optional DecodeStats, filled in from the decoder process
+        target_height: Max output height (None = source resolution)
+        slots: Ring slots (raised to hold + 1 if smaller)
+        hold: Most recent frames that must stay valid
+        timer: Optional StageTimer; the decoder's time is added as 'decode'
+    """
+    hold = max(1, hold)
+    slots = max(slots, hold + 1)
+    width, height = output_frame_size(video_path, target_height)
+    ring = FrameRing(slots, width * height * 3)
+    
+    decoder = _checkout()
+    request = None
+    try:
+        request = decoder.start(ring, video_path, target_fps, target_height)
+        yield _receive_frames(ring, decoder, request, hold, stats, timer)
+    finally:
+        # The decoder may still write into the ring until it sees the stop;
+        # its own mapping keeps the segment alive until it lets go
+        ring.close()
+        if request is not None and decoder.process.is_alive():
+            decoder.stop(request)
+            _checkin(decoder)
+        else:
+            decoder.close()
+
+
+def _receive_frames(ring: FrameRing, decoder: FrameDecoder, request: int, hold: int, stats, timer):
+    """Consumer side of ring_frames: yield views of the slots the decoder fills"""
+    held: deque = deque()
+    while True:
+        try:
+            message = decoder.filled.get(timeout=0.5)
+        except queue.Empty:
+            if decoder.process.is_alive():
+                continue
+            try:
+                message = decoder.filled.get(timeout=0.5)
+            except queue.Empty:
+                raise RuntimeError(f"Frame decoder exited with code {decoder.process.exitcode}")
+        
+        kind, number = message[:2]
+        if number != request:
+            continue  # Left over from an abandoned video
+        if kind == 'frame':
+            _, _, slot, frame_index, time_s, shape, dtype, decode_stats = message
+            if stats is not None and decode_stats is not None:
+                _update_stats(stats, decode_stats)
+            # Frames older than the last `hold` are done with
+            while len(held) >= hold:
+                held.popleft()
+                decoder.free(request)
+            held.append(slot)
+            yield frame_index, time_s, ring.view(slot, shape, dtype)
+        elif kind == 'end':
+            _, _, decode_stats, wall_s, cpu_s = message
+            if stats is not None:
+                _update_stats(stats, decode_stats)
+            if timer is not None:
+                timer.add('decode', wall_s, cpu_s)
+            return
+        else:
+            raise message[2]
+
+
+def _update_stats(stats: DecodeStats, data: dict) -> None:
+    decoded = DecodeStats.from_dict(data)
+    for field in ('source_fps', 'source_size', 'output_size', 'frames_grabbed', 'frames_retrieved'):
+        setattr(stats, field, getattr(decoded, field))
+
+
+def _decoder_main(control, filled) -> None:
+    """Decoder process: serve decode requests until told to exit (None)"""
+    while True:
+        message = control.get()
+        if message is None:
+            return
+        if message[0] == 'decode':
+            _decode_into_ring(*message[1:], control, filled)
+        # Otherwise a free or stop for a request that has already ended
+
+
+def _decode_into_ring(
+    request: int,
+    ring_name: str,
+    slots: int,
+    slot_bytes: int,
+    video_path: str,
+    target_fps: Optional[int],
+    target_height: Optional[int],
+    control,
+    filled
+) -> None:
+    """One request: extract_frames into the ring, one message per frame"""
+    ring = FrameRing(slots, slot_bytes, name=ring_name)
+    stats = DecodeStats()
+    timer = StageTimer()
+    credit = slots
+    try:
+        frames = timer.iterate('decode', extract_frames(
+            Path(video_path), target_fps, stats=stats, target_height=target_height
+        ))
+        for sequence, (frame_index, time_s, frame) in enumerate(frames):
+            # Wait for the consumer to free a slot, but honour stop
+            while not credit:
+                message = control.get()
+                if message is None:
+                    control.put(None)  # Exit once back in _decoder_main
+                    return
+                kind, number = message[:2]
+                if number != request:
+                    continue
+                if kind == 'stop':
+                    return
+                credit += 1
+            credit -= 1
+            slot = sequence % slots
+            ring.write(slot, frame)
+            # Stream info (source size) is needed with the first frame
+            first = stats.to_dict() if sequence == 0 else None
+            filled.put(('frame', request, slot, frame_index, time_s, frame.shape, frame.dtype.str, first))
+        
+        decode = timer.summary(stats.frames_retrieved)['decode']
+        filled.put(('end', request, stats.to_dict(), decode['wall_s'], decode['cpu_s']))
+    except Exception as e:
+        # Queue pickles on a feeder thread, where a failure would be lost
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(f"Frame decoder failed: {e!r}")
+        filled.put(('error', request, e))
+    finally:
+        ring.close()
@@ -1,10 +1,19 @@
 import cv2
 import ffmpeg
+import queue
+import shutil
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator, Dict, Any, Optional, Tuple, List
+from typing import Iterator, Dict, Any, Optional, Tuple, List, TypeVar
 import numpy as np
 from loguru import logger
 
+T = TypeVar("T")
+
+# Marks the end of the decoder thread's output
+_END = object()
+
 
 def get_video_metadata(video_path: Path) -> Dict[str, Any]:
     """Extract video metadata using ffmpeg-python"""
@@ -42,13 +51,119 @@ def get_video_metadata(video_path: Path) -> Dict[str, Any]:
         raise
 
 
+def probe_video(video_path: Path) -> Dict[str, Any]:
+    """
+    Video metadata (width, height, fps, duration_s, codec, frames).
+    
+    Uses ffprobe when it is on PATH, otherwise OpenCV (which also decodes
+    the first frame). Raises ValueError for files that can't be read as
+    video.
+    """
+    if _has_ffprobe():
+        try:
+            return get_video_metadata(video_path)
+        except ffmpeg.Error as e:
+            lines = e.stderr.decode(errors='replace').strip().splitlines()
+            raise ValueError(lines[-1] if lines else str(e))
+        except (KeyError, ZeroDivisionError) as e:
+            raise ValueError(f"Incomplete stream info: {e}")
+    
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        if not cap.isOpened():
+            raise ValueError("Cannot open video")
+        ok, _ = cap.read()
+        if not ok:
+            raise ValueError("No decodable frames")
+        
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        return {
+            'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': fps,
+            'duration_s': frames / fps if fps > 0 else 0.0,
+            'codec': fourcc.to_bytes(4, 'little').decode('ascii', errors='replace').strip('\x00 ') or None,
+            'frames': frames
+        }
+    finally:
+        cap.release()
+
+
+_ffprobe: Optional[bool] = None
+
+
+def _has_ffprobe() -> bool:
+    global _ffprobe
+    if _ffprobe is None:
+        _ffprobe = shutil.which('ffprobe') is not None
+    return _ffprobe
+
+
+@dataclass
+class DecodeStats:
+    """Counters filled in by extract_frames while it runs"""
+    source_fps: float = 0.0
+    source_size: Tuple[int, int] = (0, 0)  # (width, height) as stored in the file
+    output_size: Tuple[int, int] = (0, 0)  # (width, height) of yielded frames
+    frames_grabbed: int = 0    # Frames read from the stream
+    frames_retrieved: int = 0  # Frames converted to BGR and yielded
+    
+    @property
+    def sample_ratio(self) -> float:
+        """Fraction of grabbed frames that were actually retrieved"""
+        if not self.frames_grabbed:
+            return 0.0
+        return self.frames_retrieved / self.frames_grabbed
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'source_fps': self.source_fps,
+            'source_size': {'width': self.source_size[0], 'height': self.source_size[1]},
+            'output_size': {'width': self.output_size[0], 'height': self.output_size[1]},
+            'frames_grabbed': self.frames_grabbed,
+            'frames_retrieved': self.frames_retrieved,
+            'sample_ratio': self.sample_ratio
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DecodeStats":
+        """Inverse of to_dict"""
+        return cls(
+            source_fps=data['source_fps'],
+            source_size=(data['source_size']['width'], data['source_size']['height']),
+            output_size=(data['output_size']['width'], data['output_size']['height']),
+            frames_grabbed=data['frames_grabbed'],
+            frames_retrieved=data['frames_retrieved']
+        )
+
+
 def extract_frames(
     video_path: Path,
-    target_fps: Optional[int] = None
+    target_fps: Optional[int] = None,
+    stats: Optional[DecodeStats] = None,
+    target_height: Optional[int] = None
 ) -> Iterator[Tuple[int, float, np.ndarray]]:
     """
     Yield frames from video.
     
+    When target_fps is below the source rate, frames are picked by
+    timestamp: the first source frame at or after each k / target_fps is
+    kept, so any target rate is hit exactly (30 -> 25 fps included).
+    Frames that are not kept are only grabbed, never retrieved, which
+    skips the colour conversion and copy to a numpy array.
+    
+    Frames taller than target_height are downscaled (aspect ratio kept)
+    before they are yielded. Landmarks are normalized to 0..1, so they
+    stay valid for the source resolution.
+    
+    Args:
+        video_path: Video file
+        target_fps: Output rate (None = every frame)
+        stats: Optional DecodeStats updated while iterating
+        target_height: Max output height (None = source resolution)
+    
     Yields:
         (frame_index, time_s, frame_array)
     """
@@ -58,37 +173,167 @@ def extract_frames(
         raise ValueError(f"Cannot open video: {video_path}")
     
     original_fps = cap.get(cv2.CAP_PROP_FPS)
+    if not original_fps or original_fps <= 0:
+        original_fps = float(target_fps or 25)
+        logger.warning(f"Unknown frame rate for {video_path}, assuming {original_fps} fps")
     
-    # Calculate frame skip if target_fps specified
-    frame_skip = 1
-    if target_fps and target_fps < original_fps:
-        frame_skip = int(original_fps / target_fps)
+    # Resample by timestamp only when reducing the frame rate
+    resample = bool(target_fps) and target_fps < original_fps
     
-    frame_index = 0
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    output_size = _scaled_size(width, height, target_height)
+    resize = output_size != (width, height)
+    # INTER_AREA avoids aliasing on large reductions but is ~4x slower than
+    # INTER_LINEAR, which is good enough for factors below 2 (1080p -> 720p)
+    interpolation = cv2.INTER_AREA if resize and height >= 2 * output_size[1] else cv2.INTER_LINEAR
+    
+    if stats is not None:
+        stats.source_fps = original_fps
+        stats.source_size = (width, height)
+        stats.output_size = output_size
+    
+    source_index = 0
     actual_frame_count = 0
     
     try:
         while True:
-            ret, frame = cap.read()
-            if not ret:
+            time_s = source_index / original_fps
+            
+            # Tolerance guards against float error exactly on a sample boundary
+            keep = not resample or time_s >= actual_frame_count / target_fps - 1e-6
+            
+            if not cap.grab():
                 break
+            source_index += 1
+            if stats is not None:
+                stats.frames_grabbed += 1
             
-            # Skip frames if needed
-            if frame_index % frame_skip != 0:
-                frame_index += 1
+            if not keep:
                 continue
             
-            time_s = frame_index / original_fps
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            if resize:
+                frame = cv2.resize(frame, output_size, interpolation=interpolation)
+            if stats is not None:
+                stats.frames_retrieved += 1
             
             yield (actual_frame_count, time_s, frame)
             
-            frame_index += 1
             actual_frame_count += 1
     
     finally:
         cap.release()
 
 
+def output_frame_size(video_path: Path, target_height: Optional[int] = None) -> Tuple[int, int]:
+    """(width, height) of the frames extract_frames yields for a video"""
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        if not cap.isOpened():
+            raise ValueError(f"Cannot open video: {video_path}")
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+    return _scaled_size(width, height, target_height)
+
+
+def _scaled_size(width: int, height: int, target_height: Optional[int]) -> Tuple[int, int]:
+    """Size after downscaling to target_height (aspect ratio kept, never upscaled)"""
+    if target_height and 0 < target_height < height:
+        return (max(1, round(width * target_height / height)), target_height)
+    return (width, height)
+
+
+def prefetch_frames(
+    frames: Iterator[T],
+    queue_depth: int = 8
+) -> Iterator[T]:
+    """
+    Run a frame iterator on a background thread.
+    
+    The decoder thread stays at most `queue_depth` items ahead of the
+    consumer and blocks when the queue is full, so decode (which releases
+    the GIL inside OpenCV) overlaps with tracking without unbounded memory.
+    Exceptions raised while decoding are re-raised in the consumer.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=queue_depth)
+    stop = threading.Event()
+    
+    def _put(item) -> bool:
+        # Block for backpressure, but wake up regularly to honour stop
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _decode():
+        try:
+            for item in frames:
+                if not _put(item):
+                    break
+        except BaseException as e:
+            _put(e)
+        finally:
+            # Release the capture on the thread that owns it
+            close = getattr(frames, 'close', None)
+            if close is not None:
+                close()
+            _put(_END)
+    
+    thread = threading.Thread(target=_decode, name="frame-prefetch", daemon=True)
+    thread.start()
+    
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Consumer finished or stopped early: unblock and join the decoder
+        stop.set()
+        while thread.is_alive():
+            try:
+                buffer.get_nowait()
+            except queue.Empty:
+                pass
+            thread.join(timeout=0.05)
+
+
+def batch_frames(
+    frames: Iterator[Tuple[int, float, np.ndarray]],
+    batch_size: int
+) -> Iterator[Tuple[List[int], List[float], List[np.ndarray]]]:
+    """
+    Group extract_frames output into batches for TrackingProvider.track_batch.
+    
+    Yields:
+        (frame_indices, times_s, frames), the last batch may be shorter
+    """
+    batch_size = max(1, batch_size)
+    indices, times, images = [], [], []
+    
+    for frame_index, time_s, frame in frames:
+        indices.append(frame_index)
+        times.append(time_s)
+        images.append(frame)
+        if len(images) == batch_size:
+            yield indices, times, images
+            indices, times, images = [], [], []
+    
+    if images:
+        yield indices, times, images
+
+
 def save_debug_frame(
     frame: np.ndarray,
     output_path: Path,
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import orjson
+from loguru import logger
+
+from tracker_app.store.disk import PARQUET_FORMAT_VERSION, TrackingParquetWriter
+
+
+@dataclass
+class CacheEntry:
+    """One cached inference result"""
+    key: str
+    path: Path
+    size_bytes: int
+    last_used: float  # Unix time of the last hit (or write)
+    meta: Dict[str, Any]
+
+
+class InferenceCache:
+    """
+    Raw (unsmoothed) provider output on disk, in Config.cache_dir.
+    
+    Entries are keyed by the video content hash and everything that
+    determines the provider output: provider name and parameters, target
+    fps and target height. Smoothing and scoring run after the cache, so
+    changing them reuses cached inference instead of re-tracking.
+    
+    Each entry is a v2 tracking Parquet file plus a JSON sidecar with its
+    key fields and decode stats. A hit refreshes the file's mtime; once
+    the cache is larger than max_bytes, least recently used entries are
+    removed. Eviction scans every entry, so commit() runs it at most once
+    per evict_interval_s across all runners (the mtime of a marker file
+    records the last scan); the cache can overshoot max_bytes by what is
+    written in between.
+    """
+    
+    def __init__(self, cache_dir: Path, max_bytes: int, evict_interval_s: float = 60.0):
+        self.root = Path(cache_dir) / "inference"
+        self.max_bytes = max_bytes
+        self.evict_interval_s = evict_interval_s
+    
+    @staticmethod
+    def make_key(
+        sha1: str,
+        provider: str,
+        provider_params: Dict[str, Any],
+        target_fps: float,
+        target_height: int
+    ) -> str:
+        """Cache key for one video and tracking configuration"""
+        payload = orjson.dumps({
+            'format_version': PARQUET_FORMAT_VERSION,
+            'sha1': sha1,
+            'provider': provider,
+            'provider_params': provider_params,
+            'target_fps': target_fps,
+            'target_height': target_height
+        }, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+    
+    def path(self, key: str) -> Path:
+        """Parquet file of an entry"""
+        return self.root / key[:2] / f"{key}.parquet"
+    
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for key and mark it used, or None on a miss"""
+        path = self.path(key)
+        try:
+            meta = orjson.loads(path.with_suffix('.json').read_bytes())
+            os.utime(path)
+            stat = path.stat()
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        return CacheEntry(key, path, stat.st_size, stat.st_mtime, meta)
+    
+    def writer(self, key: str) -> TrackingParquetWriter:
+        """Writer for a new entry; call commit() once it is closed"""
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return TrackingParquetWriter(path)
+    
+    def commit(self, key: str, meta: Dict[str, Any]) -> None:
+        """Publish an entry written with writer(), then evict down to max_bytes if due"""
+        sidecar = self.path(key).with_suffix('.json')
+        tmp_path = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.part")
+        tmp_path.write_bytes(orjson.dumps({**meta, 'created_at': time.time()}))
+        os.replace(tmp_path, sidecar)
+        if self._eviction_due():
+            self.evict()
+    
+    def _eviction_due(self) -> bool:
+        marker = self.root / ".last_evict"
+        try:
+            return time.time() - marker.stat().st_mtime >= self.evict_interval_s
+        except OSError:
+            return True
+    
+    def entries(self) -> List[CacheEntry]:
+        """All entries, least recently used first"""
+        entries = []
+        for path in self.root.glob("*/*.parquet"):
+            try:
+                stat = path.stat()
+                meta = orjson.loads(path.with_suffix('.json').read_bytes())
+            except (OSError, orjson.JSONDecodeError):
+                continue  # Being written, or removed meanwhile
+            entries.append(CacheEntry(path.stem, path, stat.st_size, stat.st_mtime, meta))
+        entries.sort(key=lambda entry: entry.last_used)
+        return entries
+    
+    def remove(self, entry: CacheEntry) -> None:
+        """Delete one entry"""
+        for path in (entry.path.with_suffix('.json'), entry.path):
+            path.unlink(missing_ok=True)
+    
+    def purge(self, predicate: Callable[[CacheEntry], bool]) -> List[CacheEntry]:
+        """Delete entries matching predicate, return them"""
+        removed = [entry for entry in self.entries() if predicate(entry)]
+        for entry in removed:
+            self.remove(entry)
+        return removed
+    
+    def evict(self) -> List[CacheEntry]:
+        """Delete least recently used entries until the cache fits max_bytes"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / ".last_evict").touch()
+        entries = self.entries()
+        total = sum(entry.size_bytes for entry in entries)
+        removed = []
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            self.remove(entry)
+            total -= entry.size_bytes
+            removed.append(entry)
+        
+        if removed:
+            logger.debug(f"Inference cache: evicted {len(removed)} entries")
+        return removed
@@ -1,6 +1,9 @@
+import os
 import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Set, Tuple
 from uuid import uuid4
 from datetime import datetime
 from contextlib import contextmanager
@@ -8,25 +11,146 @@ from loguru import logger
 
 
 class Database:
-    """SQLite database operations"""
+    """
+    SQLite database operations.
+    
+    Each thread (and process) keeps one persistent connection in WAL mode,
+    so readers do not block the writer and calls do not pay for a new
+    connection. Every method runs in its own transaction unless called
+    inside transaction(), which groups them into one commit.
+    """
+    
+    # Applied to every new connection
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",  # Durable across app crashes; WAL makes FULL unnecessary
+        "PRAGMA cache_size = -16000",   # 16 MB page cache
+        "PRAGMA temp_store = MEMORY",
+    )
+    BUSY_TIMEOUT_S = 30.0
+    
+    # Columns added after the first schema version: (table, column, type)
+    MIGRATIONS = (
+        ('jobs', 'worker_id', 'TEXT'),
+        ('jobs', 'lease_expires_at', 'REAL'),
+        ('videos', 'duplicate_of', 'TEXT'),
+        ('videos', 'probe_error', 'TEXT'),
+    )
+    # Tables added after the first schema version (same SQL as schema.sql)
+    MIGRATION_TABLES = (
+        """CREATE TABLE IF NOT EXISTS job_timings (
+            job_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            wall_s REAL NOT NULL,
+            cpu_s REAL,
+            PRIMARY KEY (job_id, stage),
+            FOREIGN KEY (job_id) REFERENCES jobs(id)
+        )""",
+    )
+    # Indexes added after the first schema version
+    MIGRATION_INDEXES = (
+        "CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(status, lease_expires_at)",
+        "CREATE INDEX IF NOT EXISTS idx_videos_filename ON videos(filename)",
+    )
+    # Rows written by older versions, rewritten in place (idempotent)
+    MIGRATION_UPDATES = (
+        # Copies of known content had a 'duplicate' job and no tracking of
+        # their own; they are tracked now, sharing inference through the cache
+        "UPDATE jobs SET status = 'queued' WHERE status = 'duplicate'",
+    )
     
     def __init__(self, db_path: Path):
         self.db_path = db_path
-        self._conn: Optional[sqlite3.Connection] = None
+        self._local = threading.local()
+        self._migrated = False
+    
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            # New thread, or a forked child that must not reuse the parent's handle
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.BUSY_TIMEOUT_S,
+                isolation_level=None  # Transactions are managed explicitly
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            local.conn = conn
+            local.pid = os.getpid()
+            local.depth = 0
+            if not self._migrated:
+                self._migrate(conn)
+        return local.conn
+    
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Bring an existing database up to the current schema"""
+        for table, column, column_type in self.MIGRATIONS:
+            columns = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if not columns:
+                return  # Not initialized yet (init_schema migrates afterwards)
+            if column in columns:
+                continue
+            try:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+                logger.info(f"Database migrated: added {table}.{column}")
+            except sqlite3.OperationalError as e:
+                # Another process migrated in the meantime
+                if 'duplicate column' not in str(e):
+                    raise
+        
+        for table_sql in self.MIGRATION_TABLES:
+            conn.execute(table_sql)
+        for index_sql in self.MIGRATION_INDEXES:
+            conn.execute(index_sql)
+        for update_sql in self.MIGRATION_UPDATES:
+            conn.execute(update_sql)
+        self._migrated = True
     
     @contextmanager
-    def get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+    def transaction(self, immediate: bool = False):
+        """
+        Group database calls into one transaction.
+        
+        Nested scopes join the outermost one, which commits on success and
+        rolls back on error. immediate=True takes the write lock up front,
+        for read-then-write sequences that must not interleave with other
+        writers.
+        """
+        conn = self._connection()
+        local = self._local
+        if local.depth:
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
+        
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        local.depth = 1
         try:
             yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
         finally:
+            local.depth = 0
+    
+    @contextmanager
+    def get_connection(self):
+        """Context manager for database connections (one transaction)"""
+        with self.transaction() as conn:
+            yield conn
+    
+    def close(self) -> None:
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
             conn.close()
+        self._local.__dict__.clear()
     
     def init_schema(self) -> None:
         """Initialize database schema"""
@@ -34,8 +158,10 @@ class Database:
         with open(schema_path) as f:
             schema_sql = f.read()
         
-        with self.get_connection() as conn:
-            conn.executescript(schema_sql)
+        # executescript manages its own transaction
+        conn = self._connection()
+        conn.executescript(schema_sql)
+        self._migrate(conn)
         
         logger.info(f"Database initialized at {self.db_path}")
     
@@ -82,6 +208,169 @@ class Database:
         
         return dict(row) if row else None
     
+    def get_video_filenames(self) -> Set[str]:
+        """Filenames of all videos, in one query"""
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT filename FROM videos").fetchall()
+        
+        return {row['filename'] for row in rows}
+    
+    def get_video_hashes(self) -> Dict[str, str]:
+        """Map of sha1 -> video_id for all hashed videos"""
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT sha1, id FROM videos WHERE sha1 IS NOT NULL").fetchall()
+        
+        return {row['sha1']: row['id'] for row in rows}
+    
+    def get_unhashed_videos(self) -> List[Dict[str, Any]]:
+        """
+        Videos without a sha1 that are not known copies, oldest first.
+        Each has id and local_path.
+        """
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT v.id, v.local_path
+                FROM videos v
+                WHERE v.sha1 IS NULL AND v.duplicate_of IS NULL
+                ORDER BY v.created_at, v.rowid
+            """).fetchall()
+        
+        return [dict(row) for row in rows]
+    
+    def get_unprobed_videos(self) -> List[Dict[str, Any]]:
+        """
+        Videos without probed metadata (duration_s) whose probe has not
+        failed before (probe_error).
+        Each has id, local_path and queued (True if a job still waits to run).
+        """
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT v.id, v.local_path,
+                       EXISTS (SELECT 1 FROM jobs j
+                               WHERE j.video_id = v.id AND j.status = 'queued') AS queued
+                FROM videos v
+                WHERE v.duration_s IS NULL AND v.probe_error IS NULL
+            """).fetchall()
+        
+        return [dict(row, queued=bool(row['queued'])) for row in rows]
+    
+    def set_video_metadata(
+        self,
+        metadata: Sequence[Tuple[str, Dict[str, Any]]],
+        unreadable: Sequence[Tuple[str, str, str]] = ()
+    ) -> int:
+        """
+        Record probed metadata of existing videos in one transaction.
+        
+        Args:
+            metadata: (video_id, metadata) pairs with duration_s, fps,
+                width and height
+            unreadable: (video_id, job_status, error) for files that could
+                not be probed; their queued jobs get that status, and unless
+                the file is missing ('missing_file') the error is kept as
+                probe_error so the video is not probed again
+        
+        Returns:
+            Number of queued jobs marked unreadable
+        """
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE videos SET duration_s = ?, fps = ?, width = ?, height = ? WHERE id = ?",
+                (
+                    (meta['duration_s'], meta['fps'], meta['width'], meta['height'], video_id)
+                    for video_id, meta in metadata
+                )
+            )
+            conn.executemany(
+                "UPDATE videos SET probe_error = ? WHERE id = ?",
+                ((error, video_id) for video_id, status, error in unreadable if status != 'missing_file')
+            )
+            cursor = conn.executemany(
+                "UPDATE jobs SET status = ?, error = ? WHERE video_id = ? AND status = 'queued'",
+                ((status, error, video_id) for video_id, status, error in unreadable)
+            )
+        
+        return cursor.rowcount
+    
+    def set_video_hashes(
+        self,
+        hashes: Sequence[Tuple[str, str]],
+        duplicates: Sequence[Tuple[str, str]] = ()
+    ) -> None:
+        """
+        Record content hashes of existing videos in one transaction.
+        
+        Args:
+            hashes: (video_id, sha1) pairs
+            duplicates: (video_id, original_video_id) pairs for copies of
+                content another video holds the sha1 of (sha1 is unique)
+        """
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE videos SET sha1 = ? WHERE id = ?",
+                ((sha1, video_id) for video_id, sha1 in hashes)
+            )
+            conn.executemany(
+                "UPDATE videos SET duplicate_of = ? WHERE id = ?",
+                ((original_id, video_id) for video_id, original_id in duplicates)
+            )
+    
+    def record_video_hash(self, video_id: str, sha1: str) -> None:
+        """
+        Record the content hash of a video hashed after ingest (by a
+        runner), as a copy if another video already holds that sha1.
+        """
+        with self.transaction(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT id FROM videos WHERE sha1 = ? AND id != ?", (sha1, video_id)
+            ).fetchone()
+            if row:
+                self.set_video_hashes((), [(video_id, row['id'])])
+            else:
+                self.set_video_hashes([(video_id, sha1)])
+    
+    def insert_videos_with_jobs(self, videos: Sequence[Dict[str, Any]]) -> List[str]:
+        """
+        Insert videos and one job per video in a single transaction.
+        
+        Jobs are queued; a video's job_status and job_error keys override
+        the job's status and error.
+        
+        Args:
+            videos: Dicts with word, filename, local_path and optionally
+                id, remote_url, sha1, duplicate_of, duration_s, fps,
+                width, height, probe_error, job_status, job_error
+        
+        Returns:
+            video_ids in input order
+        """
+        columns = ('word', 'filename', 'local_path', 'remote_url', 'sha1', 'duplicate_of',
+                   'duration_s', 'fps', 'width', 'height', 'probe_error')
+        video_ids = [video.get('id') or str(uuid4()) for video in videos]
+        
+        with self.transaction() as conn:
+            conn.executemany(f"""
+                INSERT INTO videos (id, {', '.join(columns)})
+                VALUES (?, {', '.join('?' * len(columns))})
+            """, (
+                (video_id, *(video.get(column) for column in columns))
+                for video_id, video in zip(video_ids, videos)
+            ))
+            conn.executemany("""
+                INSERT INTO jobs (id, video_id, status, error)
+                VALUES (?, ?, ?, ?)
+            """, (
+                (
+                    str(uuid4()),
+                    video_id,
+                    video.get('job_status') or 'queued',
+                    video.get('job_error')
+                )
+                for video_id, video in zip(video_ids, videos)
+            ))
+        
+        return video_ids
+    
     def create_job(self, video_id: str) -> str:
         """Create processing job for video"""
         job_id = str(uuid4())
@@ -118,6 +407,7 @@ class Database:
             elif status in ("done", "failed"):
                 updates.append("finished_at = ?")
                 values.append(datetime.now().isoformat())
+                updates.append("lease_expires_at = NULL")
         
         if error is not None:
             updates.append("error = ?")
@@ -148,6 +438,183 @@ class Database:
         with self.get_connection() as conn:
             conn.execute(sql, values)
     
+    # Job rows with their video; sha1 is the content's, which the original
+    # holds for copies (videos.sha1 is unique)
+    _JOB_SELECT = """
+        SELECT j.*, v.word, v.filename, v.local_path,
+               COALESCE(v.sha1, o.sha1) AS sha1, v.duplicate_of
+        FROM jobs j
+        JOIN videos v ON j.video_id = v.id
+        LEFT JOIN videos o ON o.id = v.duplicate_of
+    """
+    
+    def claim_job(
+        self,
+        job_id: str,
+        expected_status: str = "queued",
+        worker_id: Optional[str] = None,
+        lease_s: Optional[float] = None
+    ) -> bool:
+        """
+        Mark job as processing if it still has the expected status.
+
+        Returns False when another runner already claimed it.
+        """
+        lease_expires_at = time.time() + lease_s if lease_s else None
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs
+                SET status = 'processing', started_at = ?, worker_id = ?, lease_expires_at = ?
+                WHERE id = ? AND status = ?
+            """, (datetime.now().isoformat(), worker_id, lease_expires_at, job_id, expected_status))
+
+        return cursor.rowcount == 1
+    
+    def claim_jobs(
+        self,
+        worker_id: str,
+        n: int = 1,
+        lease_s: float = 300.0,
+        status: str = "queued",
+        word_prefix: Optional[str] = None,
+        claimed_before: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Atomically claim up to n jobs for a runner.
+
+        Claimed jobs are set to processing with worker_id and a lease that
+        expires after lease_s seconds unless renewed (renew_leases). When
+        claiming queued jobs, processing jobs whose lease expired (e.g.
+        from a crashed run) are reclaimed as well. With claimed_before
+        (an ISO timestamp), jobs started at or after it are skipped, so a
+        runner passing its start time claims each job at most once.
+
+        Copies of the same content (videos.duplicate_of) are claimed one at
+        a time: at most one per batch, and none while another job on that
+        content holds a live lease. Claimed after it finishes, a copy
+        tracked with the same provider and settings is an InferenceCache
+        hit instead of a second inference run.
+
+        Returns:
+            Claimed jobs, in the same shape as get_jobs()
+        """
+        if n <= 0:
+            return []
+        
+        now = time.time()
+        where, params = self._claimable_filter(status, word_prefix, now, claimed_before)
+        
+        with self.transaction(immediate=True) as conn:
+            rows = conn.execute(f"""
+                UPDATE jobs
+                SET status = 'processing', started_at = ?, worker_id = ?, lease_expires_at = ?
+                WHERE id IN (
+                    SELECT id FROM (
+                        SELECT j.id, v.word, v.filename, ROW_NUMBER() OVER (
+                            PARTITION BY COALESCE(v.duplicate_of, v.id)
+                            ORDER BY v.word, v.filename
+                        ) AS nth
+                        FROM jobs j
+                        JOIN videos v ON j.video_id = v.id
+                        WHERE {where}
+                    )
+                    WHERE nth = 1
+                    ORDER BY word, filename
+                    LIMIT ?
+                )
+                RETURNING id
+            """, (datetime.now().isoformat(), worker_id, now + lease_s, *params, n)).fetchall()
+            
+            if not rows:
+                return []
+            
+            ids = [row['id'] for row in rows]
+            jobs = conn.execute(f"""
+                {self._JOB_SELECT}
+                WHERE j.id IN ({', '.join('?' * len(ids))})
+                ORDER BY v.word, v.filename
+            """, ids).fetchall()
+        
+        return [dict(row) for row in jobs]
+    
+    def count_claimable_jobs(
+        self,
+        status: str = "queued",
+        word_prefix: Optional[str] = None
+    ) -> int:
+        """Number of jobs claim_jobs() would currently consider"""
+        where, params = self._claimable_filter(status, word_prefix, time.time())
+        with self.get_connection() as conn:
+            row = conn.execute(f"""
+                SELECT COUNT(*) AS count
+                FROM jobs j
+                JOIN videos v ON j.video_id = v.id
+                WHERE {where}
+            """, params).fetchone()
+        return row['count']
+    
+    def renew_leases(self, worker_id: str, job_ids: List[str], lease_s: float) -> int:
+        """Extend the leases a runner holds; returns how many are still held"""
+        if not job_ids:
+            return 0
+        with self.get_connection() as conn:
+            cursor = conn.execute(f"""
+                UPDATE jobs SET lease_expires_at = ?
+                WHERE worker_id = ? AND status = 'processing'
+                AND id IN ({', '.join('?' * len(job_ids))})
+            """, (time.time() + lease_s, worker_id, *job_ids))
+        return cursor.rowcount
+    
+    def release_job(self, job_id: str, worker_id: str) -> None:
+        """Put a claimed job back in the queue without processing it"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                UPDATE jobs
+                SET status = 'queued', started_at = NULL, worker_id = NULL, lease_expires_at = NULL
+                WHERE id = ? AND worker_id = ? AND status = 'processing'
+            """, (job_id, worker_id))
+    
+    def _claimable_filter(
+        self,
+        status: str,
+        word_prefix: Optional[str],
+        now: float,
+        claimed_before: Optional[str] = None
+    ) -> Tuple[str, List[Any]]:
+        """WHERE clause (over jobs j JOIN videos v) for claimable jobs"""
+        if status == 'queued':
+            # Only an expired lease marks a job abandoned; jobs processed
+            # without one (older versions) are left to their process
+            where = """(j.status = 'queued' OR (j.status = 'processing'
+                       AND j.lease_expires_at < ?))"""
+            params: List[Any] = [now]
+        elif status == 'processing':
+            # Explicit recovery of stuck jobs, still not taking live leases
+            where = "j.status = 'processing' AND (j.lease_expires_at IS NULL OR j.lease_expires_at < ?)"
+            params = [now]
+        else:
+            where = "j.status = ?"
+            params = [status]
+        
+        # A copy waits while its content is being tracked (see claim_jobs)
+        where += """ AND COALESCE(v.duplicate_of, v.id) NOT IN (
+            SELECT COALESCE(pv.duplicate_of, pv.id) FROM jobs pj
+            JOIN videos pv ON pj.video_id = pv.id
+            WHERE pj.status = 'processing' AND pj.lease_expires_at >= ?
+        )"""
+        params.append(now)
+        
+        if claimed_before:
+            # A job that fails again goes back to its status; don't claim it twice in one run
+            where += " AND (j.started_at IS NULL OR j.started_at < ?)"
+            params.append(claimed_before)
+        
+        if word_prefix:
+            where += " AND v.word LIKE ?"
+            params.append(f"{word_prefix}%")
+        
+        return where, params
+
     def get_jobs(
         self,
         status: Optional[str] = None,
@@ -156,10 +623,8 @@ class Database:
         min_quality: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """Query jobs with filters"""
-        sql = """
-            SELECT j.*, v.word, v.filename, v.local_path
-            FROM jobs j
-            JOIN videos v ON j.video_id = v.id
+        sql = f"""
+            {self._JOB_SELECT}
             WHERE 1=1
         """
         params = []
@@ -235,3 +700,67 @@ class Database:
                 (id, job_id, issue_type, severity, frame_start, frame_end, details)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (issue_id, job_id, issue_type, severity, frame_start, frame_end, details))
+    
+    def set_job_timings(self, job_id: str, timings: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Replace the stage timings of a job.
+        
+        Args:
+            timings: stage -> {wall_s, cpu_s}, see StageTimer.summary
+        """
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM job_timings WHERE job_id = ?", (job_id,))
+            conn.executemany(
+                "INSERT INTO job_timings (job_id, stage, wall_s, cpu_s) VALUES (?, ?, ?, ?)",
+                (
+                    (job_id, stage, timing['wall_s'], timing.get('cpu_s'))
+                    for stage, timing in timings.items()
+                )
+            )
+    
+    def get_job_timings(self, word_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Stage timings of done jobs, one row per job and stage, with the
+        job's tracking_provider and frames.
+        """
+        sql = """
+            SELECT t.job_id, t.stage, t.wall_s, t.cpu_s, j.tracking_provider, j.frames
+            FROM job_timings t
+            JOIN jobs j ON j.id = t.job_id
+            JOIN videos v ON v.id = j.video_id
+            WHERE j.status = 'done'
+        """
+        params = []
+        if word_prefix:
+            sql += " AND v.word LIKE ?"
+            params.append(f"{word_prefix}%")
+        
+        with self.get_connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        
+        return [dict(row) for row in rows]
+    
+    def update_quality_bulk(self, results: Sequence[Tuple[str, float, int, List[Dict[str, Any]]]]) -> None:
+        """
+        Replace quality scores and issues of many jobs in one transaction.
+        
+        Args:
+            results: (job_id, quality_score, frames, issues) per job
+        """
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE jobs SET quality_score = ?, frames = ? WHERE id = ?",
+                ((score, frames, job_id) for job_id, score, frames, _ in results)
+            )
+            conn.executemany(
+                "DELETE FROM quality_issues WHERE job_id = ?",
+                ((job_id,) for job_id, *_ in results)
+            )
+            conn.executemany("""
+                INSERT INTO quality_issues (id, job_id, issue_type, severity, details)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                (str(uuid4()), job_id, issue.get('type', 'unknown'), issue.get('severity', 'info'), str(issue))
+                for job_id, _, _, issues in results
+                for issue in issues
+            ))
@@ -10,11 +10,15 @@ CREATE TABLE IF NOT EXISTS videos (
     fps REAL,
     width INTEGER,
     height INTEGER,
-    created_at TEXT DEFAULT (datetime('now'))
+    created_at TEXT DEFAULT (datetime('now')),
+    duplicate_of TEXT,                -- Video holding the sha1 of the same content (copies share its inference)
+    probe_error TEXT,                 -- Why probing failed (not probed again at ingest)
+    FOREIGN KEY (duplicate_of) REFERENCES videos(id)
 );
 
-CREATE INDEX idx_videos_word ON videos(word);
-CREATE INDEX idx_videos_sha1 ON videos(sha1);
+CREATE INDEX IF NOT EXISTS idx_videos_word ON videos(word);
+CREATE INDEX IF NOT EXISTS idx_videos_sha1 ON videos(sha1);
+CREATE INDEX IF NOT EXISTS idx_videos_filename ON videos(filename);
 
 -- Jobs table
 CREATE TABLE IF NOT EXISTS jobs (
@@ -29,12 +33,14 @@ CREATE TABLE IF NOT EXISTS jobs (
     tracking_provider TEXT,           -- e.g., "mediapipe"
     output_format TEXT,               -- e.g., "parquet+jsonl"
     created_at TEXT DEFAULT (datetime('now')),
+    worker_id TEXT,                   -- Runner holding the job while processing
+    lease_expires_at REAL,            -- Unix time; expired processing jobs are reclaimed
     FOREIGN KEY (video_id) REFERENCES videos(id)
 );
 
-CREATE INDEX idx_jobs_status ON jobs(status);
-CREATE INDEX idx_jobs_video_id ON jobs(video_id);
-CREATE INDEX idx_jobs_quality ON jobs(quality_score);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_video_id ON jobs(video_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_quality ON jobs(quality_score);
 
 -- Quality issues table (for detailed tracking)
 CREATE TABLE IF NOT EXISTS quality_issues (
@@ -48,4 +54,14 @@ CREATE TABLE IF NOT EXISTS quality_issues (
     FOREIGN KEY (job_id) REFERENCES jobs(id)
 );
 
-CREATE INDEX idx_quality_job ON quality_issues(job_id);
+CREATE INDEX IF NOT EXISTS idx_quality_job ON quality_issues(job_id);
+
+-- Wall and CPU time per pipeline stage of a job (latest run)
+CREATE TABLE IF NOT EXISTS job_timings (
+    job_id TEXT NOT NULL,
+    stage TEXT NOT NULL,              -- cache|decode|track|smooth|quality|write|db|total
+    wall_s REAL NOT NULL,
+    cpu_s REAL,
+    PRIMARY KEY (job_id, stage),
+    FOREIGN KEY (job_id) REFERENCES jobs(id)
+);
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field, asdict
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Sequence, Tuple
 import numpy as np
 
 
@@ -13,22 +13,32 @@ class Landmark2D:
     name: Optional[str] = None
 
 
+# Body parts tracked per frame, in output order
+BODY_PARTS = ('pose', 'left_hand', 'right_hand', 'face')
+
+
 @dataclass
 class TrackingResult:
-    """Complete tracking result for one frame"""
+    """
+    Complete tracking result for one frame.
+    
+    Landmarks of each body part are a float32 array of shape (keypoints, 3)
+    holding normalized x, y and confidence, or None when the part was not
+    detected. Results read from a TrackingSequence are views into its storage.
+    """
     frame_index: int
     time_s: float
-    image_size: tuple[int, int]  # (width, height)
+    image_size: tuple[int, int]  # (width, height) of the frame given to the provider
     
     # Body pose landmarks
-    pose_landmarks: List[Landmark2D] = field(default_factory=list)
+    pose: Optional[np.ndarray] = None
     
     # Hand landmarks (21 per hand)
-    left_hand_landmarks: List[Landmark2D] = field(default_factory=list)
-    right_hand_landmarks: List[Landmark2D] = field(default_factory=list)
+    left_hand: Optional[np.ndarray] = None
+    right_hand: Optional[np.ndarray] = None
     
     # Face landmarks
-    face_landmarks: List[Landmark2D] = field(default_factory=list)
+    face: Optional[np.ndarray] = None
     
     # Confidence scores
     pose_confidence: float = 0.0
@@ -36,40 +46,149 @@ class TrackingResult:
     right_hand_confidence: float = 0.0
     face_confidence: float = 0.0
     
+    # (width, height) of the source video before decode-time downscaling
+    source_size: Optional[tuple[int, int]] = None
+    
+    # Body parts filled in from earlier frames instead of detected in this one
+    estimated: Tuple[str, ...] = ()
+    
+    # Keypoint names for pose landmarks (provider specific)
+    pose_names: Optional[Sequence[str]] = field(default=None, repr=False)
+    
+    # Landmark2D lists, built on access (for drawing code and scripts)
+    @property
+    def pose_landmarks(self) -> List[Landmark2D]:
+        return _to_landmarks(self.pose, self.pose_names)
+    
+    @pose_landmarks.setter
+    def pose_landmarks(self, landmarks: List[Landmark2D]) -> None:
+        self.pose = _from_landmarks(landmarks)
+    
+    @property
+    def left_hand_landmarks(self) -> List[Landmark2D]:
+        return _to_landmarks(self.left_hand)
+    
+    @left_hand_landmarks.setter
+    def left_hand_landmarks(self, landmarks: List[Landmark2D]) -> None:
+        self.left_hand = _from_landmarks(landmarks)
+    
+    @property
+    def right_hand_landmarks(self) -> List[Landmark2D]:
+        return _to_landmarks(self.right_hand)
+    
+    @right_hand_landmarks.setter
+    def right_hand_landmarks(self, landmarks: List[Landmark2D]) -> None:
+        self.right_hand = _from_landmarks(landmarks)
+    
+    @property
+    def face_landmarks(self) -> List[Landmark2D]:
+        return _to_landmarks(self.face)
+    
+    @face_landmarks.setter
+    def face_landmarks(self, landmarks: List[Landmark2D]) -> None:
+        self.face = _from_landmarks(landmarks)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dict for serialization"""
+        pose_names = self.pose_names or ()
         return {
             'frame_index': self.frame_index,
             'time_s': self.time_s,
-            'image_size': {'width': self.image_size[0], 'height': self.image_size[1]},
+            'image_size': {
+                'width': self.image_size[0],
+                'height': self.image_size[1],
+                'source_width': (self.source_size or self.image_size)[0],
+                'source_height': (self.source_size or self.image_size)[1]
+            },
             'pose_landmarks': [
-                {'x': lm.x, 'y': lm.y, 'c': lm.confidence, 'name': lm.name}
-                for lm in self.pose_landmarks
+                {'x': x, 'y': y, 'c': c, 'name': pose_names[i] if i < len(pose_names) else None}
+                for i, (x, y, c) in enumerate(_rows(self.pose))
             ],
             'left_hand_landmarks': [
-                {'x': lm.x, 'y': lm.y, 'c': lm.confidence}
-                for lm in self.left_hand_landmarks
+                {'x': x, 'y': y, 'c': c} for x, y, c in _rows(self.left_hand)
             ],
             'right_hand_landmarks': [
-                {'x': lm.x, 'y': lm.y, 'c': lm.confidence}
-                for lm in self.right_hand_landmarks
+                {'x': x, 'y': y, 'c': c} for x, y, c in _rows(self.right_hand)
             ],
             'face_landmarks': [
-                {'x': lm.x, 'y': lm.y, 'c': lm.confidence}
-                for lm in self.face_landmarks
+                {'x': x, 'y': y, 'c': c} for x, y, c in _rows(self.face)
             ],
             'confidence': {
                 'pose': self.pose_confidence,
                 'left_hand': self.left_hand_confidence,
                 'right_hand': self.right_hand_confidence,
                 'face': self.face_confidence
-            }
+            },
+            'estimated': list(self.estimated)
         }
+    
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "TrackingResult":
+        """Inverse of to_dict (reads v1 tracking records)"""
+        image_size = record.get('image_size') or {}
+        width, height = image_size.get('width', 0), image_size.get('height', 0)
+        source = (image_size.get('source_width'), image_size.get('source_height'))
+        confidence = record.get('confidence') or {}
+        pose = record.get('pose_landmarks') or []
+        
+        def points(landmarks) -> Optional[np.ndarray]:
+            if not landmarks:
+                return None
+            return np.array(
+                [(lm['x'], lm['y'], lm.get('c', lm.get('confidence', 1.0))) for lm in landmarks],
+                dtype=np.float32
+            )
+        
+        return cls(
+            frame_index=int(record['frame_index']),
+            time_s=float(record['time_s']),
+            image_size=(int(width), int(height)),
+            pose=points(pose),
+            left_hand=points(record.get('left_hand_landmarks')),
+            right_hand=points(record.get('right_hand_landmarks')),
+            face=points(record.get('face_landmarks')),
+            pose_confidence=float(confidence.get('pose', record.get('pose_confidence', 0.0))),
+            left_hand_confidence=float(confidence.get('left_hand', record.get('left_hand_confidence', 0.0))),
+            right_hand_confidence=float(confidence.get('right_hand', record.get('right_hand_confidence', 0.0))),
+            face_confidence=float(confidence.get('face', record.get('face_confidence', 0.0))),
+            source_size=(int(source[0]), int(source[1])) if all(source) else None,
+            estimated=tuple(record.get('estimated') or ()),
+            pose_names=[lm.get('name') for lm in pose] if pose and pose[0].get('name') else None
+        )
+
+
+def _rows(points: Optional[np.ndarray]) -> List[List[float]]:
+    """(K, 3) array as nested Python floats"""
+    return [] if points is None else points.tolist()
+
+
+def _to_landmarks(
+    points: Optional[np.ndarray],
+    names: Optional[Sequence[str]] = None
+) -> List[Landmark2D]:
+    """(K, 3) array to Landmark2D list"""
+    names = names or ()
+    return [
+        Landmark2D(x=x, y=y, confidence=c, name=names[i] if i < len(names) else None)
+        for i, (x, y, c) in enumerate(_rows(points))
+    ]
+
+
+def _from_landmarks(landmarks: List[Landmark2D]) -> Optional[np.ndarray]:
+    """Landmark2D list to (K, 3) array (None when empty)"""
+    if not landmarks:
+        return None
+    return np.array([(lm.x, lm.y, lm.confidence) for lm in landmarks], dtype=np.float32)
 
 
 class TrackingProvider(ABC):
     """Abstract base class for tracking providers"""
     
+    # Keypoints per body part (0 for parts never produced), used to
+    # preallocate TrackingSequence storage and to fix the output schema
+    # before the first chunk; without all parts a video is not chunked
+    KEYPOINT_COUNTS: Dict[str, int] = {}
+    
     @abstractmethod
     def track_frame(
         self,
@@ -80,6 +199,31 @@ class TrackingProvider(ABC):
         """Track single frame, return results"""
         pass
     
+    def track_batch(
+        self,
+        frames: List[np.ndarray],
+        frame_indices: List[int],
+        times_s: List[float]
+    ) -> List[TrackingResult]:
+        """
+        Track several consecutive frames, return one result per frame.
+        
+        Default implementation calls track_frame for each frame. Providers
+        whose models support batched inference should override this.
+        """
+        return [
+            self.track_frame(frame, frame_index, time_s)
+            for frame, frame_index, time_s in zip(frames, frame_indices, times_s)
+        ]
+    
+    def cache_params(self) -> Dict[str, Any]:
+        """
+        Settings that change this provider's output (model, thresholds,
+        library version). Part of the inference cache key, so cached
+        results are only reused for identically configured providers.
+        """
+        return {}
+    
     @abstractmethod
     def close(self) -> None:
         """Clean up resources"""
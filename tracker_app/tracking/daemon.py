@@ -0,0 +1,390 @@
+import os
+import socket
+import socketserver
+import struct
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import orjson
+from loguru import logger
+
+from tracker_app.tracking.base import TrackingProvider, TrackingResult, BODY_PARTS
+
+PROTOCOL_VERSION = 2
+
+# Message framing: header and body length, then a JSON header and a raw body
+_FRAMING = struct.Struct('!II')
+
+# (provider name, min_confidence, sorted provider options)
+ProviderKey = Tuple[str, float, Tuple[Tuple[str, Any], ...]]
+
+
+def provider_key(name: str, min_confidence: float = 0.5, options: Optional[Dict[str, Any]] = None) -> ProviderKey:
+    return (name.lower(), float(min_confidence), tuple(sorted((options or {}).items())))
+
+
+def send_message(sock: socket.socket, header: Dict[str, Any], body: bytes = b'') -> None:
+    data = orjson.dumps(header)
+    sock.sendall(_FRAMING.pack(len(data), len(body)) + data)
+    if body:
+        sock.sendall(body)
+
+
+def recv_message(sock: socket.socket) -> Tuple[Dict[str, Any], bytearray]:
+    header_len, body_len = _FRAMING.unpack(_recv_exact(sock, _FRAMING.size))
+    header = orjson.loads(_recv_exact(sock, header_len))
+    return header, _recv_exact(sock, body_len)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if not n:
+            raise ConnectionError("Provider daemon connection closed")
+        received += n
+    return buffer
+
+
+def encode_results(results: List[TrackingResult]) -> Tuple[List[Dict[str, Any]], bytes]:
+    """Results as JSON-able metadata plus the landmark arrays as raw float32"""
+    meta, chunks = [], []
+    for result in results:
+        parts = {}
+        for part in BODY_PARTS:
+            points = getattr(result, part)
+            if points is not None:
+                points = np.ascontiguousarray(points, dtype=np.float32)
+                parts[part] = len(points)
+                chunks.append(points.tobytes())
+        meta.append({
+            'frame_index': result.frame_index,
+            'time_s': result.time_s,
+            'image_size': list(result.image_size),
+            'parts': parts,
+            'confidence': {part: getattr(result, f"{part}_confidence") for part in BODY_PARTS},
+            'estimated': list(result.estimated),
+            'pose_names': list(result.pose_names) if result.pose_names else None
+        })
+    return meta, b''.join(chunks)
+
+
+def decode_results(meta: List[Dict[str, Any]], body: bytearray) -> List[TrackingResult]:
+    """Inverse of encode_results (arrays are views into body)"""
+    data = np.frombuffer(body, dtype=np.float32)
+    offset = 0
+    results = []
+    for item in meta:
+        result = TrackingResult(
+            frame_index=item['frame_index'],
+            time_s=item['time_s'],
+            image_size=tuple(item['image_size']),
+            estimated=tuple(item['estimated']),
+            pose_names=item['pose_names']
+        )
+        for part, rows in item['parts'].items():
+            setattr(result, part, data[offset:offset + rows * 3].reshape(rows, 3))
+            offset += rows * 3
+        for part, confidence in item['confidence'].items():
+            setattr(result, f"{part}_confidence", confidence)
+        results.append(result)
+    return results
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attach to a client's segment without taking ownership of it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers attached segments too and would unlink
+        # them when the daemon exits; the client unlinks its own
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class ProviderDaemon(socketserver.ThreadingUnixStreamServer):
+    """
+    Local inference server holding warm tracking providers.
+    
+    Each client connection is a session with its own provider instance,
+    checked out of a pool on 'open' and returned when the client
+    disconnects, so model load time is paid once per daemon rather than
+    once per command. Providers are not shared by concurrent sessions:
+    MediaPipe keeps tracking state between frames.
+    
+    Frames are passed in a shared memory segment owned by the client (see
+    DaemonProvider); only offsets and shapes go over the socket.
+    Landmarks come back in the reply body as raw float32.
+    """
+    
+    daemon_threads = True
+    block_on_close = False  # Stopping does not wait for connected clients
+    
+    def __init__(self, socket_path: Path):
+        self.socket_path = Path(socket_path)
+        self.sessions = 0  # Connected clients holding a provider
+        self._pool: Dict[ProviderKey, List[TrackingProvider]] = {}
+        self._lock = threading.Lock()
+        
+        if self.socket_path.exists():
+            if daemon_running(self.socket_path):
+                raise RuntimeError(f"Provider daemon already running at {self.socket_path}")
+            self.socket_path.unlink()  # Left behind by a daemon that was killed
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        # Created owner-only: a chmod after bind would leave a window
+        # in which other users could connect
+        umask = os.umask(0o177)
+        try:
+            super().__init__(str(self.socket_path), _SessionHandler)
+        finally:
+            os.umask(umask)
+    
+    def checkout(self, key: ProviderKey) -> TrackingProvider:
+        """An idle warm provider for key, or a new one"""
+        with self._lock:
+            idle = self._pool.get(key)
+            if idle:
+                return idle.pop()
+        
+        from tracker_app.tracking.factory import create_tracking_provider
+        name, min_confidence, options = key
+        logger.info(f"Loading provider {name} (min_confidence={min_confidence})")
+        return create_tracking_provider(name, min_confidence, dict(options))
+    
+    def checkin(self, key: ProviderKey, provider: TrackingProvider) -> None:
+        with self._lock:
+            self._pool.setdefault(key, []).append(provider)
+    
+    def preload(self, key: ProviderKey) -> None:
+        """Load a provider now so the first session finds it warm"""
+        self.checkin(key, self.checkout(key))
+    
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            idle = [
+                {'provider': name, 'min_confidence': min_confidence,
+                 'options': dict(options), 'idle': len(providers)}
+                for (name, min_confidence, options), providers in self._pool.items()
+            ]
+        return {'pid': os.getpid(), 'sessions': self.sessions, 'providers': idle}
+    
+    def server_close(self) -> None:
+        super().server_close()
+        with self._lock:
+            providers = [provider for idle in self._pool.values() for provider in idle]
+            self._pool.clear()
+        for provider in providers:
+            try:
+                provider.close()
+            except Exception as e:
+                logger.warning(f"Failed to close provider: {e}")
+        self.socket_path.unlink(missing_ok=True)
+
+
+class _SessionHandler(socketserver.BaseRequestHandler):
+    """One client session: open a provider, then track batches until disconnect"""
+    
+    def handle(self) -> None:
+        server: ProviderDaemon = self.server
+        sock = self.request
+        key = provider = shm = None
+        
+        try:
+            while True:
+                try:
+                    header, _ = recv_message(sock)
+                except ConnectionError:
+                    break
+                
+                op = header.get('op')
+                try:
+                    if op == 'open':
+                        if header.get('protocol') != PROTOCOL_VERSION:
+                            raise ValueError(f"Protocol {header.get('protocol')} not supported (daemon: {PROTOCOL_VERSION})")
+                        if provider is not None:
+                            raise ValueError("Session already has a provider")
+                        key = provider_key(header['provider'], header['min_confidence'], header['options'])
+                        provider = server.checkout(key)
+                        with server._lock:
+                            server.sessions += 1
+                        send_message(sock, {
+                            'keypoint_counts': provider.KEYPOINT_COUNTS,
+                            'cache_params': provider.cache_params()
+                        })
+                    elif op == 'track':
+                        if provider is None:
+                            raise ValueError("No provider open")
+                        if shm is None or shm.name != header['shm']:
+                            if shm is not None:
+                                shm.close()
+                            shm = _attach_shared_memory(header['shm'])
+                        frames = [
+                            np.ndarray(tuple(spec['shape']), dtype=np.uint8, buffer=shm.buf, offset=spec['offset'])
+                            for spec in header['frames']
+                        ]
+                        results = provider.track_batch(frames, header['frame_indices'], header['times_s'])
+                        del frames  # Views must be gone before the segment is closed
+                        meta, body = encode_results(results)
+                        send_message(sock, {'results': meta}, body)
+                    elif op == 'status':
+                        send_message(sock, server.status())
+                    elif op == 'shutdown':
+                        send_message(sock, {'ok': True})
+                        logger.info("Provider daemon stopping")
+                        threading.Thread(target=server.shutdown, daemon=True).start()
+                        break
+                    else:
+                        raise ValueError(f"Unknown request: {op}")
+                except Exception as e:
+                    logger.error(f"Provider daemon {op} failed: {e}")
+                    send_message(sock, {'error': f"{type(e).__name__}: {e}"})
+        finally:
+            if shm is not None:
+                shm.close()
+            if provider is not None:
+                server.checkin(key, provider)
+                with server._lock:
+                    server.sessions -= 1
+
+
+class DaemonProvider(TrackingProvider):
+    """
+    TrackingProvider that runs inference in a ProviderDaemon.
+    
+    Holds one session (and so one warm provider instance) in the daemon
+    until closed. Frames are copied into a shared memory segment owned by
+    this client, which grows to the largest batch seen. Like in-process
+    providers, an instance is for one thread at a time.
+    """
+    
+    def __init__(
+        self,
+        socket_path: Path,
+        name: str,
+        min_confidence: float = 0.5,
+        options: Optional[Dict[str, Any]] = None
+    ):
+        self.socket_path = Path(socket_path)
+        self.name = name
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.connect(str(self.socket_path))
+            reply, _ = self._call({
+                'op': 'open',
+                'protocol': PROTOCOL_VERSION,
+                'provider': name,
+                'min_confidence': min_confidence,
+                'options': options or {}
+            })
+        except BaseException:
+            self._sock.close()
+            raise
+        self.KEYPOINT_COUNTS = reply['keypoint_counts']
+        self._cache_params = reply['cache_params']
+    
+    def _call(self, header: Dict[str, Any]) -> Tuple[Dict[str, Any], bytearray]:
+        send_message(self._sock, header)
+        reply, body = recv_message(self._sock)
+        if 'error' in reply:
+            raise RuntimeError(f"Provider daemon: {reply['error']}")
+        return reply, body
+    
+    def track_frame(self, frame: np.ndarray, frame_index: int, time_s: float) -> TrackingResult:
+        return self.track_batch([frame], [frame_index], [time_s])[0]
+    
+    def track_batch(
+        self,
+        frames: List[np.ndarray],
+        frame_indices: List[int],
+        times_s: List[float]
+    ) -> List[TrackingResult]:
+        if not frames:
+            return []
+        
+        self._reserve(sum(frame.nbytes for frame in frames))
+        specs = []
+        offset = 0
+        for frame in frames:
+            np.ndarray(frame.shape, dtype=np.uint8, buffer=self._shm.buf, offset=offset)[...] = frame
+            specs.append({'shape': list(frame.shape), 'offset': offset})
+            offset += frame.nbytes
+        
+        reply, body = self._call({
+            'op': 'track',
+            'shm': self._shm.name,
+            'frames': specs,
+            'frame_indices': [int(i) for i in frame_indices],
+            'times_s': [float(t) for t in times_s]
+        })
+        return decode_results(reply['results'], body)
+    
+    def _reserve(self, size: int) -> None:
+        """Make the shared memory segment hold at least size bytes"""
+        if self._shm is not None and self._shm.size >= size:
+            return
+        self._release_shared_memory()
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+    
+    def _release_shared_memory(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+    
+    def cache_params(self) -> Dict[str, Any]:
+        # The daemon's provider settings, so cache keys match in-process runs
+        return dict(self._cache_params)
+    
+    def close(self) -> None:
+        self._sock.close()
+        self._release_shared_memory()
+
+
+def connect_provider(
+    socket_path: Path,
+    name: str,
+    min_confidence: float = 0.5,
+    options: Optional[Dict[str, Any]] = None
+) -> Optional[DaemonProvider]:
+    """DaemonProvider if a daemon listens on socket_path, else None"""
+    socket_path = Path(socket_path)
+    if not socket_path.exists():
+        return None
+    try:
+        provider = DaemonProvider(socket_path, name, min_confidence, options)
+    except OSError as e:
+        # Stale socket file of a daemon that is gone
+        logger.debug(f"No provider daemon at {socket_path}: {e}")
+        return None
+    except (RuntimeError, ValueError, KeyError, struct.error) as e:
+        # Daemon of another protocol version, failing to load the provider,
+        # or a malformed reply: load the provider in this process instead
+        logger.warning(f"Provider daemon at {socket_path} unusable, loading {name} in this process: {e}")
+        return None
+    logger.info(f"Using warm {name} provider from daemon at {socket_path}")
+    return provider
+
+
+def daemon_request(socket_path: Path, op: str) -> Dict[str, Any]:
+    """Send a control request ('status' or 'shutdown') to a running daemon"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        send_message(sock, {'op': op})
+        reply, _ = recv_message(sock)
+    if 'error' in reply:
+        raise RuntimeError(f"Provider daemon: {reply['error']}")
+    return reply
+
+
+def daemon_running(socket_path: Path) -> bool:
+    try:
+        daemon_request(socket_path, 'status')
+        return True
+    except OSError:
+        return False
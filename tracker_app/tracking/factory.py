@@ -1,23 +1,61 @@
-from typing import Any
-from tracker_app.tracking.mediapipe_provider import MediaPipeProvider
+from typing import Any, Dict, Optional
 import logging
+import socket
 
 logger = logging.getLogger(__name__)
 
-def get_tracking_provider(name: str, min_confidence: float = 0.5):
+def get_tracking_provider(name: str, min_confidence: float = 0.5, config: Any = None, use_daemon: bool = True):
     """
     Factory to create tracking provider instance.
     
+    With config.provider_daemon and a daemon listening on
+    config.provider_daemon_socket (`python -m tracker_app daemon start`),
+    returns a client of a warm provider in the daemon instead of loading
+    the models in this process. The daemon needs Unix domain sockets; on
+    platforms without them (Windows) the setting is ignored.
+    
     Args:
         name: 'mediapipe' or 'rtmpose'
         min_confidence: content threshold
+        config: Optional Config with provider-specific settings
+        use_daemon: False to always load in this process (pool workers)
     """
+    options = provider_options(config)
+    
+    if use_daemon and config is not None and config.provider_daemon:
+        if not hasattr(socket, 'AF_UNIX'):
+            logger.warning("Provider daemon needs Unix domain sockets: loading the provider in this process")
+            return create_tracking_provider(name, min_confidence, options)
+        from tracker_app.tracking.daemon import connect_provider
+        provider = connect_provider(config.provider_daemon_socket, name, min_confidence, options)
+        if provider is not None:
+            return provider
+    
+    return create_tracking_provider(name, min_confidence, options)
+
+
+def provider_options(config: Any = None) -> Dict[str, Any]:
+    """MediaPipeProvider keyword arguments from config (defaults without one)"""
+    if config is None:
+        return {}
+    return {
+        'concurrent_models': config.mediapipe_concurrent_models,
+        'face_every': config.mediapipe_face_every,
+        'face_motion': config.mediapipe_face_motion
+    }
+
+
+def create_tracking_provider(name: str, min_confidence: float = 0.5, options: Optional[Dict[str, Any]] = None):
+    """Load a tracking provider in this process (options: see provider_options)"""
     name = name.lower()
     
+    # Providers are imported on use: mediapipe alone takes most of a second
     if "mediapipe" in name:
+        from tracker_app.tracking.mediapipe_provider import MediaPipeProvider
         return MediaPipeProvider(
             min_detection_confidence=min_confidence,
-            min_tracking_confidence=min_confidence
+            min_tracking_confidence=min_confidence,
+            **(options or {})
         )
     elif "rtmpose" in name or "mmpose" in name:
         try:
@@ -1,10 +1,11 @@
 import mediapipe as mp
 import numpy as np
 import cv2  # Added cv2 import
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from loguru import logger
 
-from .base import TrackingProvider, TrackingResult, Landmark2D
+from .base import TrackingProvider, TrackingResult
 
 
 class MediaPipeProvider(TrackingProvider):
@@ -23,13 +24,48 @@ class MediaPipeProvider(TrackingProvider):
         'left_foot_index', 'right_foot_index'
     ]
     
+    # Face mesh has 478 points with refine_landmarks=True (468 + irises)
+    KEYPOINT_COUNTS = {'pose': 33, 'left_hand': 21, 'right_hand': 21, 'face': 478}
+    
+    # Pose landmarks that move with the head (nose, left ear, right ear)
+    HEAD_LANDMARKS = (0, 7, 8)
+    
     def __init__(
         self,
         min_detection_confidence: float = 0.5,
-        min_tracking_confidence: float = 0.5
+        min_tracking_confidence: float = 0.5,
+        concurrent_models: bool = False,
+        face_every: int = 1,
+        face_motion: float = 0.0
     ):
+        """
+        Args:
+            min_detection_confidence: Detection threshold for all three models
+            min_tracking_confidence: Tracking threshold for all three models
+            concurrent_models: Run pose, hands and face mesh in parallel threads.
+                The graphs are independent and release the GIL in native code.
+            face_every: Run face mesh on at least every Nth frame (1 = every
+                frame). Frames in between get the last face mesh result moved
+                along with the nose, and list 'face' in TrackingResult.estimated.
+            face_motion: With face_every > 1, also run face mesh as soon as the
+                nose or an ear moved more than this many ear-to-ear distances
+                since the last face mesh frame (0 = cadence only)
+        """
         self.min_detection_confidence = min_detection_confidence
         self.min_tracking_confidence = min_tracking_confidence
+        self.face_every = max(1, face_every)
+        self.face_motion = face_motion
+        
+        # Last face mesh run: frame index, face, its confidence and head landmarks
+        self._face_frame: Optional[int] = None
+        self._face: Optional[np.ndarray] = None
+        self._face_confidence = 0.0
+        self._face_head: Optional[np.ndarray] = None
+        
+        # One thread per model; each graph is only ever used by one call at a time
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if concurrent_models:
+            self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="mediapipe")
         
         # Initialize MediaPipe solutions
         self.pose = mp.solutions.pose.Pose(
@@ -54,7 +90,10 @@ class MediaPipeProvider(TrackingProvider):
             min_tracking_confidence=min_tracking_confidence
         )
         
-        logger.info("MediaPipe provider initialized")
+        cadence = f", face mesh every {self.face_every} frames" if self.face_every > 1 else ""
+        logger.info(
+            f"MediaPipe provider initialized ({'concurrent' if self._executor else 'sequential'} models{cadence})"
+        )
     
     def track_frame(
         self,
@@ -70,21 +109,38 @@ class MediaPipeProvider(TrackingProvider):
         result = TrackingResult(
             frame_index=frame_index,
             time_s=time_s,
-            image_size=(width, height)
+            image_size=(width, height),
+            pose_names=self.POSE_LANDMARKS
         )
         
+        # With a face mesh cadence, whether to run it depends on the pose
+        adaptive = self.face_every > 1
+        if self._executor is not None:
+            pose_future = self._executor.submit(self.pose.process, frame_rgb)
+            hands_future = self._executor.submit(self.hands.process, frame_rgb)
+            face_future = None if adaptive else self._executor.submit(self.face_mesh.process, frame_rgb)
+            pose_results = pose_future.result()
+            head = self._head_points(pose_results)
+            if adaptive and self._face_due(frame_index, head):
+                face_future = self._executor.submit(self.face_mesh.process, frame_rgb)
+            hands_results = hands_future.result()
+            face_results = face_future.result() if face_future is not None else None
+        else:
+            pose_results = self.pose.process(frame_rgb)
+            hands_results = self.hands.process(frame_rgb)
+            head = self._head_points(pose_results)
+            face_results = None
+            if not adaptive or self._face_due(frame_index, head):
+                face_results = self.face_mesh.process(frame_rgb)
+        
         # Process pose
-        pose_results = self.pose.process(frame_rgb)
         if pose_results.pose_landmarks:
-            result.pose_landmarks = self._convert_pose_landmarks(
+            result.pose = self._convert_pose_landmarks(
                 pose_results.pose_landmarks
             )
-            result.pose_confidence = self._calculate_avg_confidence(
-                result.pose_landmarks
-            )
+            result.pose_confidence = self._calculate_avg_confidence(result.pose)
         
         # Process hands
-        hands_results = self.hands.process(frame_rgb)
         if hands_results.multi_hand_landmarks:
             for hand_landmarks, handedness in zip(
                 hands_results.multi_hand_landmarks,
@@ -97,58 +153,106 @@ class MediaPipeProvider(TrackingProvider):
                 # Determine left/right
                 hand_type = handedness.classification[0].label  # "Left" or "Right"
                 if hand_type == "Left":
-                    result.left_hand_landmarks = landmarks
+                    result.left_hand = landmarks
                     result.left_hand_confidence = confidence
                 else:
-                    result.right_hand_landmarks = landmarks
+                    result.right_hand = landmarks
                     result.right_hand_confidence = confidence
         
         # Process face
-        face_results = self.face_mesh.process(frame_rgb)
-        if face_results.multi_face_landmarks:
+        if face_results is None:
+            self._hold_face(result, head)
+        elif face_results.multi_face_landmarks:
             # Take first face only
             face_landmarks = face_results.multi_face_landmarks[0]
             # For face, use presence as confidence (force 1.0)
-            result.face_landmarks = self._convert_landmarks(face_landmarks, use_visibility=False)
-            result.face_confidence = self._calculate_avg_confidence(
-                result.face_landmarks
-            )
+            result.face = self._convert_landmarks(face_landmarks, use_visibility=False)
+            result.face_confidence = self._calculate_avg_confidence(result.face)
+        
+        if adaptive and face_results is not None:
+            self._face_frame = frame_index
+            self._face = result.face
+            self._face_confidence = result.face_confidence
+            self._face_head = head
         
         return result
     
-    def _convert_pose_landmarks(self, landmarks) -> List[Landmark2D]:
-        """Convert MediaPipe pose landmarks to our format"""
-        result = []
-        for idx, lm in enumerate(landmarks.landmark):
-            name = self.POSE_LANDMARKS[idx] if idx < len(self.POSE_LANDMARKS) else None
-            result.append(Landmark2D(
-                x=lm.x,
-                y=lm.y,
-                confidence=lm.visibility,  # Note: pose uses 'visibility'
-                name=name
-            ))
-        return result
+    def _head_points(self, pose_results) -> Optional[np.ndarray]:
+        """(3, 2) x, y of nose and ears, or None without a pose"""
+        if not pose_results.pose_landmarks:
+            return None
+        landmarks = pose_results.pose_landmarks.landmark
+        return np.array([(landmarks[i].x, landmarks[i].y) for i in self.HEAD_LANDMARKS], dtype=np.float32)
     
-    def _convert_landmarks(self, landmarks, use_visibility: bool = True) -> List[Landmark2D]:
-        """Convert MediaPipe landmarks to our format"""
-        result = []
-        for lm in landmarks.landmark:
-            conf = getattr(lm, 'visibility', 1.0) if use_visibility else 1.0
-            result.append(Landmark2D(
-                x=lm.x,
-                y=lm.y,
-                confidence=conf
-            ))
-        return result
+    def _face_due(self, frame_index: int, head: Optional[np.ndarray]) -> bool:
+        """Whether face mesh runs on this frame (face_every > 1)"""
+        # First frame, or frame indices restarted with the next video
+        if self._face_frame is None or frame_index <= self._face_frame:
+            return True
+        if frame_index - self._face_frame >= self.face_every:
+            return True
+        if self.face_motion <= 0:
+            return False
+        if head is None or self._face_head is None:
+            return True
+        ear_distance = max(float(np.linalg.norm(self._face_head[1] - self._face_head[2])), 1e-3)
+        moved = float(np.linalg.norm(head - self._face_head, axis=1).max())
+        return moved > self.face_motion * ear_distance
+    
+    def _hold_face(self, result: TrackingResult, head: Optional[np.ndarray]) -> None:
+        """Fill in the last face mesh result, shifted by the nose motion since"""
+        if self._face is None:
+            return
+        face = self._face.copy()
+        if head is not None and self._face_head is not None:
+            face[:, :2] += head[0] - self._face_head[0]
+        result.face = face
+        result.face_confidence = self._face_confidence
+        result.estimated = ('face',)
+    
+    def _convert_pose_landmarks(self, landmarks) -> np.ndarray:
+        """Convert MediaPipe pose landmarks to a (33, 3) x, y, confidence array"""
+        # Note: pose uses 'visibility' as confidence
+        return np.array(
+            [(lm.x, lm.y, lm.visibility) for lm in landmarks.landmark],
+            dtype=np.float32
+        )
+    
+    def _convert_landmarks(self, landmarks, use_visibility: bool = True) -> np.ndarray:
+        """Convert MediaPipe landmarks to a (K, 3) x, y, confidence array"""
+        if use_visibility:
+            return np.array(
+                [(lm.x, lm.y, getattr(lm, 'visibility', 1.0)) for lm in landmarks.landmark],
+                dtype=np.float32
+            )
+        points = np.ones((len(landmarks.landmark), 3), dtype=np.float32)
+        points[:, :2] = [(lm.x, lm.y) for lm in landmarks.landmark]
+        return points
     
-    def _calculate_avg_confidence(self, landmarks: List[Landmark2D]) -> float:
+    def _calculate_avg_confidence(self, points: Optional[np.ndarray]) -> float:
         """Calculate average confidence across landmarks"""
-        if not landmarks:
+        if points is None or len(points) == 0:
             return 0.0
-        return sum(lm.confidence for lm in landmarks) / len(landmarks)
+        return float(points[:, 2].mean(dtype=np.float64))
+    
+    def cache_params(self) -> dict:
+        params = {
+            'mediapipe': mp.__version__,
+            'pose_model_complexity': 1,
+            'refine_landmarks': True,
+            'min_detection_confidence': self.min_detection_confidence,
+            'min_tracking_confidence': self.min_tracking_confidence
+        }
+        # Only with a cadence, so cache entries of every-frame runs stay valid
+        if self.face_every > 1:
+            params['face_every'] = self.face_every
+            params['face_motion'] = self.face_motion
+        return params
     
     def close(self) -> None:
         """Release resources"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
         self.pose.close()
         self.hands.close()
         self.face_mesh.close()
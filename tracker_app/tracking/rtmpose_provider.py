@@ -7,9 +7,12 @@ try:
 except ImportError:
     MMPoseInferencer = None
 
-from tracker_app.tracking.base import TrackingProvider, TrackingResult, Landmark2D
+from tracker_app.tracking.base import TrackingProvider, TrackingResult
 
 class RTMPoseProvider(TrackingProvider):
+    # COCO-WholeBody slices (see _to_tracking_result)
+    KEYPOINT_COUNTS = {'pose': 17, 'left_hand': 21, 'right_hand': 21, 'face': 68}
+
     def __init__(
         self,
         pose_model: str = 'rtmpose-l_8xb32-270e_coco-wholebody-384x288',
@@ -23,6 +26,8 @@ class RTMPoseProvider(TrackingProvider):
         print(f"Initializing RTMPose on {device}...")
         self.device = device
         self.min_confidence = min_confidence
+        self.pose_model = pose_model
+        self.det_model = det_model
         
         # Initialize Inferencer
         self.inferencer = MMPoseInferencer(
@@ -34,16 +39,52 @@ class RTMPoseProvider(TrackingProvider):
         print("RTMPose initialized.")
 
     def track_frame(self, frame: np.ndarray, frame_idx: int, timestamp: float) -> TrackingResult:
-        height, width = frame.shape[:2]
+        return self.track_batch([frame], [frame_idx], [timestamp])[0]
+
+    def track_batch(
+        self,
+        frames: List[np.ndarray],
+        frame_indices: List[int],
+        times_s: List[float]
+    ) -> List[TrackingResult]:
+        """Run detector and pose model once for the whole batch"""
+        if not frames:
+            return []
         
-        # MMPose expects RGB usually, or BGR? 
         # MMPose APIs mostly accept image path or numpy array (BGR usually for cv2)
-        # We'll rely on it accepting the frame as is (BGR from cv2).
+        # We'll rely on it accepting the frames as is (BGR from cv2).
         
         # Run inference
-        # inferencer returns a generator
-        result_generator = self.inferencer(frame, return_vis=False)
-        result = next(result_generator)
+        # inferencer returns a generator yielding one result dict per batch,
+        # where 'predictions' holds one entry per input image
+        predictions = []
+        for result in self.inferencer(frames, return_vis=False, batch_size=len(frames)):
+            predictions.extend(result.get('predictions', []))
+
+        if len(frames) == 1 and len(predictions) != 1:
+            # Flat list of instances for a single image (older MMPose)
+            predictions = [predictions]
+
+        if len(predictions) != len(frames):
+            raise RuntimeError(
+                f"RTMPose returned {len(predictions)} predictions for {len(frames)} frames"
+            )
+        
+        return [
+            self._to_tracking_result(prediction, frame, frame_idx, timestamp)
+            for prediction, frame, frame_idx, timestamp
+            in zip(predictions, frames, frame_indices, times_s)
+        ]
+
+    def _to_tracking_result(
+        self,
+        prediction: Any,
+        frame: np.ndarray,
+        frame_idx: int,
+        timestamp: float
+    ) -> TrackingResult:
+        """Convert the prediction for one image to a TrackingResult"""
+        height, width = frame.shape[:2]
         
         # Initialize empty result
         tracking_result = TrackingResult(
@@ -52,30 +93,16 @@ class RTMPoseProvider(TrackingProvider):
             image_size=(width, height)
         )
         
-        # Parse predictions
-        # structure: {'predictions': [{'keypoints': [[x,y], ...], 'keypoint_scores': [...], 'bbox': ...}], ...}
-        predictions = result.get('predictions', [])
+        # structure per image: [{'keypoints': [[x,y], ...], 'keypoint_scores': [...], 'bbox': ...}, ...]
+        # Older versions give the instance dict directly instead of a list of instances.
+        per = prediction
+        if isinstance(per, (list, tuple)):
+            if not per:
+                return tracking_result
+            # Take the first person (or max confidence person)
+            per = per[0]
         
-        # DEBUG
-        # print(f"DEBUG RTMPose result keys: {result.keys()}")
-        # if predictions:
-        #    print(f"DEBUG First pred type: {type(predictions[0])}")
-        
-        if not predictions:
-            return tracking_result
-            
-        # Take the first person (or max confidence person)
-        per = predictions[0]
-        # In some versions, 'predictions' is a list of dicts. In others it might be valid.
-        
-        # Check if it's new structure where predictions contain 'instances' or similar?
-        # Actually in recent mmpose, inferencer returns dict with 'predictions'.
-        # Let's handle list of points directly if that's what it is?
-        
-        # If per is NOT a dict, that's the issue.
         if not isinstance(per, dict):
-            # Maybe it provides objects?
-            # print(f"Unexpected prediction format: {type(per)} - {per}")
             return tracking_result
             
         keypoints = per.get('keypoints')
@@ -91,53 +118,44 @@ class RTMPoseProvider(TrackingProvider):
         # 91-111: Left Hand (21)
         # 112-132: Right Hand (21)
         
-        # Helper to extract points
-        def extract_points(start, end, name_prefix=None) -> tuple[List[Landmark2D], float]:
-            points = []
-            total_score = 0.0
-            count = 0
-            
-            for i in range(start, end):
-                if i >= len(keypoints):
-                    break
-                
-                x, y = keypoints[i]
-                score = scores[i]
-                
-                # Normalize
-                norm_x = x / width
-                norm_y = y / height
-                
-                points.append(Landmark2D(
-                    x=float(norm_x),
-                    y=float(norm_y),
-                    confidence=float(score)
-                ))
-                
-                total_score += score
-                count += 1
-            
-            avg_conf = total_score / count if count > 0 else 0.0
-            return points, avg_conf
+        # All keypoints as one (N, 3) array: normalized x, y and score
+        points = np.zeros((len(keypoints), 3), dtype=np.float32)
+        points[:, :2] = np.asarray(keypoints, dtype=np.float32)[:, :2] / (width, height)
+        points[:, 2] = np.asarray(scores, dtype=np.float32)[:len(keypoints)]
+        
+        # Helper to slice out one body part
+        def extract_points(start, end) -> tuple[Optional[np.ndarray], float]:
+            part = points[start:end]
+            if len(part) == 0:
+                return None, 0.0
+            return part.copy(), float(part[:, 2].mean(dtype=np.float64))
 
         # Extract
         # Body (0-17)
-        tracking_result.pose_landmarks, tracking_result.pose_confidence = extract_points(0, 17)
+        tracking_result.pose, tracking_result.pose_confidence = extract_points(0, 17)
         
         # Face (23-91)
-        tracking_result.face_landmarks, tracking_result.face_confidence = extract_points(23, 91)
+        tracking_result.face, tracking_result.face_confidence = extract_points(23, 91)
         
         # Left Hand (91-112)
-        tracking_result.left_hand_landmarks, tracking_result.left_hand_confidence = extract_points(91, 112)
+        tracking_result.left_hand, tracking_result.left_hand_confidence = extract_points(91, 112)
         
         # Right Hand (112-133)
-        tracking_result.right_hand_landmarks, tracking_result.right_hand_confidence = extract_points(112, 133)
+        tracking_result.right_hand, tracking_result.right_hand_confidence = extract_points(112, 133)
         
         # Filter by overall confidence if needed?
         # For now, we keep all and let post-processing handle it/filter by confidence
         
         return tracking_result
 
+    def cache_params(self) -> dict:
+        return {
+            'pose_model': self.pose_model,
+            'det_model': self.det_model,
+            'device': self.device,
+            'min_confidence': self.min_confidence
+        }
+
     def close(self):
         # Clean up
         if hasattr(self, 'inferencer'):
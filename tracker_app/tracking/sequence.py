@@ -0,0 +1,277 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Any
+import numpy as np
+
+from tracker_app.tracking.base import TrackingResult, BODY_PARTS
+
+
+class TrackingSequence:
+    """
+    Columnar tracking data for consecutive frames.
+
+    Each body part is one float32 array of shape (frames, keypoints, 3)
+    with normalized x, y and confidence, plus a per-frame presence mask
+    and average confidence. Frames where a part was not detected are
+    zero-filled and marked absent; parts the provider filled in from
+    earlier frames are marked estimated.
+
+    Indexing or iterating yields TrackingResult views whose landmark
+    arrays point into this storage, so nothing is copied per frame.
+    """
+
+    def __init__(
+        self,
+        keypoint_counts: Optional[Dict[str, int]] = None,
+        keypoint_names: Optional[Dict[str, Sequence[str]]] = None,
+        capacity: int = 64
+    ):
+        """
+        Args:
+            keypoint_counts: Keypoints per body part. Parts left out are
+                sized from the first frame where they are detected.
+            keypoint_names: Optional names per body part (e.g. pose)
+            capacity: Initial number of frames to allocate
+        """
+        counts = keypoint_counts or {}
+        capacity = max(1, capacity)
+
+        self.keypoint_names: Dict[str, Sequence[str]] = dict(keypoint_names or {})
+        self._size = 0
+        self._capacity = capacity
+        self._frame_index = np.zeros(capacity, dtype=np.int64)
+        self._time_s = np.zeros(capacity, dtype=np.float64)
+        self._image_size = np.zeros((capacity, 2), dtype=np.int32)
+        self._source_size = np.zeros((capacity, 2), dtype=np.int32)
+        self._points = {
+            part: np.zeros((capacity, counts.get(part, 0), 3), dtype=np.float32)
+            for part in BODY_PARTS
+        }
+        self._present = {part: np.zeros(capacity, dtype=bool) for part in BODY_PARTS}
+        self._estimated = {part: np.zeros(capacity, dtype=bool) for part in BODY_PARTS}
+        self._confidence = {part: np.zeros(capacity, dtype=np.float64) for part in BODY_PARTS}
+
+    @classmethod
+    def from_results(cls, results: Iterable[TrackingResult]) -> "TrackingSequence":
+        """Build a sequence from per-frame results"""
+        results = list(results)
+        sequence = cls(capacity=len(results))
+        sequence.extend(results)
+        return sequence
+
+    @classmethod
+    def from_columns(
+        cls,
+        frame_index: np.ndarray,
+        time_s: np.ndarray,
+        image_size: np.ndarray,
+        points: Dict[str, np.ndarray],
+        present: Dict[str, np.ndarray],
+        confidence: Dict[str, np.ndarray],
+        source_size: Optional[np.ndarray] = None,
+        keypoint_names: Optional[Dict[str, Sequence[str]]] = None,
+        estimated: Optional[Dict[str, np.ndarray]] = None
+    ) -> "TrackingSequence":
+        """Build a sequence from whole columns (e.g. read from Parquet)"""
+        n = len(frame_index)
+        sequence = cls(
+            keypoint_counts={part: points[part].shape[1] for part in points},
+            keypoint_names=keypoint_names,
+            capacity=n
+        )
+        sequence._frame_index[:n] = frame_index
+        sequence._time_s[:n] = time_s
+        sequence._image_size[:n] = image_size
+        if source_size is not None:
+            sequence._source_size[:n] = source_size
+        for part in BODY_PARTS:
+            if part in points:
+                sequence._points[part][:n] = points[part]
+            if part in present:
+                sequence._present[part][:n] = present[part]
+            if part in confidence:
+                sequence._confidence[part][:n] = confidence[part]
+            if estimated and part in estimated:
+                sequence._estimated[part][:n] = estimated[part]
+        sequence._size = n
+        return sequence
+
+    # ------------------------------------------------------------------
+    # Column access (views, valid until the next append)
+    # ------------------------------------------------------------------
+
+    @property
+    def frame_index(self) -> np.ndarray:
+        return self._frame_index[:self._size]
+
+    @property
+    def time_s(self) -> np.ndarray:
+        return self._time_s[:self._size]
+
+    @property
+    def image_size(self) -> np.ndarray:
+        """(frames, 2) width, height given to the provider"""
+        return self._image_size[:self._size]
+
+    @property
+    def source_size(self) -> np.ndarray:
+        """(frames, 2) width, height of the source video (0 if unknown)"""
+        return self._source_size[:self._size]
+
+    def points(self, part: str) -> np.ndarray:
+        """(frames, keypoints, 3) x, y, confidence for a body part"""
+        return self._points[part][:self._size]
+
+    def present(self, part: str) -> np.ndarray:
+        """(frames,) True where the body part was detected"""
+        return self._present[part][:self._size]
+
+    def estimated(self, part: str) -> np.ndarray:
+        """(frames,) True where the provider filled the part in from earlier frames"""
+        return self._estimated[part][:self._size]
+
+    def confidence(self, part: str) -> np.ndarray:
+        """(frames,) average landmark confidence of a body part"""
+        return self._confidence[part][:self._size]
+
+    def keypoint_count(self, part: str) -> int:
+        return self._points[part].shape[1]
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def append(self, result: TrackingResult) -> None:
+        """Copy one frame into the sequence"""
+        self._reserve(self._size + 1)
+        i = self._size
+
+        self._frame_index[i] = result.frame_index
+        self._time_s[i] = result.time_s
+        self._image_size[i] = result.image_size
+        self._source_size[i] = result.source_size or (0, 0)
+
+        if result.pose_names and 'pose' not in self.keypoint_names:
+            self.keypoint_names['pose'] = list(result.pose_names)
+
+        for part in BODY_PARTS:
+            points = getattr(result, part)
+            self._confidence[part][i] = getattr(result, f"{part}_confidence")
+            self._estimated[part][i] = part in result.estimated
+            if points is None or len(points) == 0:
+                self._points[part][i] = 0
+                self._present[part][i] = False
+                continue
+
+            k = len(points)
+            self._ensure_keypoints(part, k)
+            self._points[part][i, :k] = points
+            self._points[part][i, k:] = 0
+            self._present[part][i] = True
+
+        self._size += 1
+
+    def extend(self, results: Iterable[TrackingResult]) -> None:
+        for result in results:
+            self.append(result)
+
+    def copy(self) -> "TrackingSequence":
+        """Deep copy trimmed to the current length"""
+        other = TrackingSequence(
+            keypoint_counts={part: self.keypoint_count(part) for part in BODY_PARTS},
+            keypoint_names=self.keypoint_names,
+            capacity=len(self)
+        )
+        n = self._size
+        other._frame_index[:n] = self.frame_index
+        other._time_s[:n] = self.time_s
+        other._image_size[:n] = self.image_size
+        other._source_size[:n] = self.source_size
+        for part in BODY_PARTS:
+            other._points[part][:n] = self.points(part)
+            other._present[part][:n] = self.present(part)
+            other._estimated[part][:n] = self.estimated(part)
+            other._confidence[part][:n] = self.confidence(part)
+        other._size = n
+        return other
+
+    def clear(self) -> None:
+        """Drop all frames, keeping the allocated buffers for reuse"""
+        self._size = 0
+
+    def clear_part(self, part: str) -> None:
+        """Drop all landmarks of a body part (confidence is kept)"""
+        self.points(part)[:] = 0
+        self.present(part)[:] = False
+        self.estimated(part)[:] = False
+
+    def _reserve(self, size: int) -> None:
+        """Grow buffers (doubling) to hold at least `size` frames"""
+        if size <= self._capacity:
+            return
+        capacity = max(size, self._capacity * 2)
+
+        def grow(arr: np.ndarray) -> np.ndarray:
+            out = np.zeros((capacity,) + arr.shape[1:], dtype=arr.dtype)
+            out[:self._size] = arr[:self._size]
+            return out
+
+        self._frame_index = grow(self._frame_index)
+        self._time_s = grow(self._time_s)
+        self._image_size = grow(self._image_size)
+        self._source_size = grow(self._source_size)
+        for part in BODY_PARTS:
+            self._points[part] = grow(self._points[part])
+            self._present[part] = grow(self._present[part])
+            self._estimated[part] = grow(self._estimated[part])
+            self._confidence[part] = grow(self._confidence[part])
+        self._capacity = capacity
+
+    def _ensure_keypoints(self, part: str, k: int) -> None:
+        """Widen a body part to at least k keypoints (zero-padded)"""
+        current = self._points[part]
+        if k <= current.shape[1]:
+            return
+        widened = np.zeros((self._capacity, k, 3), dtype=np.float32)
+        widened[:, :current.shape[1]] = current
+        self._points[part] = widened
+
+    # ------------------------------------------------------------------
+    # Per-frame views
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> TrackingResult:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(f"Frame {index} out of range ({self._size} frames)")
+
+        width, height = self._image_size[index]
+        source_width, source_height = self._source_size[index]
+        landmarks = {
+            part: self._points[part][index] if self._present[part][index] else None
+            for part in BODY_PARTS
+        }
+
+        return TrackingResult(
+            frame_index=int(self._frame_index[index]),
+            time_s=float(self._time_s[index]),
+            image_size=(int(width), int(height)),
+            pose_confidence=float(self._confidence['pose'][index]),
+            left_hand_confidence=float(self._confidence['left_hand'][index]),
+            right_hand_confidence=float(self._confidence['right_hand'][index]),
+            face_confidence=float(self._confidence['face'][index]),
+            source_size=(int(source_width), int(source_height)) if source_width else None,
+            estimated=tuple(part for part in BODY_PARTS if self._estimated[part][index]),
+            pose_names=self.keypoint_names.get('pose'),
+            **landmarks
+        )
+
+    def __iter__(self) -> Iterator[TrackingResult]:
+        for i in range(self._size):
+            yield self[i]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Per-frame dicts for serialization (see TrackingResult.to_dict)"""
+        return [result.to_dict() for result in self]
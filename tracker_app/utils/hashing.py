@@ -0,0 +1,17 @@
+import hashlib
+from typing import Optional
+from loguru import logger
+
+HASH_CHUNK_BYTES = 1 << 20
+
+def sha1_file(path: str, chunk_bytes: int = HASH_CHUNK_BYTES) -> Optional[str]:
+    """SHA1 of a file's content, read in chunks. None if it can't be read."""
+    digest = hashlib.sha1()
+    try:
+        with open(path, 'rb') as f:
+            while chunk := f.read(chunk_bytes):
+                digest.update(chunk)
+    except OSError as e:
+        logger.warning(f"Could not hash {path}: {e}")
+        return None
+    return digest.hexdigest()
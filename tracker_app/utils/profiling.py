@@ -0,0 +1,165 @@
+import cProfile
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from types import FrameType
+from typing import Dict, Optional
+from loguru import logger
+
+PROFILE_FORMATS = ('collapsed', 'cprofile')
+PROFILE_FILENAMES = {'collapsed': "profile.collapsed", 'cprofile': "profile.prof"}
+
+
+class StackSampler:
+    """
+    Wall-clock sampling profiler for all Python threads.
+
+    A background thread records the stack of every other thread each
+    interval_s and counts identical stacks. Waiting threads are sampled
+    too, so time spent blocked (queues, locks, native calls such as model
+    inference) shows up where it happens. Output is the collapsed-stack
+    format read by flamegraph.pl, speedscope and similar tools:
+    "thread;outer (file.py:12);inner (file.py:40) <count>".
+
+    Counts are in units of interval_s. The sampler needs the GIL, which
+    native code (MediaPipe inference) may hold far longer than one
+    interval, so each sample is weighted by the time since the previous
+    one rather than counted once.
+
+    With path set, the file is rewritten every flush_every_s while
+    sampling, so a job that hangs still leaves a profile behind.
+    """
+
+    def __init__(self, interval_s: float = 0.005, path: Optional[Path] = None, flush_every_s: float = 10.0):
+        self.interval_s = interval_s
+        self.path = path
+        self.flush_every_s = flush_every_s
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names: Dict[int, str] = {}
+        next_flush = time.monotonic() + self.flush_every_s
+        last = time.perf_counter()
+
+        while not self._stop.wait(self.interval_s):
+            now = time.perf_counter()
+            weight = max(1, round((now - last) / self.interval_s))
+            last = now
+            frames = sys._current_frames()
+            if not frames.keys() <= names.keys():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = [
+                _collapse(names.get(ident, str(ident)), frame)
+                for ident, frame in frames.items()
+                if ident != own
+            ]
+            del frames
+            with self._lock:
+                for stack in stacks:
+                    self.counts[stack] += weight
+                self.samples += 1
+
+            if self.path is not None and time.monotonic() >= next_flush:
+                self.write(self.path)
+                next_flush = time.monotonic() + self.flush_every_s
+
+    def write(self, path: Path) -> None:
+        """Write collapsed stacks (atomically replaces path)"""
+        with self._lock:
+            lines = [f"{stack} {count}\n" for stack, count in sorted(self.counts.items())]
+        tmp_path = path.with_name(path.name + ".part")
+        tmp_path.write_text("".join(lines))
+        os.replace(tmp_path, path)
+
+
+def _collapse(thread_name: str, frame: Optional[FrameType]) -> str:
+    """Stack of frame as 'thread;outermost;...;innermost'"""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        name = getattr(code, 'co_qualname', code.co_name)
+        parts.append(f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':'))
+        frame = frame.f_back
+    parts.append(thread_name.replace(';', ':'))
+    return ';'.join(reversed(parts))
+
+
+def should_profile(job_id: str, sample: float) -> bool:
+    """
+    Whether a job is in the profiled sample.
+
+    Chosen from a hash of the job id, so pool workers agree without
+    coordination and a rerun of a job makes the same choice.
+    """
+    if sample >= 1.0:
+        return True
+    if sample <= 0.0:
+        return False
+    digest = hashlib.sha1(job_id.encode()).digest()
+    return int.from_bytes(digest[:4], 'big') / 2 ** 32 < sample
+
+
+@contextmanager
+def profile_to(path: Path, fmt: str = 'collapsed', interval_s: float = 0.005):
+    """
+    Profile the enclosed block and write the result to path, also when
+    the block raises.
+
+    'collapsed' samples the stacks of all threads (StackSampler);
+    'cprofile' traces every call, in the calling thread only, and writes
+    pstats data (python -m pstats, snakeviz).
+    """
+    if fmt not in PROFILE_FORMATS:
+        raise ValueError(f"Unknown profile format: {fmt} (expected one of {', '.join(PROFILE_FORMATS)})")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if fmt == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(str(path))
+            logger.info(f"Profile written: {path}")
+        return
+
+    sampler = StackSampler(interval_s, path=path).start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        sampler.write(path)
+        logger.info(f"Profile written: {path} ({sampler.samples} samples)")
+
+
+def job_profiler(job: Dict, config):
+    """
+    Context manager profiling one job when config.profile is set and the
+    job is in the config.profile_sample fraction; writes the profile next
+    to the job's meta.json. Otherwise a no-op.
+    """
+    if not config.profile or not should_profile(str(job['id']), config.profile_sample):
+        return nullcontext()
+    path = config.tracks_dir / job['video_id'] / PROFILE_FILENAMES[config.profile_format]
+    return profile_to(path, config.profile_format, config.profile_interval_ms / 1000)
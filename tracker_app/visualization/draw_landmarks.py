@@ -1,9 +1,9 @@
 import cv2
 import numpy as np
 from pathlib import Path
-from typing import List
+from typing import Iterable, List, Optional
 
-from tracker_app.tracking.base import TrackingResult, Landmark2D
+from tracker_app.tracking.base import TrackingResult
 
 
 def draw_landmarks_on_frame(
@@ -18,19 +18,22 @@ def draw_landmarks_on_frame(
     height, width = frame.shape[:2]
     
     # Draw pose
-    if draw_pose and result.pose_landmarks:
-        for lm in result.pose_landmarks:
-            x = int(lm.x * width)
-            y = int(lm.y * height)
-            color = (0, 255, 0) if lm.confidence > 0.7 else (0, 255, 255)
+    if draw_pose and result.pose is not None:
+        for (x, y), confidence in zip(_to_pixels(result.pose, width, height), result.pose[:, 2]):
+            color = (0, 255, 0) if confidence > 0.7 else (0, 255, 255)
             cv2.circle(output, (x, y), 4, color, -1)
     
     # Draw hands
     if draw_hands:
-        if result.left_hand_landmarks:
-            _draw_hand(output, result.left_hand_landmarks, (255, 0, 0), width, height)
-        if result.right_hand_landmarks:
-            _draw_hand(output, result.right_hand_landmarks, (0, 0, 255), width, height)
+        if result.left_hand is not None:
+            _draw_hand(output, result.left_hand, (255, 0, 0), width, height)
+        if result.right_hand is not None:
+            _draw_hand(output, result.right_hand, (0, 0, 255), width, height)
+    
+    # Draw face
+    if draw_face and result.face is not None:
+        for x, y in _to_pixels(result.face, width, height):
+            cv2.circle(output, (x, y), 1, (0, 255, 0), -1)
     
     # Draw quality info
     info_text = f"Frame {result.frame_index} | Pose: {result.pose_confidence:.2f} | " \
@@ -41,18 +44,26 @@ def draw_landmarks_on_frame(
     return output
 
 
+def _to_pixels(points: np.ndarray, width: int, height: int) -> List[tuple]:
+    """(K, 3) normalized landmarks to (x, y) pixel tuples"""
+    return [
+        (int(x), int(y))
+        for x, y in (points[:, :2] * (width, height)).tolist()
+    ]
+
+
 def _draw_hand(
     frame: np.ndarray,
-    landmarks: List[Landmark2D],
+    landmarks: np.ndarray,
     color: tuple,
     width: int,
     height: int
 ) -> None:
     """Draw hand landmarks and connections"""
+    pixels = _to_pixels(landmarks, width, height)
+    
     # Draw landmarks
-    for lm in landmarks:
-        x = int(lm.x * width)
-        y = int(lm.y * height)
+    for x, y in pixels:
         cv2.circle(frame, (x, y), 3, color, -1)
     
     # Draw connections (simplified)
@@ -65,40 +76,76 @@ def _draw_hand(
     ]
     
     for start_idx, end_idx in connections:
-        if start_idx < len(landmarks) and end_idx < len(landmarks):
-            start = landmarks[start_idx]
-            end = landmarks[end_idx]
-            x1, y1 = int(start.x * width), int(start.y * height)
-            x2, y2 = int(end.x * width), int(end.y * height)
-            cv2.line(frame, (x1, y1), (x2, y2), color, 2)
+        if start_idx < len(pixels) and end_idx < len(pixels):
+            cv2.line(frame, pixels[start_idx], pixels[end_idx], color, 2)
 
 
-def create_visualization_video(
-    input_video: Path,
-    tracking_results: List[TrackingResult],
-    output_video: Path
-) -> None:
-    """Create video with tracking overlay"""
-    import cv2
-    from tracker_app.preprocess.video_utils import extract_frames
-    
-    # Open input video
-    cap = cv2.VideoCapture(str(input_video))
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    cap.release()
+class VisualizationWriter:
+    """
+    Draw tracking results onto the source video as they arrive.
     
-    # Create output video writer
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(str(output_video), fourcc, fps, (width, height))
+    Source frames are decoded in step with the results, so results can be
+    written chunk by chunk without holding frames or landmarks in memory.
+    target_fps must match the rate used for tracking so frames are
+    sampled the same way and line up with the results.
+    """
     
-    # Process frames
-    for (frame_idx, time_s, frame), result in zip(
-        extract_frames(input_video),
-        tracking_results
+    def __init__(
+        self,
+        input_video: Path,
+        output_video: Path,
+        target_fps: Optional[int] = None
     ):
-        annotated = draw_landmarks_on_frame(frame, result)
-        out.write(annotated)
+        from tracker_app.preprocess.video_utils import extract_frames
+        
+        self.output_video = output_video
+        
+        # Open input video
+        cap = cv2.VideoCapture(str(input_video))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+        
+        if target_fps and target_fps < fps:
+            fps = target_fps
+        
+        # Create output video writer
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        self._out = cv2.VideoWriter(str(output_video), fourcc, fps, (width, height))
+        self._frames = extract_frames(input_video, target_fps)
+    
+    def write(self, tracking_results: Iterable[TrackingResult]) -> None:
+        """Draw the next results onto the next source frames"""
+        for result in tracking_results:
+            item = next(self._frames, None)
+            if item is None:
+                break
+            frame_idx, time_s, frame = item
+            self._out.write(draw_landmarks_on_frame(frame, result))
+    
+    def close(self) -> None:
+        self._frames.close()
+        self._out.release()
+    
+    def __enter__(self) -> "VisualizationWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def create_visualization_video(
+    input_video: Path,
+    tracking_results: Iterable[TrackingResult],
+    output_video: Path,
+    target_fps: Optional[int] = None
+) -> None:
+    """
+    Create video with tracking overlay.
     
-    out.release()
+    target_fps must match the rate used for tracking so frames are
+    sampled the same way and line up with tracking_results.
+    """
+    with VisualizationWriter(input_video, output_video, target_fps) as writer:
+        writer.write(tracking_results)